@@ -0,0 +1,86 @@
+"""Benchmark IVF-flat recall@k and QPS against exact search on synthetic chunks."""
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import numpy as np
+
+from sample_data_generator import SAMPLE_DOCUMENTS, SAMPLE_TEST_CASES
+from embeddings import EmbeddingHandler
+from ann_index import IVFFlatIndex
+
+
+def synthetic_chunks(count, seed=0):
+    """Build pseudo-chunks by recombining lines of the sample documents."""
+    lines = [
+        line.strip()
+        for doc in SAMPLE_DOCUMENTS
+        for line in doc["content"].split("\n")
+        if len(line.strip()) > 20
+    ]
+    rng = np.random.default_rng(seed)
+    return [
+        " ".join(lines[i] for i in rng.choice(len(lines), size=rng.integers(3, 8), replace=False))
+        for _ in range(count)
+    ]
+
+
+def exact_top_k(vectors, queries, k):
+    """Ground-truth top-k ids by brute force."""
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main():
+    """Run the ANN benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000, help="Number of synthetic chunks to index")
+    parser.add_argument("--queries", type=int, default=500, help="Number of held-out query chunks")
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ANN Benchmark: IVF-flat vs exact search")
+    print("=" * 60)
+
+    embedder = EmbeddingHandler()
+    texts = synthetic_chunks(args.rows + args.queries)
+    texts[args.rows:args.rows + len(SAMPLE_TEST_CASES)] = [tc["query"] for tc in SAMPLE_TEST_CASES]
+
+    start = time.perf_counter()
+    embeddings = embedder.embed_texts(texts, normalize=True)
+    print(f"Embedded {len(texts)} synthetic chunks in {time.perf_counter() - start:.1f} s")
+    vectors, queries = embeddings[:args.rows], embeddings[args.rows:]
+
+    truth = exact_top_k(vectors, queries, args.top_k)
+    start = time.perf_counter()
+    for query in queries:
+        scores = vectors @ query
+        np.argpartition(-scores, args.top_k - 1)[:args.top_k]
+    exact_qps = len(queries) / (time.perf_counter() - start)
+
+    index = IVFFlatIndex(vectors.shape[1], nlist=args.nlist)
+    start = time.perf_counter()
+    index.train(vectors)
+    index.add(vectors, np.arange(len(vectors)))
+    print(f"Built IVF index (nlist={index.nlist}) in {time.perf_counter() - start:.1f} s\n")
+
+    print(f"{'method':<14} {'recall@' + str(args.top_k):>10} {'QPS':>10}")
+    print(f"{'exact':<14} {1.0:>10.4f} {exact_qps:>10.1f}")
+    for nprobe in args.nprobe:
+        hits = 0
+        start = time.perf_counter()
+        results = [index.search(query, args.top_k, nprobe=nprobe)[1] for query in queries]
+        qps = len(queries) / (time.perf_counter() - start)
+        for found, expected in zip(results, truth):
+            hits += len(np.intersect1d(found, expected))
+        recall = hits / (len(queries) * args.top_k)
+        print(f"{'ivf nprobe=' + str(nprobe):<14} {recall:>10.4f} {qps:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
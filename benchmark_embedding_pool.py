@@ -0,0 +1,48 @@
+"""Benchmark bulk embedding throughput with 0..N embedding worker processes."""
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_loader import DocumentLoader
+from embeddings import EmbeddingHandler
+from chunking import split_documents
+from config import DATA_DIR
+
+
+def main():
+    """Run the embedding pool benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=20, help="Replicate the data/ corpus this many times")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Embedding Worker Pool Benchmark")
+    print("=" * 60)
+
+    documents = DocumentLoader().load_batch(str(DATA_DIR)) * args.scale
+    texts = [chunk["content"] for chunk in split_documents(documents)]
+    print(f"{len(texts)} chunks\n")
+
+    baseline = None
+    for workers in args.workers:
+        handler = EmbeddingHandler(use_cache=False, num_workers=workers)
+        # Warm up so worker start-up and model loading are not timed
+        handler.embed_texts(texts[:args.batch_size * max(1, workers) + 1],
+                            batch_size=args.batch_size, use_pool=True)
+
+        start = time.perf_counter()
+        window = handler.ingest_window(args.batch_size)
+        for offset in range(0, len(texts), window):
+            handler.embed_texts(texts[offset:offset + window], batch_size=args.batch_size, use_pool=True)
+        rate = len(texts) / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"workers={workers:<3} {rate:>10.1f} chunks/sec  {rate / baseline:>5.2f}x")
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
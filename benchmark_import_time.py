@@ -0,0 +1,67 @@
+"""Import-time regression check for the API module (``python -X importtime``)."""
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+# Modules that must only be imported on first use, never by `import src.main`
+HEAVY_MODULES = {
+    "torch", "sentence_transformers", "transformers", "pandas", "pptx",
+    "pytesseract", "pdf2image", "pypdf", "weaviate", "langchain_text_splitters"
+}
+
+
+def measure(module):
+    """Import ``module`` in a fresh interpreter; return {name: cumulative_us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"Importing {module} failed")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main():
+    """Run the import-time check."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--max-ms", type=float, default=1500.0, help="Fail if the import takes longer")
+    parser.add_argument("--top", type=int, default=15, help="Show this many slowest imports")
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    total_ms = timings.get(args.module, 0) / 1000.0
+
+    print("=" * 60)
+    print(f"Import time for {args.module}: {total_ms:.1f} ms")
+    print("=" * 60)
+    top_level = {name: us for name, us in timings.items() if "." not in name}
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {us / 1000.0:>9.1f} ms  {name}")
+
+    heavy = sorted(HEAVY_MODULES & set(top_level))
+    failed = False
+    if heavy:
+        print(f"\nFAIL: heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if total_ms > args.max_ms:
+        print(f"\nFAIL: import took {total_ms:.1f} ms (limit {args.max_ms:.0f} ms)")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
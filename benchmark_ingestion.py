@@ -0,0 +1,73 @@
+"""Benchmark chunk ingestion throughput: per-chunk inserts vs. batched ingestion."""
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_loader import DocumentLoader
+from vector_store import WeaviateVectorStore
+from chunking import split_documents
+from config import DATA_DIR
+
+
+def legacy_add_documents(store, documents):
+    """Original ingestion path: one embedding and one insert per chunk."""
+    collection = store.client.collections.get("DocumentChunk")
+    chunk_ids = []
+    for chunk in split_documents(documents):
+        embedding = store.embedding_handler.embed_text(chunk["content"])
+        chunk_ids.append(str(collection.data.insert(properties=chunk, vector=embedding.tolist())))
+    return chunk_ids
+
+
+def run(label, ingest, store, documents):
+    """Time one ingestion run on an empty collection and print chunks/sec."""
+    store.delete_all()
+    start = time.perf_counter()
+    chunk_ids = ingest(documents)
+    elapsed = time.perf_counter() - start
+    rate = len(chunk_ids) / elapsed if elapsed > 0 else 0.0
+    print(f"{label:<10} {len(chunk_ids):>8} chunks  {elapsed:>8.2f} s  {rate:>10.1f} chunks/sec")
+    return rate
+
+
+def main():
+    """Run the ingestion benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the data/ corpus this many times")
+    parser.add_argument("--batch-size", type=int, default=64, help="Embedding batch size for the batched path")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only run the batched path")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Ingestion Benchmark")
+    print("=" * 60)
+
+    store = WeaviateVectorStore()
+    if not store.health_check():
+        print("Weaviate is not reachable; start it before running this benchmark.")
+        return
+    # Measure encoder throughput, not embedding cache hits
+    store.embedding_handler.cache = None
+
+    base_documents = DocumentLoader().load_batch(str(DATA_DIR))
+    documents = base_documents * args.scale
+    print(f"Corpus: {len(base_documents)} documents x {args.scale} = {len(documents)} documents\n")
+
+    legacy_rate = None
+    if not args.skip_legacy:
+        legacy_rate = run("per-chunk", lambda docs: legacy_add_documents(store, docs), store, documents)
+    batched_rate = run("batched", lambda docs: store.add_documents(docs, batch_size=args.batch_size),
+                       store, documents)
+
+    if store.last_ingest_errors:
+        print(f"\n{len(store.last_ingest_errors)} objects failed in the batched run")
+    if legacy_rate:
+        print(f"\nSpeedup: {batched_rate / legacy_rate:.1f}x")
+
+    store.delete_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark per-call overhead of LocalLLM: fresh connections, the pooled session, and cache hits."""
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import requests
+
+from llm_interface import LocalLLM, create_http_session
+from llm_cache import LLMResponseCache
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/generate and /api/tags with HTTP/1.1 keep-alive.
+
+    Non-streaming generations take as long as a full stream would
+    (``stream_tokens * token_delay``, instant by default).
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; otherwise delayed ACKs add ~40 ms
+    # per keep-alive response and mask the client-side difference
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json({"models": []})
+
+    # Streamed responses: this many tokens, each after token_delay seconds
+    stream_tokens = 20
+    token_delay = 0.0
+
+    def _send_stream(self, model):
+        """Send an NDJSON token stream with chunked transfer encoding, like Ollama."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(self.stream_tokens + 1):
+            time.sleep(self.token_delay)
+            done = i == self.stream_tokens
+            chunk = {"model": model, "response": "" if done else f"tok{i} ", "done": done}
+            line = (json.dumps(chunk) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if request.get("stream"):
+            self._send_stream(request.get("model"))
+        else:
+            time.sleep(self.token_delay * self.stream_tokens)
+            self._send_json({"model": request.get("model"), "response": "ok", "done": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_ollama():
+    """Start the stub server on a free port; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class _FreshConnectionSession:
+    """Mimics the old behaviour: module-level requests.post per call."""
+
+    def post(self, *args, **kwargs):
+        return requests.post(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return requests.get(*args, **kwargs)
+
+
+def time_calls(llm, calls, use_cache=False):
+    """Average milliseconds per generate() call."""
+    llm.generate("What is machine learning?", temperature=0.3, use_cache=use_cache)
+    start = time.perf_counter()
+    for _ in range(calls):
+        llm.generate("What is machine learning?", temperature=0.3, use_cache=use_cache)
+    return (time.perf_counter() - start) / calls * 1000.0
+
+
+def main():
+    """Run the LLM client benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_ollama()
+    fresh_ms = time_calls(LocalLLM(base_url=base_url, session=_FreshConnectionSession()), args.calls)
+    pooled_ms = time_calls(LocalLLM(base_url=base_url, session=create_http_session()), args.calls)
+    cached_llm = LocalLLM(base_url=base_url, session=create_http_session(), cache=LLMResponseCache())
+    cached_ms = time_calls(cached_llm, args.calls, use_cache=True)
+    server.shutdown()
+
+    print("=" * 60)
+    print("LocalLLM Client Benchmark (stub Ollama server)")
+    print("=" * 60)
+    print(f"fresh connection per call: {fresh_ms:>8.3f} ms/call")
+    print(f"pooled keep-alive session: {pooled_ms:>8.3f} ms/call")
+    print(f"overhead removed:          {fresh_ms - pooled_ms:>8.3f} ms/call ({fresh_ms / pooled_ms:.1f}x)")
+    print(f"response cache hit:        {cached_ms:>8.3f} ms/call "
+          f"(hit rate {cached_llm.cache_stats()['hit_rate']:.2%})")
+
+
+if __name__ == "__main__":
+    main()
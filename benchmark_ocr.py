@@ -0,0 +1,102 @@
+"""Benchmark PDF OCR throughput: one process vs. the OCR worker pool."""
+import os
+import sys
+import time
+import shutil
+import resource
+import argparse
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_loader import DocumentLoader
+
+SAMPLE_LINES = [
+    "Machine learning systems learn patterns from historical data.",
+    "Retrieval augmented generation grounds answers in source documents.",
+    "Quarterly revenue grew by twelve percent compared to last year.",
+    "The ingestion pipeline loads, chunks, embeds and stores each file.",
+    "Scanned pages carry no text layer and must be recognized with OCR.",
+]
+
+
+def make_scanned_pdf(path: str, pages: int, dpi: int = 150):
+    """Write an image-only (scanned-looking) PDF with ``pages`` letter-size pages of text."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=dpi // 6)
+    except TypeError:
+        font = ImageFont.load_default()
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    line_height = dpi // 4
+
+    images = []
+    for page in range(pages):
+        image = Image.new("L", (width, height), color=255)
+        draw = ImageDraw.Draw(image)
+        draw.text((dpi // 2, dpi // 2), f"Page {page + 1}", fill=0, font=font)
+        y = dpi
+        line = page
+        while y < height - dpi:
+            draw.text((dpi // 2, y), SAMPLE_LINES[line % len(SAMPLE_LINES)], fill=0, font=font)
+            y += line_height
+            line += 1
+        images.append(image)
+
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+
+def run(label, loader, path, pages):
+    """Time OCR of every page and print pages/sec."""
+    start = time.perf_counter()
+    texts = [text for _, text in loader._iter_ocr_pages(path, list(range(1, pages + 1)))]
+    elapsed = time.perf_counter() - start
+    rate = pages / elapsed if elapsed > 0 else 0.0
+    print(f"{label:<14} {pages:>6} pages  {elapsed:>8.2f} s  {rate:>8.2f} pages/sec")
+    return rate, texts
+
+
+def main():
+    """Run the OCR benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=24, help="Pages in the generated scanned PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="OCR worker processes")
+    parser.add_argument("--dpi", type=int, default=150, help="Resolution of the generated page images")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OCR Benchmark")
+    print("=" * 60)
+
+    missing = [tool for tool in ("tesseract", "pdftoppm") if shutil.which(tool) is None]
+    if missing:
+        print(f"Missing {', '.join(missing)}; install Tesseract OCR and Poppler before running this benchmark.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "scanned.pdf")
+        make_scanned_pdf(path, args.pages, args.dpi)
+        print(f"Fixture: {args.pages}-page scanned PDF ({os.path.getsize(path) / 1e6:.1f} MB), "
+              f"{args.workers} workers\n")
+
+        serial_rate, serial_texts = run("single process", DocumentLoader(ocr_workers=1), path, args.pages)
+        # ru_maxrss is in KiB on Linux; pages are rasterized a window at a time
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{'':<14} peak RSS {peak_mb:.0f} MB (should not grow with --pages)")
+
+        loader = DocumentLoader(ocr_workers=args.workers)
+        try:
+            # Start the worker processes outside the timed run
+            list(loader._iter_ocr_pages(path, list(range(1, min(args.pages, args.workers) + 1))))
+            pool_rate, pool_texts = run("process pool", loader, path, args.pages)
+        finally:
+            loader.close()
+
+    print(f"\nSame text in page order: {serial_texts == pool_texts}")
+    if serial_rate:
+        print(f"Speedup: {pool_rate / serial_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
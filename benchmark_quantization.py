@@ -0,0 +1,65 @@
+"""Measure footprint and recall of int8 / PQ vector codes with and without exact rerank."""
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import numpy as np
+
+from benchmark_ann import synthetic_chunks, exact_top_k
+from embeddings import EmbeddingHandler
+from quantization import create_codec
+
+
+def recall(found, truth):
+    """Mean fraction of the true top-k present in ``found``."""
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    """Run the quantization benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Vector Quantization Benchmark")
+    print("=" * 60)
+
+    embedder = EmbeddingHandler()
+    texts = synthetic_chunks(args.rows + args.queries, seed=1)
+    embeddings = embedder.embed_texts(texts, normalize=True)
+    vectors, queries = embeddings[:args.rows], embeddings[args.rows:]
+    truth = exact_top_k(vectors, queries, args.top_k)
+
+    float32_bytes = vectors.shape[1] * 4
+    list_bytes = sys.getsizeof(vectors[0].tolist()) + vectors.shape[1] * sys.getsizeof(0.0)
+    print(f"Python list[float]: {list_bytes:>6} bytes/vector")
+    print(f"float32:            {float32_bytes:>6} bytes/vector\n")
+
+    print(f"{'codec':<8} {'bytes':>6} {'vs f32':>7} {'recall ADC':>11} {'recall rerank':>14}")
+    for kind in ("int8", "pq"):
+        codec = create_codec(kind, vectors.shape[1], pq_m=args.pq_m)
+        codec.train(vectors[:min(len(vectors), 65536)])
+        codes = codec.encode(vectors)
+
+        adc_found, rerank_found = [], []
+        for query in queries:
+            scores = codec.adc_scores(codes, query)
+            adc_found.append(np.argpartition(-scores, args.top_k - 1)[:args.top_k])
+            n_candidates = args.top_k * args.rerank_factor
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            exact = vectors[candidates] @ query
+            rerank_found.append(candidates[np.argpartition(-exact, args.top_k - 1)[:args.top_k]])
+
+        print(f"{kind:<8} {codec.code_size:>6} {float32_bytes / codec.code_size:>6.0f}x "
+              f"{recall(adc_found, truth):>11.4f} {recall(rerank_found, truth):>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
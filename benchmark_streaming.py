@@ -0,0 +1,88 @@
+"""Benchmark time-to-first-token of /ask/stream against the full /ask response."""
+import sys
+import time
+import socket
+import argparse
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import requests
+import uvicorn
+
+from benchmark_llm_client import StubOllamaHandler, start_stub_ollama
+from llm_interface import LocalLLM
+import main
+
+
+class _StaticStore:
+    """Vector store stand-in returning fixed contexts, so only the LLM is timed."""
+
+    corpus_version = 0
+
+    def retrieve_many(self, queries, top_k=5):
+        return [[{"content": f"Context for {query}.", "source": "stub.txt", "chunk_index": 0}]
+                for query in queries]
+
+    def health_check(self):
+        return True
+
+
+def start_api():
+    """Serve the API with uvicorn on a free port; returns (server, base_url)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main_benchmark():
+    """Run the streaming benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens generated per answer")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="Stub generation time per token")
+    args = parser.parse_args()
+
+    StubOllamaHandler.stream_tokens = args.tokens
+    StubOllamaHandler.token_delay = args.token_ms / 1000.0
+    server, base_url = start_stub_ollama()
+
+    agent = main.get_agent()
+    agent._components["llm"] = LocalLLM(base_url=base_url)
+    agent._components["vector_store"] = _StaticStore()
+    request = {"query": "What is machine learning?", "use_decomposition": False, "use_cache": False}
+
+    api, api_url = start_api()
+
+    start = time.perf_counter()
+    requests.post(f"{api_url}/ask", json=request).raise_for_status()
+    full_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token_s = None
+    tokens = 0
+    with requests.post(f"{api_url}/ask/stream", json=request, stream=True) as response:
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: token"):
+                tokens += 1
+                if first_token_s is None:
+                    first_token_s = time.perf_counter() - start
+    stream_s = time.perf_counter() - start
+
+    api.should_exit = True
+    server.shutdown()
+
+    print("=" * 60)
+    print(f"Streaming Benchmark ({args.tokens} tokens at {args.token_ms:.0f} ms/token, stub Ollama)")
+    print("=" * 60)
+    print(f"/ask full response:        {full_s * 1000:>9.1f} ms")
+    print(f"/ask/stream first token:   {first_token_s * 1000:>9.1f} ms")
+    print(f"/ask/stream complete:      {stream_s * 1000:>9.1f} ms ({tokens} token events)")
+
+
+if __name__ == "__main__":
+    main_benchmark()
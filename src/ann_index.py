@@ -0,0 +1,164 @@
+"""IVF-flat approximate nearest-neighbour index in pure NumPy."""
+import threading
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+ASSIGN_BLOCK_ROWS = 16384
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every row, computed in blocks."""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[start:start + ASSIGN_BLOCK_ROWS]
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10,
+                     seed: int = 0) -> np.ndarray:
+    """Cluster L2-normalized vectors by cosine similarity; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=k)
+
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty clusters with random points so every list gets used
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+
+class IVFFlatIndex:
+    """Inverted-file index with a k-means coarse quantizer and exact scoring.
+
+    Vectors must be L2-normalized so inner product equals cosine similarity.
+    ``nprobe`` trades recall for latency: each query scans the inverted lists
+    of its ``nprobe`` nearest centroids. Vectors are stored uncompressed in
+    the lists, so scores within a probed list are exact.
+    """
+
+    def __init__(self, dim: int, nlist: int = 256, nprobe: int = 8, seed: int = 0):
+        """Create an untrained index."""
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._list_ids: List[List[np.ndarray]] = []
+        self._list_vectors: List[List[np.ndarray]] = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, max_samples: int = 100_000):
+        """Fit the coarse quantizer on (a sample of) ``vectors``."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > max_samples:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[rng.choice(len(vectors), size=max_samples, replace=False)]
+        nlist = min(self.nlist, len(vectors))
+        with self._lock:
+            self.centroids = spherical_kmeans(vectors, nlist, iterations=iterations, seed=self.seed)
+            self.nlist = nlist
+            self._list_ids = [[] for _ in range(nlist)]
+            self._list_vectors = [[] for _ in range(nlist)]
+            self._count = 0
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        """Insert vectors incrementally under their nearest centroid."""
+        if not self.is_trained:
+            raise RuntimeError("IVFFlatIndex must be trained before adding vectors")
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        labels = _assign(vectors, self.centroids)
+
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        with self._lock:
+            for group in np.split(order, boundaries):
+                if len(group) == 0:
+                    continue
+                list_no = labels[group[0]]
+                self._list_ids[list_no].append(ids[group])
+                self._list_vectors[list_no].append(vectors[group])
+            self._count += len(ids)
+
+    def _list(self, list_no: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return one inverted list, merging pending appends first."""
+        ids = self._list_ids[list_no]
+        vectors = self._list_vectors[list_no]
+        if len(ids) > 1:
+            ids[:] = [np.concatenate(ids)]
+            vectors[:] = [np.concatenate(vectors)]
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+        return ids[0], vectors[0]
+
+    def search(self, query_vector: np.ndarray, top_k: int,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, ids) of the approximate top-k, best first."""
+        if not self.is_trained or self._count == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query_vector
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        with self._lock:
+            lists = [self._list(int(p)) for p in probes]
+        candidate_ids = np.concatenate([ids for ids, _ in lists])
+        if len(candidate_ids) == 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        scores = np.concatenate([vectors @ query_vector for _, vectors in lists])
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return scores[top], candidate_ids[top]
+
+    def save(self, path: str):
+        """Serialize the index to a single ``.npz`` file."""
+        if not self.is_trained:
+            raise RuntimeError("Cannot save an untrained IVFFlatIndex")
+        with self._lock:
+            lists = [self._list(i) for i in range(self.nlist)]
+        np.savez(
+            path,
+            params=np.asarray([self.dim, self.nlist, self.nprobe, self.seed], dtype=np.int64),
+            centroids=self.centroids,
+            list_sizes=np.asarray([len(ids) for ids, _ in lists], dtype=np.int64),
+            ids=np.concatenate([ids for ids, _ in lists]),
+            vectors=np.concatenate([vectors for _, vectors in lists])
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFFlatIndex":
+        """Load an index written by ``save``."""
+        with np.load(path) as data:
+            dim, nlist, nprobe, seed = (int(v) for v in data["params"])
+            index = cls(dim, nlist=nlist, nprobe=nprobe, seed=seed)
+            index.centroids = data["centroids"]
+            bounds = np.cumsum(data["list_sizes"])[:-1]
+            ids, vectors = data["ids"], data["vectors"]
+        index._list_ids = [[chunk] if len(chunk) else [] for chunk in np.split(ids, bounds)]
+        index._list_vectors = [[chunk] if len(chunk) else [] for chunk in np.split(vectors, bounds)]
+        index._count = len(ids)
+        return index
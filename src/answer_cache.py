@@ -0,0 +1,117 @@
+"""Semantic answer cache: reuse answers for paraphrased questions."""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Maps previously answered queries to their responses by embedding similarity.
+
+    Query embeddings (L2-normalized) live in a fixed-size float32 matrix, so
+    a lookup is one matrix-vector product. A hit needs cosine similarity of
+    at least ``threshold``, the same answer options (``params``) and the
+    corpus version the answer was produced against; any change to the corpus
+    empties the cache. Entries expire after ``ttl_seconds`` (0 = never).
+    When full, the oldest entry is overwritten.
+    """
+
+    def __init__(self, embedder, dim: int, threshold: float = 0.95, max_entries: int = 1024,
+                 ttl_seconds: float = 3600.0):
+        """Initialize an empty cache.
+
+        ``embedder`` is anything with ``embed_text(text, normalize=...)``,
+        i.e. an ``EmbeddingHandler`` or the query ``EmbeddingScheduler``.
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._next_slot = 0
+        self._corpus_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expirations = 0
+
+    def _reset(self, corpus_version: Optional[int]):
+        self._vectors[:] = 0.0
+        self._entries = [None] * self.max_entries
+        self._next_slot = 0
+        self._corpus_version = corpus_version
+
+    def _sync_version(self, corpus_version: int):
+        """Drop every entry if the corpus changed since they were stored."""
+        if self._corpus_version != corpus_version:
+            if any(entry is not None for entry in self._entries):
+                self.invalidations += 1
+            self._reset(corpus_version)
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl_seconds > 0 and time.time() - entry["cached_at"] > self.ttl_seconds
+
+    def lookup(self, query: str, params: Tuple, corpus_version: int
+               ) -> Tuple[np.ndarray, Optional[Dict[str, Any]], float]:
+        """Return ``(query_vector, entry, similarity)``; ``entry`` is ``None`` on a miss.
+
+        The query vector is handed back so ``store`` can reuse it.
+        """
+        query_vector = self.embedder.embed_text(query, normalize=True)
+        with self._lock:
+            self._sync_version(corpus_version)
+            scores = self._vectors @ query_vector
+            for slot in np.argsort(-scores):
+                score = float(scores[slot])
+                if score < self.threshold:
+                    break
+                entry = self._entries[slot]
+                if entry is not None and self._expired(entry):
+                    self._vectors[slot] = 0.0
+                    self._entries[slot] = None
+                    self.expirations += 1
+                    continue
+                if entry is not None and entry["params"] == params:
+                    self.hits += 1
+                    return query_vector, entry, score
+            self.misses += 1
+        return query_vector, None, 0.0
+
+    def store(self, query_vector: np.ndarray, query: str, params: Tuple,
+              response: Dict[str, Any], corpus_version: int):
+        """Remember ``response`` as the answer to ``query``."""
+        with self._lock:
+            self._sync_version(corpus_version)
+            slot = self._next_slot
+            self._vectors[slot] = query_vector
+            self._entries[slot] = {
+                "query": query,
+                "params": params,
+                "response": response,
+                "cached_at": time.time()
+            }
+            self._next_slot = (slot + 1) % self.max_entries
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._reset(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the current number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": sum(entry is not None for entry in self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "threshold": self.threshold,
+                "corpus_version": self._corpus_version
+            }
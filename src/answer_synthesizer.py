@@ -1,25 +1,62 @@
 """Answer synthesis module for combining multi-step retrieval results."""
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 
 try:
     from .llm_interface import LocalLLM
+    from .reranker import Reranker, create_reranker, mmr_select
+    from .context_packer import ContextPacker, count_tokens
+    from .config import SYNTHESIS_MAX_CONTEXTS, MMR_LAMBDA
 except ImportError:
     from llm_interface import LocalLLM
+    from reranker import Reranker, create_reranker, mmr_select
+    from context_packer import ContextPacker, count_tokens
+    from config import SYNTHESIS_MAX_CONTEXTS, MMR_LAMBDA
 
 
 class AnswerSynthesizer:
     """Synthesizes answers from multiple retrieved contexts."""
 
-    def __init__(self):
-        """Initialize the answer synthesizer."""
-        self.llm = LocalLLM()
+    def __init__(self, llm: Optional[LocalLLM] = None, reranker: Optional[Reranker] = None,
+                 embedder=None, max_contexts: int = SYNTHESIS_MAX_CONTEXTS,
+                 mmr_lambda: float = MMR_LAMBDA, packer: Optional[ContextPacker] = None):
+        """Initialize the answer synthesizer.
+
+        ``reranker`` defaults to the one selected by RERANKER (embedding
+        similarity unless configured otherwise). ``embedder`` is used for MMR
+        context selection and defaults to the reranker's; without one the
+        top ``max_contexts`` contexts are taken in rerank order. ``packer``
+        fits the selected contexts into the CONTEXT_TOKEN_BUDGET.
+        """
+        self.llm = llm or LocalLLM()
+        self.reranker = reranker or create_reranker(llm=self.llm)
+        self.embedder = embedder if embedder is not None else getattr(self.reranker, "embedder", None)
+        self.max_contexts = max_contexts
+        self.mmr_lambda = mmr_lambda
+        self.packer = packer or ContextPacker()
+
+    def select_contexts(self, query: str, contexts: List[str]) -> List[str]:
+        """Pick up to ``max_contexts`` relevant, non-redundant contexts for the prompt.
+
+        Exact duplicates are dropped keeping the rerank order; if more remain
+        than fit, Maximal Marginal Relevance over their embeddings chooses
+        the subset so overlapping chunks don't crowd out other evidence.
+        """
+        unique_contexts = list(dict.fromkeys(c for c in contexts if c.strip()))
+        if len(unique_contexts) <= self.max_contexts or self.embedder is None:
+            return unique_contexts[:self.max_contexts]
 
-    def synthesize(self, query: str, contexts: List[str], sub_questions: List[str] = None) -> Dict[str, Any]:
-        """Synthesize an answer from multiple contexts."""
-        
-        # Deduplicate and filter contexts
-        unique_contexts = list(set(c for c in contexts if c.strip()))
-        contexts_text = "\n\n".join([f"[Context {i+1}]: {c}" for i, c in enumerate(unique_contexts[:5])])
+        try:
+            embeddings = self.embedder.embed_texts([query] + unique_contexts, normalize=True)
+            picked = mmr_select(embeddings[0], embeddings[1:], self.max_contexts, self.mmr_lambda)
+            return [unique_contexts[i] for i in picked]
+        except Exception as e:
+            print(f"MMR selection failed, using rerank order: {e}")
+            return unique_contexts[:self.max_contexts]
+
+    def _synthesis_prompt(self, query: str, contexts: List[str], sub_questions: List[str] = None) -> str:
+        """Build the synthesis prompt from the selected contexts."""
+        contexts_text = "\n\n".join([f"[Context {i+1}]: {c}" for i, c in enumerate(contexts)])
 
         if sub_questions:
             sub_q_text = "\n".join([f"- {q}" for q in sub_questions])
@@ -50,16 +87,53 @@ Contexts:
 Please provide a clear, comprehensive answer based on the provided contexts.
 
 Answer:"""
+        return prompt
 
-        answer = self.llm.generate(prompt, temperature=0.7, max_tokens=1024)
-
+    def _synthesis_result(self, answer: str, prompt: str, packing: Dict[str, Any], contexts: List[str],
+                          sub_questions: List[str] = None) -> Dict[str, Any]:
         return {
             "answer": answer,
-            "contexts_used": len(unique_contexts),
+            "contexts_used": len(packing["contexts"]),
+            "context_tokens": packing["tokens"],
+            "prompt_tokens": count_tokens(prompt),
             "confidence": self._estimate_confidence(answer, contexts),
             "sub_questions": sub_questions or []
         }
 
+    def synthesize(self, query: str, contexts: List[str], sub_questions: List[str] = None) -> Dict[str, Any]:
+        """Synthesize an answer from multiple contexts."""
+        packing = self.packer.pack(query, self.select_contexts(query, contexts))
+        prompt = self._synthesis_prompt(query, packing["contexts"], sub_questions)
+        answer = self.llm.generate(prompt, temperature=0.7, max_tokens=1024)
+        return self._synthesis_result(answer, prompt, packing, contexts, sub_questions)
+
+    async def asynthesize(self, query: str, contexts: List[str], sub_questions: List[str] = None) -> Dict[str, Any]:
+        """Synthesize an answer without blocking the event loop."""
+        selected = await asyncio.to_thread(self.select_contexts, query, contexts)
+        packing = self.packer.pack(query, selected)
+        prompt = self._synthesis_prompt(query, packing["contexts"], sub_questions)
+        answer = await self.llm.agenerate(prompt, temperature=0.7, max_tokens=1024)
+        return self._synthesis_result(answer, prompt, packing, contexts, sub_questions)
+
+    async def astream_synthesize(self, query: str, contexts: List[str],
+                                 sub_questions: List[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream the synthesized answer.
+
+        Yields ``("token", text)`` while the LLM generates, then a single
+        ``("result", synthesis_result)`` with the same fields as ``synthesize``.
+        """
+        selected = await asyncio.to_thread(self.select_contexts, query, contexts)
+        packing = self.packer.pack(query, selected)
+        prompt = self._synthesis_prompt(query, packing["contexts"], sub_questions)
+
+        pieces = []
+        async for token in self.llm.astream(prompt, temperature=0.7, max_tokens=1024):
+            pieces.append(token)
+            yield "token", token
+
+        answer = "".join(pieces).strip()
+        yield "result", self._synthesis_result(answer, prompt, packing, contexts, sub_questions)
+
     def _estimate_confidence(self, answer: str, contexts: List[str]) -> float:
         """Estimate confidence in the answer."""
         if not answer or not contexts:
@@ -71,33 +145,13 @@ Answer:"""
         return round(confidence, 2)
 
     def rerank_contexts(self, query: str, contexts: List[str]) -> List[str]:
-        """Rerank contexts by relevance using LLM."""
+        """Rerank contexts by relevance using the configured reranker."""
         if len(contexts) <= 1:
             return contexts
+        return self.reranker.rerank(query, contexts)
 
-        contexts_str = "\n\n".join([f"[{i}]: {c[:200]}..." for i, c in enumerate(contexts)])
-        
-        prompt = f"""Rate the relevance of each context to the question on a scale of 1-5.
-
-Question: {query}
-
-Contexts:
-{contexts_str}
-
-Provide only the ratings as: [1]=X [2]=Y [3]=Z etc. Do not explain."""
-
-        ratings_str = self.llm.generate(prompt, temperature=0.1, max_tokens=50)
-        
-        # Parse ratings
-        try:
-            ratings = {}
-            for part in ratings_str.split():
-                if '=' in part:
-                    idx, rating = part.replace('[', '').replace(']', '').split('=')
-                    ratings[int(idx)] = int(rating)
-            
-            # Sort contexts by rating
-            sorted_indices = sorted(ratings.keys(), key=lambda x: ratings.get(x, 0), reverse=True)
-            return [contexts[i] for i in sorted_indices if i < len(contexts)]
-        except:
+    async def arerank_contexts(self, query: str, contexts: List[str]) -> List[str]:
+        """Rerank contexts by relevance without blocking the event loop."""
+        if len(contexts) <= 1:
             return contexts
+        return await self.reranker.arerank(query, contexts)
@@ -0,0 +1,33 @@
+"""Document chunking shared by the vector store backends."""
+from typing import List, Dict, Any
+
+try:
+    from .config import CHUNK_SIZE, CHUNK_OVERLAP
+except ImportError:
+    from config import CHUNK_SIZE, CHUNK_OVERLAP
+
+
+def split_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split documents into chunk property dicts ready for embedding."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+
+    chunks = []
+    for doc in documents:
+        content = doc.get("content", "")
+        if not content:
+            continue
+
+        for chunk_idx, chunk in enumerate(text_splitter.split_text(content)):
+            chunks.append({
+                "content": chunk,
+                "source": doc.get("source", ""),
+                "chunk_index": chunk_idx,
+                "doc_type": doc.get("type", "text"),
+                "metadata": str(doc)
+            })
+    return chunks
@@ -5,6 +5,21 @@ from pathlib import Path
 
 load_dotenv()
 
+# Vector Store Configuration
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "weaviate")  # "weaviate" or "local"
+LOCAL_STORE_DIR = os.getenv("LOCAL_STORE_DIR", "")  # empty = in-memory only
+LOCAL_STORE_DTYPE = os.getenv("LOCAL_STORE_DTYPE", "float32")  # "float32" or "float16"
+LOCAL_SEGMENT_MAX_ROWS = int(os.getenv("LOCAL_SEGMENT_MAX_ROWS", 1000000))
+LOCAL_COMPACT_DEAD_RATIO = float(os.getenv("LOCAL_COMPACT_DEAD_RATIO", 0.3))  # 0 = never compact automatically
+LOCAL_INDEX = os.getenv("LOCAL_INDEX", "flat")  # "flat" (exact) or "ivf" (approximate)
+IVF_NLIST = int(os.getenv("IVF_NLIST", 1024))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", 16))
+IVF_MIN_TRAIN_ROWS = int(os.getenv("IVF_MIN_TRAIN_ROWS", 100000))
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")  # "none", "int8" or "pq"
+PQ_SUBQUANTIZERS = int(os.getenv("PQ_SUBQUANTIZERS", 48))
+QUANTIZATION_MIN_TRAIN_ROWS = int(os.getenv("QUANTIZATION_MIN_TRAIN_ROWS", 10000))
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", 4))
+
 # Weaviate Configuration
 WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
 WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY", "weaviate_key")
@@ -13,15 +28,20 @@ WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY", "weaviate_key")
 LLM_MODEL = os.getenv("LLM_MODEL", "mistral")
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:11434")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", 0.5))
 
 # API Configuration
 API_PORT = int(os.getenv("API_PORT", 8000))
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "false").lower() == "true"
 
 # Paths
 DATA_DIR = Path(__file__).parent.parent / "data"
 REPORT_DIR = Path(__file__).parent.parent / "reports"
 EVAL_DIR = Path(__file__).parent.parent / "evaluation"
+CACHE_DIR = Path(__file__).parent.parent / "cache"
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
@@ -37,6 +57,60 @@ TOP_K_RETRIEVAL = 5
 CHUNK_SIZE = 1024
 CHUNK_OVERLAP = 100
 
+# Ingestion Configuration
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", 0))  # 0 = encode in-process
+WEAVIATE_BATCH_SIZE = int(os.getenv("WEAVIATE_BATCH_SIZE", 0))  # 0 = dynamic batching
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))  # 0 = one process per CPU, 1 = OCR in-process
+OCR_DPI = int(os.getenv("OCR_DPI", 200))  # resolution PDF pages are rasterized at (grayscale)
+OCR_PAGE_WINDOW = int(os.getenv("OCR_PAGE_WINDOW", 4))  # pages rasterized at once per worker
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", 100))  # PDF pages with less extracted text get OCR
+OCR_MIN_PRINTABLE_RATIO = float(os.getenv("OCR_MIN_PRINTABLE_RATIO", 0.9))  # below this the text layer is garbled
+OCR_IMAGE_PAGE_MIN_CHARS = int(os.getenv("OCR_IMAGE_PAGE_MIN_CHARS", 500))  # pages with images need this much text
+
+# Background Ingestion Jobs
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 32))  # uploads beyond this get 429
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", 1000))  # finished jobs kept for /jobs
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # bytes copied per read
+
+# Embedding Cache Configuration
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", str(CACHE_DIR / "embeddings"))  # empty = memory only
+EMBEDDING_CACHE_MEMORY_MB = int(os.getenv("EMBEDDING_CACHE_MEMORY_MB", 64))
+EMBEDDING_CACHE_DISK_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", 200000))
+
+# LLM Response Cache Configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 3600))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")  # empty = memory only
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", 0.3))  # cache calls at or below this
+
+# Reranker Configuration
+RERANKER = os.getenv("RERANKER", "embedding")  # embedding, llm or none
+RERANKER_LEXICAL_WEIGHT = float(os.getenv("RERANKER_LEXICAL_WEIGHT", 0.2))
+SYNTHESIS_MAX_CONTEXTS = int(os.getenv("SYNTHESIS_MAX_CONTEXTS", 5))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.7))  # 1.0 = relevance only, lower = more diversity
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1024))
+CONTEXT_MIN_TOKENS = int(os.getenv("CONTEXT_MIN_TOKENS", 32))  # stop packing below this many tokens left
+
+# Semantic Answer Cache Configuration
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.95))  # minimum cosine similarity
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 1024))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 3600))  # 0 = never expire
+# Version stamp the Weaviate store shares across uvicorn workers; empty = per-process counter
+CORPUS_VERSION_FILE = os.getenv("CORPUS_VERSION_FILE", str(CACHE_DIR / "corpus_version"))
+
+# Request Coalescing Configuration
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# Query Embedding Scheduler Configuration
+EMBEDDING_SCHEDULER_ENABLED = os.getenv("EMBEDDING_SCHEDULER_ENABLED", "true").lower() == "true"
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", 5))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", 32))
+
 # Evaluation Configuration
 MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
 EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", 10))
@@ -0,0 +1,117 @@
+"""Token-budgeted packing of retrieved contexts into the synthesis prompt."""
+import re
+from typing import Any, Dict, List
+
+try:
+    from .config import CONTEXT_TOKEN_BUDGET, CONTEXT_MIN_TOKENS
+except ImportError:
+    from config import CONTEXT_TOKEN_BUDGET, CONTEXT_MIN_TOKENS
+
+# Word pieces of at most 4 characters, single punctuation marks: close to
+# what BPE tokenizers produce for English prose, at regex speed
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the LLM token count of ``text``."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Longest prefix of ``text`` with at most ``budget`` tokens."""
+    if budget <= 0:
+        return ""
+    for i, match in enumerate(_TOKEN_PATTERN.finditer(text), start=1):
+        if i == budget:
+            return text[:match.end()]
+    return text
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split ``text`` into sentences on terminal punctuation and blank lines."""
+    return [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+
+def _terms(text: str) -> set:
+    return {word for word in _WORD_PATTERN.findall(text.lower()) if len(word) > 2}
+
+
+class ContextPacker:
+    """Fills a token budget with contexts, most relevant first.
+
+    Contexts are taken whole while they fit. The first one that doesn't is
+    trimmed to whole sentences: starting from the sentence sharing the most
+    terms with the query, neighbouring sentences are added while the budget
+    allows. If that sentence alone is over budget (or the text has no
+    sentence punctuation at all) it is cut to its first tokens. Packing
+    stops once fewer than ``min_tokens`` remain.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, min_tokens: int = CONTEXT_MIN_TOKENS):
+        """Initialize with the total context budget in tokens."""
+        self.token_budget = token_budget
+        self.min_tokens = min_tokens
+
+    def _trim(self, query_terms: set, context: str, budget: int) -> str:
+        """Best-matching sentence window of ``context`` that fits in ``budget`` tokens."""
+        sentences = split_sentences(context)
+        if not sentences:
+            return ""
+        tokens = [count_tokens(sentence) for sentence in sentences]
+        overlap = [len(query_terms & _terms(sentence)) for sentence in sentences]
+        center = max(range(len(sentences)), key=lambda i: overlap[i])
+        if tokens[center] > budget:
+            return truncate_tokens(sentences[center], budget)
+
+        start, end, used = center, center + 1, tokens[center]
+        while True:
+            # Grow towards the neighbour that matches the query better
+            candidates = []
+            if start > 0 and used + tokens[start - 1] <= budget:
+                candidates.append((overlap[start - 1], -1))
+            if end < len(sentences) and used + tokens[end] <= budget:
+                candidates.append((overlap[end], 1))
+            if not candidates:
+                break
+            _, direction = max(candidates)
+            if direction < 0:
+                start -= 1
+                used += tokens[start]
+            else:
+                used += tokens[end]
+                end += 1
+        return " ".join(sentences[start:end])
+
+    def pack(self, query: str, contexts: List[str]) -> Dict[str, Any]:
+        """Pack ``contexts`` (ordered by relevance) into the budget.
+
+        Returns the packed contexts, the tokens they use, and how many were
+        trimmed or dropped.
+        """
+        query_terms = _terms(query)
+        packed = []
+        used = 0
+        trimmed = 0
+        for context in contexts:
+            remaining = self.token_budget - used
+            if remaining < self.min_tokens:
+                break
+            tokens = count_tokens(context)
+            if tokens > remaining:
+                context = self._trim(query_terms, context, remaining)
+                if not context:
+                    continue
+                tokens = count_tokens(context)
+                trimmed += 1
+            packed.append(context)
+            used += tokens
+
+        return {
+            "contexts": packed,
+            "tokens": used,
+            "token_budget": self.token_budget,
+            "trimmed": trimmed,
+            "dropped": len(contexts) - len(packed)
+        }
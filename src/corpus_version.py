@@ -0,0 +1,62 @@
+"""Corpus version stamp shared by every process serving the same store."""
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; bumps are then only atomic within a process
+    fcntl = None
+
+
+class CorpusVersion:
+    """Counter bumped whenever the stored chunks change.
+
+    Answer caches compare it to tell whether their entries are still valid.
+    With ``path`` set the counter lives in that file, so every uvicorn worker
+    serving the same store sees the others' ingests and deletes on its next
+    read. Without ``path`` it is a plain in-process counter, which is enough
+    for stores whose data is private to the process anyway.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the counter, creating the parent directory of ``path``."""
+        self.path = Path(path) if path else None
+        self._value = 0
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _read(self) -> int:
+        try:
+            return int(self.path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @property
+    def value(self) -> int:
+        """Current version; re-read from ``path`` on every call so other processes' bumps show up."""
+        if self.path is None:
+            return self._value
+        return self._read()
+
+    def bump(self) -> int:
+        """Advance the version and return the new value."""
+        with self._lock:
+            if self.path is None:
+                self._value += 1
+                return self._value
+            with open(self.path.with_name(self.path.name + ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    value = self._read() + 1
+                    tmp_path = self.path.with_name(self.path.name + ".tmp")
+                    tmp_path.write_text(str(value))
+                    # Readers see either the old or the new value, never a partial write
+                    os.replace(tmp_path, self.path)
+                    return value
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,21 +1,79 @@
 """Document loader for handling various file formats."""
 import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Any
-from pypdf import PdfReader
-from pdf2image import convert_from_path
-import pytesseract
-from PIL import Image
-import pandas as pd
-from pptx import Presentation
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
+try:
+    from .config import OCR_WORKERS, OCR_MIN_TEXT_CHARS, OCR_MIN_PRINTABLE_RATIO, OCR_IMAGE_PAGE_MIN_CHARS
+    from .ocr_pool import OCRWorkerPool, iter_ocr_pages
+except ImportError:
+    from config import OCR_WORKERS, OCR_MIN_TEXT_CHARS, OCR_MIN_PRINTABLE_RATIO, OCR_IMAGE_PAGE_MIN_CHARS
+    from ocr_pool import OCRWorkerPool, iter_ocr_pages
+
+# Parsing and OCR libraries (pypdf, pdf2image, pytesseract, PIL, pandas,
+# python-pptx) are imported inside the loader that needs them, so importing
+# this module stays cheap.
+
+
+def _printable_ratio(text: str) -> float:
+    """Fraction of non-whitespace characters that are printable (not control,
+    private-use or replacement characters, the usual signs of a broken font
+    encoding)."""
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    printable = sum(1 for c in chars if c.isprintable() and c != "\ufffd")
+    return printable / len(chars)
+
+
+def _has_images(page, depth: int = 0) -> bool:
+    """Whether a pypdf page (or form XObject) draws any image XObjects."""
+    try:
+        xobjects = page["/Resources"].get_object().get("/XObject")
+        if xobjects is None:
+            return False
+        for xobject in xobjects.get_object().values():
+            xobject = xobject.get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                return True
+            # Images are often wrapped in form XObjects
+            if subtype == "/Form" and depth < 3 and "/Resources" in xobject and _has_images(xobject, depth + 1):
+                return True
+    except (KeyError, AttributeError):
+        return False
+    return False
+
+
+def _needs_ocr(text: str, has_images: bool) -> bool:
+    """Route a PDF page to OCR unless its text layer looks complete.
+
+    Pages with little or garbled extracted text are treated as scanned;
+    pages that contain images and only a little text are image-heavy and
+    OCRed so the text inside the images is not lost.
+    """
+    chars = len(text.strip())
+    if chars < OCR_MIN_TEXT_CHARS or _printable_ratio(text) < OCR_MIN_PRINTABLE_RATIO:
+        return True
+    return has_images and chars < OCR_IMAGE_PAGE_MIN_CHARS
+
 
 class DocumentLoader:
     """Loads and extracts content from various document types."""
 
-    def __init__(self):
+    def __init__(self, ocr_workers: int = OCR_WORKERS):
+        """Initialize the loader.
+
+        PDF pages are OCRed across ``ocr_workers`` processes (0 = one per
+        CPU, 1 = in this process); the pool is started on first use.
+        """
         self.supported_formats = {".pdf", ".txt", ".csv", ".xlsx", ".png", ".jpg", ".jpeg", ".pptx"}
+        self.ocr_workers = ocr_workers if ocr_workers > 0 else (os.cpu_count() or 1)
+        self._ocr_pool: Optional[OCRWorkerPool] = None
+        self._ocr_pool_lock = threading.Lock()
 
     def load_documents(self, file_path: str) -> List[Dict[str, Any]]:
         """Load documents from a file."""
@@ -35,39 +93,81 @@ class DocumentLoader:
             raise ValueError(f"Unsupported file format: {file_ext}")
 
     def _load_pdf(self, file_path: str) -> List[Dict[str, Any]]:
-        """Load and extract content from PDF files."""
-        documents = []
-        
+        """Load and extract content from PDF files.
+
+        Each page becomes one document: its text layer when that is usable,
+        otherwise (scanned or image-heavy pages) the OCR text of the page.
+        """
+        from pypdf import PdfReader
+
+        page_texts = []
+        ocr_pages = []
+
         with open(file_path, 'rb') as file:
             pdf_reader = PdfReader(file)
-            
+
             for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                documents.append({
-                    "content": text,
-                    "source": file_path,
-                    "page": page_num + 1,
-                    "type": "text",
-                    "timestamp": datetime.now().isoformat()
-                })
-
-        # Extract images from PDF
-        try:
-            images = convert_from_path(file_path)
-            for img_num, image in enumerate(images):
-                extracted_text = pytesseract.image_to_string(image)
-                documents.append({
-                    "content": extracted_text,
-                    "source": file_path,
-                    "page": img_num + 1,
-                    "type": "image",
-                    "timestamp": datetime.now().isoformat()
-                })
-        except Exception as e:
-            print(f"Warning: Could not extract images from PDF: {e}")
+                text = page.extract_text() or ""
+                page_texts.append(text)
+                if _needs_ocr(text, _has_images(page)):
+                    ocr_pages.append(page_num + 1)
+
+        # OCR the pages whose text layer is missing, garbled or incomplete
+        ocr_texts = {}
+        if ocr_pages:
+            try:
+                for page_num, extracted_text in self._iter_ocr_pages(file_path, ocr_pages):
+                    ocr_texts[page_num] = extracted_text
+            except Exception as e:
+                print(f"Warning: Could not extract images from PDF: {e}")
+
+        documents = []
+        for page_num, text in enumerate(page_texts, start=1):
+            ocr = page_num in ocr_texts
+            documents.append({
+                "content": ocr_texts[page_num] if ocr else text,
+                "source": file_path,
+                "page": page_num,
+                "type": "image" if ocr else "text",
+                "timestamp": datetime.now().isoformat()
+            })
 
+        print(f"{Path(file_path).name}: {len(page_texts) - len(ocr_texts)} pages from the text layer, "
+              f"{len(ocr_texts)} OCRed")
         return documents
 
+    def _iter_ocr_pages(self, file_path: str, page_numbers: List[int]) -> Iterator[Tuple[int, str]]:
+        """Yield ``(page_number, text)`` for the given (1-based) PDF pages, in order.
+
+        Pages are rasterized a few at a time, so memory use does not grow
+        with the length of the document. If a pool worker dies (e.g. OOM on
+        a huge scan) the pool is discarded and a new one is started by the
+        next call.
+        """
+        if self.ocr_workers <= 1 or len(page_numbers) <= 1:
+            yield from iter_ocr_pages(file_path, page_numbers)
+            return
+
+        with self._ocr_pool_lock:
+            if self._ocr_pool is None:
+                self._ocr_pool = OCRWorkerPool(self.ocr_workers)
+            pool = self._ocr_pool
+        try:
+            yield from pool.iter_ocr_pages(file_path, page_numbers)
+        except BrokenProcessPool:
+            with self._ocr_pool_lock:
+                if self._ocr_pool is pool:
+                    self._ocr_pool = None
+            pool.close()
+            raise
+
+    def close(self):
+        """Stop the OCR worker pool, if one was started."""
+        with self._ocr_pool_lock:
+            if self._ocr_pool is not None:
+                self._ocr_pool.close()
+                self._ocr_pool = None
+
     def _load_text(self, file_path: str) -> List[Dict[str, Any]]:
         """Load text files."""
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -82,6 +182,8 @@ class DocumentLoader:
 
     def _load_tabular(self, file_path: str) -> List[Dict[str, Any]]:
         """Load CSV and Excel files."""
+        import pandas as pd
+
         if file_path.endswith('.csv'):
             df = pd.read_csv(file_path)
         else:
@@ -101,6 +203,9 @@ class DocumentLoader:
 
     def _load_image(self, file_path: str) -> List[Dict[str, Any]]:
         """Load and extract text from images using OCR."""
+        import pytesseract
+        from PIL import Image
+
         image = Image.open(file_path)
         text = pytesseract.image_to_string(image)
 
@@ -113,6 +218,8 @@ class DocumentLoader:
 
     def _load_pptx(self, file_path: str) -> List[Dict[str, Any]]:
         """Load PowerPoint presentations."""
+        from pptx import Presentation
+
         presentation = Presentation(file_path)
         documents = []
 
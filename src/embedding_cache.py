@@ -0,0 +1,272 @@
+"""Content-addressed embedding cache with an in-memory LRU and an on-disk tier."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the disk tier is then single-process only
+    fcntl = None
+
+# Index rows are one hex SHA-256 digest plus a newline, so row n starts at n * INDEX_ROW_BYTES
+INDEX_ROW_BYTES = 65
+
+
+def _file_rows(path: Path, row_bytes: int) -> int:
+    return os.path.getsize(path) // row_bytes if path.exists() else 0
+
+
+def _truncate(path: Path, size: int):
+    if path.exists() and os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+class _DiskGeneration:
+    """One generation of the disk tier: an append-only float32 matrix
+    (``vectors.f32``, read through ``np.memmap``) and one digest per row
+    (``index.txt``)."""
+
+    def __init__(self, path: Path, dim: int):
+        self.path = path
+        self.dim = dim
+        self.index: Dict[str, int] = {}
+        self.rows = 0
+        self.vectors: Optional[np.memmap] = None
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def index_path(self) -> Path:
+        return self.path / "index.txt"
+
+    def sync(self):
+        """Pick up rows appended by other processes; the caller holds the file lock.
+
+        Vectors are written before their digests, so a writer that crashed
+        can only leave trailing vector rows without digests; both files are
+        cut back to the rows they have in common.
+        """
+        rows = min(_file_rows(self.index_path, INDEX_ROW_BYTES), _file_rows(self.vectors_path, self.dim * 4))
+        _truncate(self.vectors_path, rows * self.dim * 4)
+        _truncate(self.index_path, rows * INDEX_ROW_BYTES)
+        if rows < self.rows:
+            # Cut back under us; start over
+            self.index, self.rows = {}, 0
+        if rows > self.rows:
+            with open(self.index_path, "rb") as f:
+                f.seek(self.rows * INDEX_ROW_BYTES)
+                digests = f.read((rows - self.rows) * INDEX_ROW_BYTES).decode("ascii").split()
+            for row, digest in enumerate(digests, start=self.rows):
+                self.index.setdefault(digest, row)
+            self.rows = rows
+            self._remap()
+        elif rows == 0:
+            self.vectors = None
+
+    def _remap(self):
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        row = self.index.get(digest)
+        return None if row is None else np.array(self.vectors[row])
+
+    def append(self, digests: List[str], vectors: np.ndarray):
+        """Append rows; the caller holds the file lock and has just called ``sync``."""
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.index_path, "a") as f:
+            f.writelines(digest + "\n" for digest in digests)
+        for row, digest in enumerate(digests, start=self.rows):
+            self.index.setdefault(digest, row)
+        self.rows += len(digests)
+        self._remap()
+
+
+class EmbeddingCache:
+    """Caches embeddings keyed by (model name, SHA-256 of the text).
+
+    The memory tier is an LRU bounded by ``memory_budget_bytes``. The optional
+    disk tier lives in ``cache_dir/<model>/`` and survives restarts; only
+    ``put_many(..., persist=True)`` (bulk ingestion) writes to it, so query
+    texts are never persisted. It holds at most ``disk_max_entries`` rows in
+    two generations (``gen-NNNNNN/`` directories): when the newest is half
+    full a new one is started and the oldest is deleted. Writers from several
+    processes (embedding workers, uvicorn workers) serialize on an ``flock``
+    and pick up each other's rows before appending.
+    """
+
+    def __init__(self, model_name: str, dim: int, cache_dir: Optional[str] = None,
+                 memory_budget_bytes: int = 64 * 1024 * 1024, disk_max_entries: int = 200_000):
+        """Initialize the cache and open the disk tier if ``cache_dir`` is set."""
+        self.model_name = model_name
+        self.dim = dim
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk_dir = None
+        self._generations: List[_DiskGeneration] = []
+        if cache_dir:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+            self._disk_dir = Path(cache_dir) / safe_name
+            self._open_disk_tier()
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Return the content hash used as the cache key for ``text``."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the disk tier across processes."""
+        with open(self._disk_dir / ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _generation_dirs(self) -> List[Path]:
+        return sorted(self._disk_dir.glob("gen-*"))
+
+    def _open_disk_tier(self):
+        """Check the model metadata and load every generation."""
+        self._disk_dir.mkdir(parents=True, exist_ok=True)
+        meta_path = self._disk_dir / "meta.json"
+        meta = {"model": self.model_name, "dim": self.dim}
+
+        with self._file_lock():
+            if meta_path.exists():
+                with open(meta_path, "r") as f:
+                    stored_meta = json.load(f)
+                if stored_meta != meta:
+                    # Embeddings from a different model/dimension are useless here
+                    self._remove_disk_files()
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+            self._sync_disk()
+
+    def _remove_disk_files(self):
+        for path in self._generation_dirs():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _sync_disk(self):
+        """Match the on-disk generations, including other processes' writes; needs the file lock."""
+        known = {generation.path: generation for generation in self._generations}
+        self._generations = [known.get(path) or _DiskGeneration(path, self.dim)
+                             for path in self._generation_dirs()]
+        for generation in self._generations:
+            generation.sync()
+
+    def _rotate_disk(self):
+        """Start a new generation once the newest is half of the budget; keep two."""
+        if self._generations and self._generations[-1].rows < max(1, self.disk_max_entries // 2):
+            return
+        number = int(self._generations[-1].path.name[4:]) + 1 if self._generations else 0
+        path = self._disk_dir / f"gen-{number:06d}"
+        path.mkdir()
+        self._generations.append(_DiskGeneration(path, self.dim))
+        while len(self._generations) > 2:
+            shutil.rmtree(self._generations.pop(0).path, ignore_errors=True)
+
+    def _disk_get(self, digest: str) -> Optional[np.ndarray]:
+        for generation in reversed(self._generations):
+            vector = generation.get(digest)
+            if vector is not None:
+                return vector
+        return None
+
+    def _remember(self, digest: str, vector: np.ndarray):
+        """Insert into the memory tier, evicting least recently used entries."""
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        self._memory[digest] = vector
+        self._memory_bytes += vector.nbytes
+        while self._memory_bytes > self.memory_budget_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up ``texts``; missing entries are returned as ``None``."""
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                digest = self.key(text)
+                vector = self._memory.get(digest)
+                if vector is not None:
+                    self._memory.move_to_end(digest)
+                    self.memory_hits += 1
+                else:
+                    vector = self._disk_get(digest)
+                    if vector is not None:
+                        self._remember(digest, vector)
+                        self.disk_hits += 1
+                    else:
+                        self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray, persist: bool = False):
+        """Store freshly computed embeddings in memory, and on disk if ``persist``."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            digests = [self.key(text) for text in texts]
+            for digest, vector in zip(digests, vectors):
+                self._remember(digest, vector.copy())
+            if not persist or self._disk_dir is None:
+                return
+
+            with self._file_lock():
+                self._sync_disk()
+                new_rows = {}
+                for digest, vector in zip(digests, vectors):
+                    if digest not in new_rows and self._disk_get(digest) is None:
+                        new_rows[digest] = vector
+                if new_rows:
+                    self._rotate_disk()
+                    self._generations[-1].append(list(new_rows), np.stack(list(new_rows.values())))
+
+    def clear(self):
+        """Drop every cached embedding from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._disk_dir is not None:
+                with self._file_lock():
+                    self._generations = []
+                    self._remove_disk_files()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and tier sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": sum(generation.rows for generation in self._generations)
+        }
@@ -0,0 +1,88 @@
+"""Multi-process embedding worker pool for bulk ingestion."""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    """Load the encoder once per worker process."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_shard(shm_name: str, total_rows: int, dim: int, start: int,
+                  texts: List[str], batch_size: int) -> int:
+    """Encode ``texts`` and write them into rows ``start:`` of the shared output."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        output = np.ndarray((total_rows, dim), dtype=np.float32, buffer=shm.buf)
+        output[start:start + len(texts)] = _worker_model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True
+        )
+        del output
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class EmbeddingWorkerPool:
+    """Shards chunk batches across worker processes, each with its own model.
+
+    Workers write embeddings straight into a ``SharedMemory`` block owned by
+    the caller, so only the input texts and a row count cross the process
+    boundary. Each worker gets ``cpu_count // num_workers`` torch threads to
+    avoid oversubscribing the machine.
+    """
+
+    def __init__(self, model_name: str, dim: int, num_workers: int):
+        """Start ``num_workers`` spawned processes and load a model in each."""
+        self.model_name = model_name
+        self.dim = dim
+        self.num_workers = num_workers
+        torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, torch_threads)
+        )
+
+    def embed_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed ``texts`` across the pool; returns a float32 ``(n, dim)`` array."""
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        rows = len(texts)
+        shm = shared_memory.SharedMemory(create=True, size=rows * self.dim * 4)
+        try:
+            futures = [
+                self._executor.submit(
+                    _encode_shard, shm.name, rows, self.dim, start,
+                    texts[start:start + batch_size], batch_size
+                )
+                for start in range(0, rows, batch_size)
+            ]
+            for future in futures:
+                future.result()
+            shared = np.ndarray((rows, self.dim), dtype=np.float32, buffer=shm.buf)
+            embeddings = shared.copy()
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+        return embeddings
+
+    def close(self):
+        """Shut the worker processes down."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,138 @@
+"""Micro-batching scheduler that coalesces concurrent query embeddings."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    from .config import EMBEDDING_SCHEDULER_ENABLED, EMBEDDING_MAX_WAIT_MS, EMBEDDING_MAX_BATCH
+    from .embeddings import EmbeddingHandler
+except ImportError:
+    from config import EMBEDDING_SCHEDULER_ENABLED, EMBEDDING_MAX_WAIT_MS, EMBEDDING_MAX_BATCH
+    from embeddings import EmbeddingHandler
+
+
+class EmbeddingScheduler:
+    """Gathers encode requests from many threads into one ``model.encode`` call.
+
+    A background thread waits for the first pending request, then keeps
+    collecting until ``max_batch`` items are queued or ``max_wait_ms`` has
+    passed, encodes them in a single batch and resolves each caller's future.
+    It exposes ``embed_text``/``embed_texts`` so it can stand in for an
+    ``EmbeddingHandler`` on the query path.
+    """
+
+    def __init__(self, handler: EmbeddingHandler, max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+                 max_batch: int = EMBEDDING_MAX_BATCH):
+        """Start the batching thread."""
+        self.handler = handler
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.batch_size_histogram: Dict[int, int] = {}
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, normalize: Optional[bool] = None) -> Future:
+        """Queue one text; the future resolves to its float32 embedding."""
+        if self._closed:
+            raise RuntimeError("EmbeddingScheduler is closed")
+        future: Future = Future()
+        self._queue.put((text, normalize, future))
+        return future
+
+    def embed_text(self, text: str, normalize: Optional[bool] = None) -> np.ndarray:
+        """Embed one text through the shared batch."""
+        return self.submit(text, normalize).result()
+
+    def embed_texts(self, texts: List[str], normalize: Optional[bool] = None, **kwargs) -> np.ndarray:
+        """Embed several texts, letting them share batches with other callers."""
+        futures = [self.submit(text, normalize) for text in texts]
+        if not futures:
+            return np.empty((0, self.handler.get_embedding_dim()), dtype=np.float32)
+        return np.stack([future.result() for future in futures])
+
+    def get_embedding_dim(self) -> int:
+        return self.handler.get_embedding_dim()
+
+    def _collect(self) -> List[tuple]:
+        """Block for one request, then gather more until the batch is full or time runs out."""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+
+            texts = [text for text, _, _ in batch]
+            try:
+                embeddings = self.handler.embed_texts(texts, batch_size=len(texts), normalize=False)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, normalize, future), embedding in zip(batch, embeddings):
+                if self.handler.normalize if normalize is None else normalize:
+                    norm = np.linalg.norm(embedding)
+                    if norm > 0:
+                        embedding = embedding / norm
+                future.set_result(embedding)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                bucket = 1 << (len(batch) - 1).bit_length()
+                self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters and a histogram of batch sizes (power-of-two buckets)."""
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": {
+                    f"<={bucket}": count for bucket, count in sorted(self.batch_size_histogram.items())
+                },
+                "queue_depth": self._queue.qsize()
+            }
+
+    def close(self):
+        """Stop the batching thread after the queued requests are served."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+
+def create_query_embedder(handler: EmbeddingHandler):
+    """Wrap ``handler`` in a scheduler when EMBEDDING_SCHEDULER_ENABLED is set."""
+    if EMBEDDING_SCHEDULER_ENABLED:
+        return EmbeddingScheduler(handler)
+    return handler
@@ -1,40 +1,208 @@
 """Embeddings handler using sentence transformers."""
-from typing import List
-from sentence_transformers import SentenceTransformer
+import time
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
 import numpy as np
 
 try:
-    from .config import EMBEDDING_MODEL
+    from .config import (
+        EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_CACHE_ENABLED,
+        EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MEMORY_MB, EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        EMBEDDING_WORKERS
+    )
+    from .embedding_cache import EmbeddingCache
+    from .embedding_pool import EmbeddingWorkerPool
 except ImportError:
-    from config import EMBEDDING_MODEL
+    from config import (
+        EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_CACHE_ENABLED,
+        EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MEMORY_MB, EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        EMBEDDING_WORKERS
+    )
+    from embedding_cache import EmbeddingCache
+    from embedding_pool import EmbeddingWorkerPool
 
 
 class EmbeddingHandler:
-    """Handles text embeddings using sentence transformers."""
+    """Handles text embeddings using sentence transformers.
 
-    def __init__(self, model_name: str = EMBEDDING_MODEL):
-        """Initialize the embedding handler."""
-        self.model = SentenceTransformer(model_name)
-        self.embedding_dim = self.model.get_sentence_embedding_dimension()
+    Embeddings are returned as contiguous float32 NumPy arrays; convert with
+    ``.tolist()`` only when serializing them for a network API. The model
+    (and torch) are loaded on first use, or explicitly via ``warm_up``.
+    """
 
-    def embed_text(self, text: str) -> List[float]:
-        """Embed a single text string."""
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+    def __init__(self, model_name: str = EMBEDDING_MODEL, use_cache: bool = EMBEDDING_CACHE_ENABLED,
+                 normalize: bool = False, num_workers: int = EMBEDDING_WORKERS):
+        """Initialize the embedding handler.
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Embed multiple text strings."""
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+        ``normalize`` sets the default for L2-normalizing embeddings at
+        encode time; it can be overridden per call. ``num_workers`` > 0 lets
+        bulk ingestion (``use_pool=True``) shard batches across that many
+        worker processes; the pool is started on first use.
+        """
+        self.model_name = model_name
+        self.normalize = normalize
+        self.num_workers = num_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.use_cache = use_cache
+        self._model = None
+        self._cache = None
+        self._load_lock = threading.RLock()
+        self.encoded_texts = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def model(self):
+        """The SentenceTransformer model, imported and loaded on first access."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def embedding_dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def cache(self) -> Optional[EmbeddingCache]:
+        """The embedding cache, opened on first access when enabled."""
+        if self._cache is None and self.use_cache:
+            with self._load_lock:
+                if self._cache is None:
+                    self._cache = EmbeddingCache(
+                        self.model_name,
+                        self.embedding_dim,
+                        cache_dir=EMBEDDING_CACHE_DIR or None,
+                        memory_budget_bytes=EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+                        disk_max_entries=EMBEDDING_CACHE_DISK_MAX_ENTRIES
+                    )
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Optional[EmbeddingCache]):
+        self._cache = cache
+        self.use_cache = cache is not None
+
+    def warm_up(self):
+        """Load the model and open the cache now instead of on the first request."""
+        self._encode_uncached(["warm up"], batch_size=1)
+        return self.cache
+
+    def _encode(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                use_pool: bool = False) -> np.ndarray:
+        """Run the encoder, serving previously seen texts from the cache."""
+        cache = self.cache
+        if cache is None:
+            return self._encode_uncached(texts, batch_size, use_pool)
+
+        cached = cache.get_many(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        if missing:
+            fresh = self._encode_uncached(missing, batch_size, use_pool)
+            # Only bulk ingestion reaches the disk tier; query texts stay in memory
+            cache.put_many(missing, fresh, persist=use_pool)
+            fresh_by_text = dict(zip(missing, fresh))
+            cached = [v if v is not None else fresh_by_text[t] for t, v in zip(texts, cached)]
+
+        if not cached:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return np.stack(cached)
+
+    def _encode_uncached(self, texts: List[str], batch_size: int, use_pool: bool = False) -> np.ndarray:
+        """Encode texts with the model and account for encoder time."""
+        start = time.perf_counter()
+        if use_pool and self.num_workers > 0 and len(texts) > batch_size:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    embeddings = pool.embed_texts(texts, batch_size)
+                    break
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); start a fresh pool and retry once
+                    self._discard_pool(pool)
+                    if attempt:
+                        raise
+                    print("Embedding worker pool broke; restarting it")
+        else:
+            embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        self.encode_seconds += time.perf_counter() - start
+        self.encoded_texts += len(texts)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def _get_pool(self) -> EmbeddingWorkerPool:
+        """Return the worker pool, starting it on first use."""
+        with self._pool_lock:
+            # Concurrent ingestion jobs must not each start a pool
+            if self._pool is None:
+                self._pool = EmbeddingWorkerPool(self.model_name, self.embedding_dim, self.num_workers)
+            return self._pool
+
+    def _discard_pool(self, pool: EmbeddingWorkerPool):
+        """Drop ``pool`` after a worker died so the next call starts a fresh one."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.close()
+
+    def _postprocess(self, embeddings: np.ndarray, normalize: Optional[bool]) -> np.ndarray:
+        """L2-normalize rows in place when requested."""
+        if self.normalize if normalize is None else normalize:
+            norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings /= norms
+        return embeddings
+
+    def embed_text(self, text: str, normalize: Optional[bool] = None) -> np.ndarray:
+        """Embed a single text string as a float32 vector of shape ``(dim,)``."""
+        return self._postprocess(self._encode([text]), normalize)[0]
+
+    def embed_texts(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                    normalize: Optional[bool] = None, use_pool: bool = False) -> np.ndarray:
+        """Embed multiple texts in batches as a float32 matrix of shape ``(n, dim)``.
+
+        ``use_pool`` routes the batches through the worker pool when one is
+        configured; meant for bulk ingestion, not single queries.
+        """
+        return self._postprocess(self._encode(texts, batch_size=batch_size, use_pool=use_pool), normalize)
+
+    def ingest_window(self, batch_size: int = EMBEDDING_BATCH_SIZE) -> int:
+        """Number of chunks to hand to ``embed_texts`` at once during ingestion."""
+        return batch_size * max(1, self.num_workers)
 
     def similarity(self, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts."""
-        embeddings = self.model.encode([text1, text2], convert_to_numpy=True)
+        embeddings = self._encode([text1, text2])
         similarity_score = np.dot(embeddings[0], embeddings[1]) / (
             np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
         )
         return float(similarity_score)
 
+    def close(self):
+        """Stop the embedding worker pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
     def get_embedding_dim(self) -> int:
         """Get embedding dimension."""
         return self.embedding_dim
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report cache hit/miss counters and the encoder time they saved."""
+        avg_encode = self.encode_seconds / self.encoded_texts if self.encoded_texts else 0.0
+        stats: Dict[str, Any] = {
+            "encoded_texts": self.encoded_texts,
+            "encode_seconds": round(self.encode_seconds, 4),
+            "cache_enabled": self.use_cache
+        }
+        if self._cache is not None:
+            cache_stats = self._cache.stats()
+            stats.update(cache_stats)
+            stats["estimated_seconds_saved"] = round(
+                (cache_stats["memory_hits"] + cache_stats["disk_hits"]) * avg_encode, 4
+            )
+        return stats
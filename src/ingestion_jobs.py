@@ -0,0 +1,258 @@
+"""Background ingestion jobs: a bounded queue, a worker pool and per-stage progress."""
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+try:
+    from .config import INGEST_WORKERS, INGEST_QUEUE_SIZE, INGEST_JOB_HISTORY
+except ImportError:
+    from config import INGEST_WORKERS, INGEST_QUEUE_SIZE, INGEST_JOB_HISTORY
+
+STAGES = ("load", "chunk", "embed", "store")
+
+
+class IngestionQueueFull(Exception):
+    """Raised when the ingestion queue is at capacity; the client should retry later."""
+
+
+class IngestionJob:
+    """One uploaded file moving through load -> chunk -> embed -> store."""
+
+    def __init__(self, file_path: str, filename: str, cleanup: bool = True,
+                 content_hash: Optional[str] = None):
+        """Create a queued job for ``file_path``; ``cleanup`` deletes the file when done."""
+        self.id = uuid4().hex
+        self.file_path = file_path
+        self.filename = filename
+        self.cleanup = cleanup
+        self.content_hash = content_hash
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "done": 0, "total": None, "started_at": None, "updated_at": None}
+            for name in STAGES
+        }
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    def progress(self, stage: str, done: int, total: Optional[int] = None):
+        """Record that ``done`` of ``total`` items of ``stage`` are finished (cumulative)."""
+        now = time.time()
+        with self._lock:
+            entry = self.stages[stage]
+            if entry["started_at"] is None:
+                # A stage's work began when the previous report (of any stage) was made
+                previous = [e["updated_at"] for e in self.stages.values() if e["updated_at"] is not None]
+                entry["started_at"] = max(previous + [self.started_at or now])
+            entry["done"] = done
+            if total is not None:
+                entry["total"] = total
+            entry["updated_at"] = now
+            entry["status"] = "completed" if entry["total"] is not None and done >= entry["total"] else "running"
+
+    def _start(self):
+        with self._lock:
+            self.status = "running"
+            self.started_at = time.time()
+
+    def _finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            self.status = "failed" if error else "completed"
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            for entry in self.stages.values():
+                if entry["status"] == "running":
+                    entry["status"] = "failed" if error else "completed"
+        self._finished.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status, per-stage progress and throughput (items per second)."""
+        with self._lock:
+            stages = {}
+            for name, entry in self.stages.items():
+                seconds = 0.0
+                if entry["started_at"] is not None:
+                    seconds = entry["updated_at"] - entry["started_at"]
+                stages[name] = {
+                    "status": entry["status"],
+                    "done": entry["done"],
+                    "total": entry["total"],
+                    "seconds": round(seconds, 3),
+                    "items_per_second": round(entry["done"] / seconds, 2) if seconds > 0 else None
+                }
+
+            end = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "filename": self.filename,
+                "content_hash": self.content_hash,
+                "status": self.status,
+                "created_at": self.created_at,
+                "queued_seconds": round((self.started_at or end) - self.created_at, 3),
+                "run_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+                "stages": stages,
+                "result": self.result,
+                "error": self.error
+            }
+
+
+class IngestionJobQueue:
+    """Runs ingestion jobs on a fixed pool of worker threads.
+
+    At most ``max_queued`` jobs wait for a worker; ``submit`` raises
+    ``IngestionQueueFull`` beyond that, so a burst of uploads is pushed back
+    to clients instead of piling up in memory. Finished jobs are kept for
+    status queries, up to ``max_history``.
+
+    Jobs submitted with a ``content_hash`` are deduplicated: a file whose
+    bytes were already ingested (or are being ingested) is not queued again
+    while its job is still in the history, or until ``forget_content`` is
+    called, e.g. after the corpus is cleared. The registry lives in this
+    process only.
+    """
+
+    def __init__(self, loader_factory: Callable, agent_factory: Callable,
+                 workers: int = INGEST_WORKERS, max_queued: int = INGEST_QUEUE_SIZE,
+                 max_history: int = INGEST_JOB_HISTORY):
+        """Initialize the queue; worker threads start with the first job."""
+        self.loader_factory = loader_factory
+        self.agent_factory = agent_factory
+        self.workers = max(1, workers)
+        self.max_history = max_history
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._by_content: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run, name=f"ingest-worker-{len(self._threads)}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def full(self) -> bool:
+        """Whether a new job would currently be rejected."""
+        return self._queue.full()
+
+    def submit(self, file_path: str, filename: str, cleanup: bool = True,
+               content_hash: Optional[str] = None) -> Tuple[IngestionJob, bool]:
+        """Queue ``file_path`` for ingestion and return ``(job, created)`` immediately.
+
+        If ``content_hash`` matches a job that has not failed, that job is
+        returned with ``created=False`` and nothing is queued (the file is
+        deleted if ``cleanup`` is set).
+        """
+        job = IngestionJob(file_path, filename, cleanup=cleanup, content_hash=content_hash)
+        self._ensure_workers()
+        with self._lock:
+            existing = self._by_content.get(content_hash) if content_hash else None
+            if existing is not None and existing.status != "failed":
+                if cleanup:
+                    os.unlink(file_path)
+                return existing, False
+            self._jobs[job.id] = job
+            if content_hash:
+                self._by_content[content_hash] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                if content_hash:
+                    del self._by_content[content_hash]
+            raise IngestionQueueFull(
+                f"Ingestion queue is full ({self._queue.maxsize} jobs waiting)"
+            ) from None
+
+        with self._lock:
+            self._prune()
+        return job, True
+
+    def forget_content(self):
+        """Stop deduplicating against previously ingested files."""
+        with self._lock:
+            self._by_content.clear()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``max_history``, with their content hashes."""
+        excess = len(self._jobs) - self.max_history
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(0, excess)]:
+            job = self._jobs.pop(job_id)
+            if job.content_hash and self._by_content.get(job.content_hash) is job:
+                del self._by_content[job.content_hash]
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job: IngestionJob):
+        """Load, chunk, embed and store one file, recording progress on the job."""
+        job._start()
+        try:
+            job.progress("load", 0)
+            documents = self.loader_factory().load_documents(job.file_path)
+            job.progress("load", len(documents), len(documents))
+
+            result = self.agent_factory().load_documents(documents, progress=job.progress)
+            if not result["success"]:
+                raise RuntimeError(result.get("error", "Ingestion failed"))
+            summary = {
+                "documents_processed": result.get("documents_processed", 0),
+                "chunks_created": result.get("chunks_created", 0)
+            }
+            pdf_pages = [doc["type"] for doc in documents if "page" in doc]
+            if pdf_pages:
+                # How many PDF pages came from the text layer vs. OCR
+                summary["pdf_pages"] = {"text": pdf_pages.count("text"), "ocr": pdf_pages.count("image")}
+            job._finish(result=summary)
+        except Exception as e:
+            print(f"Ingestion job {job.id} ({job.filename}) failed: {e}")
+            job._finish(error=str(e))
+        finally:
+            if job.cleanup:
+                try:
+                    os.unlink(job.file_path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counts by status."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "jobs": counts
+        }
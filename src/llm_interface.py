@@ -1,66 +1,292 @@
 """LLM interface for local Ollama models."""
+import asyncio
+import json
+import threading
+import weakref
+import httpx
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, AsyncIterator, Iterator, Tuple
 
 try:
-    from .config import LLM_BASE_URL, LLM_MODEL
+    from .config import (
+        LLM_BASE_URL, LLM_MODEL, LLM_POOL_SIZE, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF,
+        LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_DB,
+        LLM_CACHE_MAX_TEMPERATURE, SINGLE_FLIGHT_ENABLED
+    )
+    from .llm_cache import LLMResponseCache
+    from .single_flight import SingleFlight
 except ImportError:
-    from config import LLM_BASE_URL, LLM_MODEL
+    from config import (
+        LLM_BASE_URL, LLM_MODEL, LLM_POOL_SIZE, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF,
+        LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_DB,
+        LLM_CACHE_MAX_TEMPERATURE, SINGLE_FLIGHT_ENABLED
+    )
+    from llm_cache import LLMResponseCache
+    from single_flight import SingleFlight
+
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def create_http_session(pool_size: int = LLM_POOL_SIZE, max_retries: int = LLM_MAX_RETRIES,
+                        backoff: float = LLM_RETRY_BACKOFF) -> requests.Session:
+    """Build a keep-alive session with a bounded connection pool and retry/backoff.
+
+    Only connection errors and 502/503/504 responses are retried: a read
+    timeout means Ollama already has the request, and resending a POST
+    would run the same generation again.
+    """
+    retry = Retry(
+        total=max_retries,
+        read=0,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide pooled session shared by every LocalLLM."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = create_http_session()
+    return _http_session
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or ``None`` when LLM_CACHE_ENABLED is off."""
+    global _llm_cache
+    if _llm_cache is None and LLM_CACHE_ENABLED:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    max_entries=LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                    db_path=LLM_CACHE_DB or None
+                )
+    return _llm_cache
+
+
+# Coalesces identical in-flight generations across every LocalLLM in the process
+_generation_flights = SingleFlight()
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_async_http_client(pool_size: int = LLM_POOL_SIZE,
+                          max_retries: int = LLM_MAX_RETRIES) -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop.
+
+    httpx connections belong to the loop that opened them, so each loop
+    (normally one per uvicorn worker) gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=httpx.AsyncHTTPTransport(retries=max_retries)
+        )
+        _async_clients[loop] = client
+    return client
 
 
 class LocalLLM:
-    """Interface for local LLM using Ollama."""
+    """Interface for local LLM using Ollama.
+
+    All instances share one pooled keep-alive session (``get_http_session``)
+    unless a session is passed in explicitly. ``agenerate``/``astream`` are
+    the non-blocking equivalents for use inside an event loop.
+
+    Non-streaming calls at or below ``LLM_CACHE_MAX_TEMPERATURE`` are served
+    from the shared response cache (``get_llm_cache``); pass ``use_cache``
+    to force caching on or off for a single call. Identical calls that are
+    in flight at the same time share one request (``SINGLE_FLIGHT_ENABLED``).
+    """
 
-    def __init__(self, model: str = LLM_MODEL, base_url: str = LLM_BASE_URL):
+    def __init__(self, model: str = LLM_MODEL, base_url: str = LLM_BASE_URL,
+                 session: Optional[requests.Session] = None,
+                 cache: Optional[LLMResponseCache] = None):
         """Initialize local LLM handler."""
         self.model = model
         self.base_url = base_url
         self.api_endpoint = f"{base_url}/api/generate"
+        self.session = session or get_http_session()
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.flights = _generation_flights if SINGLE_FLIGHT_ENABLED else None
 
-    def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 512) -> str:
+    def _cache_key(self, prompt: str, temperature: float, max_tokens: Optional[int],
+                   use_cache: Optional[bool]) -> Optional[str]:
+        """Return the cache key for a call, or ``None`` if it should bypass the cache."""
+        if self.cache is None:
+            return None
+        if use_cache is None:
+            use_cache = temperature <= LLM_CACHE_MAX_TEMPERATURE
+        if not use_cache:
+            return None
+        return self.cache.key(self.model, prompt, temperature, max_tokens)
+
+    def _flight_key(self, prompt: str, temperature: float, max_tokens: Optional[int]) -> tuple:
+        return (self.base_url, self.model, prompt, temperature, max_tokens)
+
+    def _payload(self, prompt: str, temperature: float, max_tokens: Optional[int], stream: bool) -> Dict[str, Any]:
+        """Build the /api/generate request body."""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "temperature": temperature,
+            "stream": stream
+        }
+        if max_tokens is not None:
+            payload["num_predict"] = max_tokens
+        return payload
+
+    def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 512,
+                 use_cache: Optional[bool] = None) -> str:
         """Generate text using local LLM."""
-        try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "temperature": temperature,
-                "num_predict": max_tokens,
-                "stream": False
-            }
-
-            response = requests.post(self.api_endpoint, json=payload, timeout=30)
+        cache_key = self._cache_key(prompt, temperature, max_tokens, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        def request() -> str:
+            payload = self._payload(prompt, temperature, max_tokens, stream=False)
+
+            response = self.session.post(self.api_endpoint, json=payload, timeout=30)
             response.raise_for_status()
 
             result = response.json()
-            return result.get("response", "").strip()
+            text = result.get("response", "").strip()
+            if cache_key is not None and text:
+                self.cache.put(cache_key, text)
+            return text
+
+        try:
+            if self.flights is None:
+                return request()
+            return self.flights.do(self._flight_key(prompt, temperature, max_tokens), request)
         except Exception as e:
             print(f"Error generating text: {e}")
             return ""
 
-    def generate_streaming(self, prompt: str, temperature: float = 0.7):
-        """Generate text with streaming."""
+    @staticmethod
+    def _stream_token(line) -> Tuple[str, bool]:
+        """Parse one NDJSON line of an Ollama stream into ``(token text, done)``."""
+        chunk = json.loads(line)
+        if "error" in chunk:
+            raise RuntimeError(chunk["error"])
+        return chunk.get("response", ""), bool(chunk.get("done", False))
+
+    def generate_streaming(self, prompt: str, temperature: float = 0.7,
+                           max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Generate text with streaming, yielding token text as it arrives."""
         try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "temperature": temperature,
-                "stream": True
-            }
-
-            response = requests.post(self.api_endpoint, json=payload, stream=True, timeout=30)
+            payload = self._payload(prompt, temperature, max_tokens, stream=True)
+
+            response = self.session.post(self.api_endpoint, json=payload, stream=True, timeout=30)
             response.raise_for_status()
 
             for line in response.iter_lines():
                 if line:
-                    chunk = line.decode('utf-8')
-                    yield chunk
+                    token, done = self._stream_token(line)
+                    if token:
+                        yield token
+                    if done:
+                        break
+        except Exception as e:
+            print(f"Error in streaming: {e}")
+
+    async def agenerate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 512,
+                        use_cache: Optional[bool] = None) -> str:
+        """Generate text without blocking the event loop."""
+        cache_key = self._cache_key(prompt, temperature, max_tokens, use_cache)
+        if cache_key is not None:
+            # SQLite reads and commits block; keep them off the event loop
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        async def request() -> str:
+            payload = self._payload(prompt, temperature, max_tokens, stream=False)
+
+            response = await get_async_http_client().post(self.api_endpoint, json=payload, timeout=30)
+            response.raise_for_status()
+
+            result = response.json()
+            text = result.get("response", "").strip()
+            if cache_key is not None and text:
+                await asyncio.to_thread(self.cache.put, cache_key, text)
+            return text
+
+        try:
+            if self.flights is None:
+                return await request()
+            return await self.flights.ado(self._flight_key(prompt, temperature, max_tokens), request)
+        except Exception as e:
+            print(f"Error generating text: {e}")
+            return ""
+
+    async def astream(self, prompt: str, temperature: float = 0.7,
+                      max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Generate text with streaming without blocking the event loop, yielding token text.
+
+        Errors (including error chunks and connection drops mid-stream) are
+        re-raised so callers never mistake a truncated stream for an answer.
+        """
+        try:
+            payload = self._payload(prompt, temperature, max_tokens, stream=True)
+
+            async with get_async_http_client().stream("POST", self.api_endpoint, json=payload,
+                                                      timeout=30) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        token, done = self._stream_token(line)
+                        if token:
+                            yield token
+                        if done:
+                            break
         except Exception as e:
             print(f"Error in streaming: {e}")
+            raise
+
+    async def ais_available(self) -> bool:
+        """Check if LLM is available without blocking the event loop."""
+        try:
+            response = await get_async_http_client().get(f"{self.base_url}/api/tags", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
 
     def is_available(self) -> bool:
         """Check if LLM is available."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             return response.status_code == 200
         except:
             return False
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report response cache counters, hit rate and coalesced requests."""
+        stats = {"cache_enabled": False} if self.cache is None else {"cache_enabled": True, **self.cache.stats()}
+        if self.flights is not None:
+            stats["single_flight"] = self.flights.stats()
+        return stats
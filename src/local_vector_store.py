@@ -0,0 +1,324 @@
+"""In-process NumPy vector store, a drop-in replacement for Weaviate."""
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+from uuid import uuid4
+
+import numpy as np
+
+try:
+    from .config import (
+        EMBEDDING_BATCH_SIZE, LOCAL_STORE_DIR, LOCAL_STORE_DTYPE, LOCAL_SEGMENT_MAX_ROWS,
+        LOCAL_COMPACT_DEAD_RATIO, LOCAL_INDEX, IVF_NLIST, IVF_NPROBE, IVF_MIN_TRAIN_ROWS,
+        VECTOR_QUANTIZATION, PQ_SUBQUANTIZERS, QUANTIZATION_MIN_TRAIN_ROWS, RERANK_FACTOR
+    )
+    from .embeddings import EmbeddingHandler
+    from .embedding_scheduler import create_query_embedder
+    from .chunking import split_documents
+    from .vector_segment import SegmentStore
+    from .ann_index import IVFFlatIndex
+    from .corpus_version import CorpusVersion
+except ImportError:
+    from config import (
+        EMBEDDING_BATCH_SIZE, LOCAL_STORE_DIR, LOCAL_STORE_DTYPE, LOCAL_SEGMENT_MAX_ROWS,
+        LOCAL_COMPACT_DEAD_RATIO, LOCAL_INDEX, IVF_NLIST, IVF_NPROBE, IVF_MIN_TRAIN_ROWS,
+        VECTOR_QUANTIZATION, PQ_SUBQUANTIZERS, QUANTIZATION_MIN_TRAIN_ROWS, RERANK_FACTOR
+    )
+    from embeddings import EmbeddingHandler
+    from embedding_scheduler import create_query_embedder
+    from chunking import split_documents
+    from vector_segment import SegmentStore
+    from ann_index import IVFFlatIndex
+    from corpus_version import CorpusVersion
+
+
+class LocalVectorStore:
+    """Vector store that keeps all chunk embeddings in one NumPy matrix.
+
+    Vectors are L2-normalized on insert and packed into a contiguous float32
+    matrix, so a query is a single matrix-vector product followed by
+    ``argpartition`` for the top-k. Exposes the same surface as
+    ``WeaviateVectorStore``.
+
+    When ``persist_dir`` is set, vectors and chunk records are kept in
+    memory-mapped segments on disk instead (see ``vector_segment``), so the
+    corpus survives restarts without re-embedding. ``VECTOR_QUANTIZATION``
+    then keeps int8 or PQ codes next to the vectors and reranks exactly.
+
+    With ``index_type="ivf"`` the in-memory store switches to an IVF-flat
+    approximate index once it holds ``IVF_MIN_TRAIN_ROWS`` chunks; below
+    that, exact search is already fast enough.
+    """
+
+    def __init__(self, embedding_handler: EmbeddingHandler = None,
+                 persist_dir: str = LOCAL_STORE_DIR, index_type: str = LOCAL_INDEX,
+                 quantization: str = VECTOR_QUANTIZATION):
+        """Initialize the store, reopening persisted segments if configured."""
+        self.embedding_handler = embedding_handler or EmbeddingHandler()
+        self.query_embedder = create_query_embedder(self.embedding_handler)
+        self.last_ingest_errors = []
+        # Bumped whenever the stored chunks change; lets answer caches invalidate.
+        # Persisted stores keep it next to the segments so every worker sees it
+        self._corpus_version = CorpusVersion(
+            str(Path(persist_dir) / "corpus_version") if persist_dir else None
+        )
+        self._lock = threading.Lock()
+        self.index_type = index_type
+        # Bumped when rows are renumbered, so an index trained on older rows is discarded
+        self._index_generation = 0
+        self._index_training = False
+        self.segments = None
+        if persist_dir:
+            if index_type != "flat":
+                print(f"Warning: LOCAL_INDEX={index_type} is only used by the in-memory store; "
+                      "persisted segments are searched exactly")
+            self.segments = SegmentStore(
+                persist_dir,
+                self.embedding_handler.get_embedding_dim(),
+                dtype=LOCAL_STORE_DTYPE,
+                max_segment_rows=LOCAL_SEGMENT_MAX_ROWS,
+                quantization=quantization,
+                pq_m=PQ_SUBQUANTIZERS,
+                rerank_factor=RERANK_FACTOR,
+                min_train_rows=QUANTIZATION_MIN_TRAIN_ROWS,
+                compact_dead_ratio=LOCAL_COMPACT_DEAD_RATIO
+            )
+        elif quantization != "none":
+            print(f"Warning: VECTOR_QUANTIZATION={quantization} needs LOCAL_STORE_DIR; "
+                  "the in-memory store keeps float32 vectors")
+        self._init_storage()
+
+    @property
+    def corpus_version(self) -> int:
+        """Version of the stored chunks, shared by every process using the same store."""
+        return self._corpus_version.value
+
+    def _init_storage(self):
+        """Reset the vector matrix and chunk records."""
+        self._vectors = np.empty((0, self.embedding_handler.get_embedding_dim()), dtype=np.float32)
+        self._count = 0
+        self._records: List[Dict[str, Any]] = []
+        self._ids: List[str] = []
+        self.index = None
+
+    def _index_due(self) -> bool:
+        """Whether the IVF index should be (re)trained now; the caller holds ``_lock``."""
+        return (self.index_type == "ivf" and self.index is None and not self._index_training
+                and self._count >= IVF_MIN_TRAIN_ROWS)
+
+    def _build_index(self):
+        """Train the IVF index outside the lock and swap it in.
+
+        k-means over the whole matrix takes seconds; retrievals keep using
+        exact search meanwhile instead of waiting for the lock. Stored rows are
+        never modified in place, so the snapshot stays valid while training;
+        rows appended in the meantime are added before the swap, and a delete
+        (which renumbers rows) discards the result and trains again.
+        """
+        while True:
+            with self._lock:
+                if not self._index_due():
+                    return
+                self._index_training = True
+                generation = self._index_generation
+                end = self._count
+                vectors = self._vectors[:end]
+            try:
+                index = IVFFlatIndex(vectors.shape[1], nlist=IVF_NLIST, nprobe=IVF_NPROBE)
+                index.train(vectors)
+                index.add(vectors, np.arange(end))
+                with self._lock:
+                    if generation == self._index_generation:
+                        index.add(self._vectors[end:self._count], np.arange(end, self._count))
+                        self.index = index
+            finally:
+                with self._lock:
+                    self._index_training = False
+
+    def _append(self, vectors: np.ndarray, records: List[Dict[str, Any]]) -> List[str]:
+        """Append L2-normalized vectors, growing the matrix geometrically."""
+        if self.segments is not None:
+            return self.segments.append(vectors, records)
+
+        with self._lock:
+            needed = self._count + len(vectors)
+            if needed > len(self._vectors):
+                capacity = max(needed, 2 * len(self._vectors), 1024)
+                grown = np.empty((capacity, self._vectors.shape[1]), dtype=np.float32)
+                grown[:self._count] = self._vectors[:self._count]
+                self._vectors = grown
+
+            self._vectors[self._count:needed] = vectors
+            chunk_ids = [str(uuid4()) for _ in records]
+            self._records.extend(records)
+            self._ids.extend(chunk_ids)
+            if self.index is not None:
+                self.index.add(vectors, np.arange(self._count, needed))
+            self._count = needed
+        self._build_index()
+        return chunk_ids
+
+    def add_documents(self, documents: List[Dict[str, Any]],
+                      batch_size: int = EMBEDDING_BATCH_SIZE,
+                      progress: Optional[Callable[[str, int, int], None]] = None,
+                      errors: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """Add documents to the vector store.
+
+        ``progress(stage, done, total)`` is called as the chunk, embed and
+        store stages advance. Failures are appended to ``errors`` (and
+        ``self.last_ingest_errors``); the ids of chunks stored before the
+        failure are still returned.
+        """
+        errors = [] if errors is None else errors
+        self.last_ingest_errors = errors
+        chunks = split_documents(documents)
+        if progress:
+            progress("chunk", len(chunks), len(chunks))
+
+        chunk_ids = []
+        try:
+            window = self.embedding_handler.ingest_window(batch_size)
+            for start in range(0, len(chunks), window):
+                batch_chunks = chunks[start:start + window]
+                embeddings = self.embedding_handler.embed_texts(
+                    [chunk["content"] for chunk in batch_chunks],
+                    batch_size=batch_size,
+                    normalize=True,
+                    use_pool=True
+                )
+                if progress:
+                    progress("embed", start + len(batch_chunks), len(chunks))
+                chunk_ids.extend(self._append(embeddings, batch_chunks))
+                if progress:
+                    progress("store", start + len(batch_chunks), len(chunks))
+        except Exception as e:
+            print(f"Error in add_documents: {e}")
+            errors.append({"uuid": "", "source": "", "chunk_index": None, "message": str(e)})
+
+        if chunk_ids:
+            self._corpus_version.bump()
+        return chunk_ids
+
+    def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Retrieve relevant documents for a query."""
+        try:
+            query_embedding = self.query_embedder.embed_text(query, normalize=True)
+            return self._search(query_embedding, top_k)
+        except Exception as e:
+            print(f"Error retrieving documents: {e}")
+            return []
+
+    def retrieve_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Retrieve for several queries with one embedding batch and one search pass."""
+        if not queries:
+            return []
+        try:
+            query_embeddings = self.query_embedder.embed_texts(queries, normalize=True)
+            return self._search_many(query_embeddings, top_k)
+        except Exception as e:
+            print(f"Error retrieving documents: {e}")
+            return [[] for _ in queries]
+
+    def _search_many(self, query_vectors: np.ndarray, top_k: int) -> List[List[Dict[str, Any]]]:
+        """Exact top-k for each row of ``query_vectors`` from a single matrix product."""
+        if self.segments is not None or self.index is not None:
+            return [self._search(query_vector, top_k) for query_vector in query_vectors]
+
+        with self._lock:
+            count = self._count
+            vectors = self._vectors[:count]
+            records = self._records[:count]
+
+        if count == 0 or top_k <= 0:
+            return [[] for _ in query_vectors]
+
+        scores = query_vectors @ vectors.T
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_scores, axis=1), axis=1)
+
+        return [
+            [{**records[i], "distance": float(1.0 - row_scores[i])} for i in row_top]
+            for row_scores, row_top in zip(scores, top)
+        ]
+
+    def _search(self, query_vector: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Exact cosine top-k over the stored matrix."""
+        if self.segments is not None:
+            return self.segments.search(query_vector, top_k)
+
+        with self._lock:
+            count = self._count
+            vectors = self._vectors[:count]
+            records = self._records[:count]
+            index = self.index
+
+        if count == 0 or top_k <= 0:
+            return []
+
+        if index is not None:
+            # The index is searched outside the lock, so it may already hold
+            # rows appended after the snapshot; those are skipped
+            scores, rows = index.search(query_vector, top_k)
+            return [
+                {**records[row], "distance": float(1.0 - score)}
+                for score, row in zip(scores, rows)
+                if row < count
+            ]
+
+        scores = vectors @ query_vector
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {**records[i], "distance": float(1.0 - scores[i])}
+            for i in top
+        ]
+
+    def delete_all(self):
+        """Delete all documents from the vector store."""
+        if self.segments is not None:
+            self.segments.delete_all()
+        with self._lock:
+            self._init_storage()
+            self._index_generation += 1
+        self._corpus_version.bump()
+
+    def delete_source(self, source: str) -> int:
+        """Delete every chunk of ``source``; returns the number removed."""
+        if self.segments is not None:
+            removed = self.segments.delete_source(source)
+        else:
+            with self._lock:
+                keep = [i for i in range(self._count) if self._records[i].get("source") != source]
+                removed = self._count - len(keep)
+                if removed:
+                    self._vectors = np.ascontiguousarray(self._vectors[keep])
+                    self._records = [self._records[i] for i in keep]
+                    self._ids = [self._ids[i] for i in keep]
+                    self._count = len(keep)
+                    # Row numbers shifted, so the ANN index is rebuilt from scratch
+                    self.index = None
+                    self._index_generation += 1
+            self._build_index()
+
+        if removed:
+            self._corpus_version.bump()
+        return removed
+
+    def compact(self) -> Dict[str, int]:
+        """Merge on-disk segments and drop deleted chunks."""
+        if self.segments is None:
+            return {}
+        return self.segments.compact()
+
+    def health_check(self) -> bool:
+        """The in-process store is always available."""
+        return True
+
+    def __len__(self) -> int:
+        if self.segments is not None:
+            return len(self.segments)
+        return self._count
@@ -1,21 +1,27 @@
 """FastAPI server for the document QA system."""
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
 import tempfile
+import json
 import os
+import threading
 from pathlib import Path
 
 try:
     from .qa_agent import DocumentQAAgent
     from .document_loader import DocumentLoader
-    from .config import API_HOST, API_PORT
+    from .ingestion_jobs import IngestionJobQueue, IngestionJob, IngestionQueueFull
+    from .config import API_HOST, API_PORT, WARM_UP_ON_STARTUP, UPLOAD_CHUNK_SIZE
 except ImportError:
     from qa_agent import DocumentQAAgent
     from document_loader import DocumentLoader
-    from config import API_HOST, API_PORT
+    from ingestion_jobs import IngestionJobQueue, IngestionJob, IngestionQueueFull
+    from config import API_HOST, API_PORT, WARM_UP_ON_STARTUP, UPLOAD_CHUNK_SIZE
 
 
 # Initialize FastAPI app
@@ -34,9 +40,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-agent = DocumentQAAgent()
-document_loader = DocumentLoader()
+# Components are created on first use so importing this module (and every
+# uvicorn worker start) stays fast.
+_agent: Optional[DocumentQAAgent] = None
+_document_loader: Optional[DocumentLoader] = None
+_components_lock = threading.Lock()
+
+
+def get_agent() -> DocumentQAAgent:
+    """Return the process-wide QA agent, creating it on first use."""
+    global _agent
+    if _agent is None:
+        with _components_lock:
+            if _agent is None:
+                _agent = DocumentQAAgent()
+    return _agent
+
+
+def get_document_loader() -> DocumentLoader:
+    """Return the process-wide document loader, creating it on first use."""
+    global _document_loader
+    if _document_loader is None:
+        with _components_lock:
+            if _document_loader is None:
+                _document_loader = DocumentLoader()
+    return _document_loader
+
+
+# Uploads are ingested in the background; see /jobs/{job_id}
+ingestion_jobs = IngestionJobQueue(get_document_loader, get_agent)
+
+
+@app.on_event("startup")
+async def warm_up_components():
+    """Load models and connect to services in the background when configured."""
+    if WARM_UP_ON_STARTUP:
+        threading.Thread(target=get_agent().warm_up, name="warm-up", daemon=True).start()
 
 
 # Pydantic models
@@ -45,6 +84,7 @@ class QuestionRequest(BaseModel):
     query: str
     use_decomposition: bool = True
     top_k: int = 5
+    use_cache: bool = True
 
 
 class QuestionResponse(BaseModel):
@@ -55,6 +95,7 @@ class QuestionResponse(BaseModel):
     confidence: Optional[float] = None
     sub_questions: Optional[List[str]] = None
     contexts_used: Optional[int] = None
+    cache: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 
@@ -79,7 +120,13 @@ async def root():
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    return agent.health_check()
+    return await get_agent().ahealth_check()
+
+
+@app.get("/cache-stats", tags=["Health"])
+async def cache_stats():
+    """Cache hit rates for LLM responses and embeddings, and query-embedding batch sizes."""
+    return get_agent().cache_stats()
 
 
 @app.post("/ask", response_model=QuestionResponse, tags=["QA"])
@@ -88,10 +135,11 @@ async def ask_question(request: QuestionRequest):
     if not request.query:
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
-    result = agent.answer_question(
+    result = await get_agent().aanswer_question(
         query=request.query,
         use_decomposition=request.use_decomposition,
-        top_k=request.top_k
+        top_k=request.top_k,
+        use_cache=request.use_cache
     )
 
     if result["success"]:
@@ -111,60 +159,122 @@ async def ask_question(request: QuestionRequest):
         )
 
 
-@app.post("/upload", tags=["Documents"])
-async def upload_document(file: UploadFile = File(...)):
-    """Upload and ingest a document."""
-    try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-
-        # Load document
-        documents = document_loader.load_documents(tmp_file_path)
-        
-        # Add to vector store
-        result = agent.load_documents(documents)
-
-        # Clean up
-        os.unlink(tmp_file_path)
+@app.post("/ask/stream", tags=["QA"])
+async def ask_question_stream(request: QuestionRequest):
+    """Ask a question and receive the answer as Server-Sent Events.
 
-        return {
-            "success": result["success"],
-            "filename": file.filename,
-            "documents_processed": result.get("documents_processed", 0),
-            "chunks_created": result.get("chunks_created", 0),
-            "message": f"Processed {result.get('documents_processed', 0)} documents" if result["success"] else result.get("error")
-        }
+    Events: ``decomposition`` and ``retrieval`` as those stages finish,
+    ``token`` for each piece of the answer while it is generated, then
+    ``done`` with the full response (or ``error``).
+    """
+    if not request.query:
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    async def events():
+        async for event, data in get_agent().astream_answer(
+            query=request.query,
+            use_decomposition=request.use_decomposition,
+            top_k=request.top_k,
+            use_cache=request.use_cache
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _save_upload(file: UploadFile) -> Tuple[str, str]:
+    """Stream an uploaded file to a temporary path; returns (path, sha256 hex digest).
+
+    The body is copied UPLOAD_CHUNK_SIZE bytes at a time, so memory use per
+    upload stays constant regardless of the file size.
+    """
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
+        try:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await asyncio.to_thread(tmp_file.write, chunk)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+        return tmp_file.name, digest.hexdigest()
+
+
+def _queue_full_error(e: IngestionQueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _job_summary(job: IngestionJob, created: bool = True) -> Dict[str, Any]:
+    summary = {"job_id": job.id, "filename": job.filename, "status": job.status}
+    if not created:
+        # Identical bytes were already ingested or are in progress
+        summary["duplicate"] = True
+    return summary
+
+
+@app.post("/upload", tags=["Documents"], status_code=202)
+async def upload_document(file: UploadFile = File(...),
+                          wait: bool = Query(False, description="Block until ingestion finishes")):
+    """Upload a document and queue it for ingestion.
+
+    Returns a job id immediately; poll ``/jobs/{job_id}`` for progress. With
+    ``wait=true`` the response is sent once the document has been ingested.
+    """
+    if ingestion_jobs.full():
+        raise _queue_full_error(IngestionQueueFull("Ingestion queue is full"))
+
+    try:
+        tmp_file_path, content_hash = await _save_upload(file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+    try:
+        job, created = ingestion_jobs.submit(tmp_file_path, file.filename, content_hash=content_hash)
+    except IngestionQueueFull as e:
+        os.unlink(tmp_file_path)
+        raise _queue_full_error(e)
 
-@app.post("/upload-batch", tags=["Documents"])
-async def upload_batch(files: List[UploadFile] = File(...)):
-    """Upload and ingest multiple documents."""
-    results = []
-    total_chunks = 0
+    if not wait:
+        return {"success": True, **_job_summary(job, created)}
 
-    for file in files:
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_file_path = tmp_file.name
+    await asyncio.to_thread(job.wait)
+    result = job.result or {}
+    return {
+        "success": job.status == "completed",
+        **_job_summary(job, created),
+        "filename": file.filename,
+        "documents_processed": result.get("documents_processed", 0),
+        "chunks_created": result.get("chunks_created", 0),
+        "pdf_pages": result.get("pdf_pages"),
+        "message": f"Processed {result.get('documents_processed', 0)} documents" if job.status == "completed" else job.error
+    }
 
-            documents = document_loader.load_documents(tmp_file_path)
-            result = agent.load_documents(documents)
 
-            os.unlink(tmp_file_path)
+@app.post("/upload-batch", tags=["Documents"], status_code=202)
+async def upload_batch(files: List[UploadFile] = File(...),
+                       wait: bool = Query(False, description="Block until ingestion finishes")):
+    """Upload multiple documents, queueing one ingestion job per file."""
+    jobs = []
+    results = []
 
-            results.append({
-                "filename": file.filename,
-                "success": result["success"],
-                "chunks_created": result.get("chunks_created", 0)
-            })
-            total_chunks += result.get("chunks_created", 0)
+    for file in files:
+        try:
+            tmp_file_path, content_hash = await _save_upload(file)
+            try:
+                job, created = ingestion_jobs.submit(tmp_file_path, file.filename, content_hash=content_hash)
+            except IngestionQueueFull:
+                os.unlink(tmp_file_path)
+                raise
+            jobs.append(job)
+            results.append({"success": True, **_job_summary(job, created)})
         except Exception as e:
             results.append({
                 "filename": file.filename,
@@ -172,6 +282,25 @@ async def upload_batch(files: List[UploadFile] = File(...)):
                 "error": str(e)
             })
 
+    if not wait:
+        return {
+            "success": True,
+            "total_files": len(files),
+            "file_results": results
+        }
+
+    total_chunks = 0
+    for job, file_result in zip(jobs, [r for r in results if r["success"]]):
+        await asyncio.to_thread(job.wait)
+        chunks_created = (job.result or {}).get("chunks_created", 0)
+        file_result.update(
+            status=job.status,
+            success=job.status == "completed",
+            chunks_created=chunks_created,
+            **({"error": job.error} if job.error else {})
+        )
+        total_chunks += chunks_created
+
     return {
         "success": True,
         "total_files": len(files),
@@ -180,26 +309,43 @@ async def upload_batch(files: List[UploadFile] = File(...)):
     }
 
 
+@app.get("/jobs", tags=["Documents"])
+async def list_jobs():
+    """Ingestion queue depth and job counts by status."""
+    return ingestion_jobs.stats()
+
+
+@app.get("/jobs/{job_id}", tags=["Documents"])
+async def get_job(job_id: str):
+    """Status, per-stage progress and throughput of an ingestion job."""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
 @app.delete("/documents", tags=["Documents"])
 async def clear_documents():
     """Clear all documents from the vector store."""
-    result = agent.clear_documents()
+    result = await get_agent().aclear_documents()
+    ingestion_jobs.forget_content()
     return result
 
 
 @app.get("/conversation-history", tags=["History"])
 async def get_history():
     """Get conversation history."""
+    history = get_agent().get_conversation_history()
     return {
-        "count": len(agent.get_conversation_history()),
-        "history": agent.get_conversation_history()
+        "count": len(history),
+        "history": history
     }
 
 
 @app.get("/conversation-history/clear", tags=["History"])
 async def clear_history():
     """Clear conversation history."""
-    agent.conversation_history = []
+    get_agent().conversation_history = []
     return {"success": True, "message": "Conversation history cleared"}
 
 
@@ -0,0 +1,91 @@
+"""Multi-process OCR pool for scanned PDF pages."""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Tuple
+
+try:
+    from .config import OCR_DPI, OCR_PAGE_WINDOW
+except ImportError:
+    from config import OCR_DPI, OCR_PAGE_WINDOW
+
+
+def _init_worker():
+    """Keep tesseract single-threaded; the pool provides the parallelism."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def page_windows(page_numbers: List[int], window: int = OCR_PAGE_WINDOW) -> List[List[int]]:
+    """Split page numbers into runs of consecutive pages, at most ``window`` long."""
+    windows: List[List[int]] = []
+    for page_number in page_numbers:
+        if windows and page_number == windows[-1][-1] + 1 and len(windows[-1]) < window:
+            windows[-1].append(page_number)
+        else:
+            windows.append([page_number])
+    return windows
+
+
+def ocr_pdf_window(file_path: str, page_numbers: List[int], dpi: int = OCR_DPI) -> List[str]:
+    """Rasterize consecutive pages of ``file_path`` in grayscale and OCR them.
+
+    Only this window's images are in memory; each is closed as soon as it
+    has been recognized.
+    """
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(
+        file_path, dpi=dpi, grayscale=True,
+        first_page=page_numbers[0], last_page=page_numbers[-1]
+    )
+    texts = []
+    while images:
+        image = images.pop(0)
+        try:
+            texts.append(pytesseract.image_to_string(image))
+        finally:
+            image.close()
+    return texts
+
+
+def iter_ocr_pages(file_path: str, page_numbers: List[int], window: int = OCR_PAGE_WINDOW,
+                   dpi: int = OCR_DPI) -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_number, text)`` for the given pages, one window at a time."""
+    for pages in page_windows(page_numbers, window):
+        yield from zip(pages, ocr_pdf_window(file_path, pages, dpi))
+
+
+class OCRWorkerPool:
+    """Rasterizes and recognizes PDF pages in worker processes.
+
+    Every task is a small window of consecutive pages: the worker renders
+    just those pages with poppler and runs tesseract on them, so only the
+    file path and the recognized text cross the process boundary and peak
+    memory depends on the window size, not the page count. Results come
+    back in page order.
+    """
+
+    def __init__(self, num_workers: int):
+        """Start ``num_workers`` spawned processes."""
+        self.num_workers = num_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    def iter_ocr_pages(self, file_path: str, page_numbers: List[int], window: int = OCR_PAGE_WINDOW,
+                       dpi: int = OCR_DPI) -> Iterator[Tuple[int, str]]:
+        """Yield ``(page_number, text)`` for the given (1-based) pages, in the same order."""
+        # Smaller windows for short documents so every worker gets pages
+        window = max(1, min(window, -(-len(page_numbers) // self.num_workers)))
+        windows = page_windows(page_numbers, window)
+        results = self._executor.map(ocr_pdf_window, repeat(file_path), windows, repeat(dpi))
+        for pages, texts in zip(windows, results):
+            yield from zip(pages, texts)
+
+    def close(self):
+        """Shut the worker processes down."""
+        self._executor.shutdown(wait=True)
@@ -1,19 +1,48 @@
 """Agentic QA system using LangGraph for document question answering."""
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Callable
 from enum import Enum
-import json
+import asyncio
+import time
+import threading
 from datetime import datetime
 
 try:
-    from .vector_store import WeaviateVectorStore
     from .query_decomposer import QueryDecomposer
     from .answer_synthesizer import AnswerSynthesizer
     from .llm_interface import LocalLLM
+    from .answer_cache import SemanticAnswerCache
+    from .reranker import create_reranker
+    from .config import (
+        VECTOR_STORE_BACKEND, ANSWER_CACHE_ENABLED, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_ENTRIES,
+        ANSWER_CACHE_TTL_SECONDS
+    )
 except ImportError:
-    from vector_store import WeaviateVectorStore
     from query_decomposer import QueryDecomposer
     from answer_synthesizer import AnswerSynthesizer
     from llm_interface import LocalLLM
+    from answer_cache import SemanticAnswerCache
+    from reranker import create_reranker
+    from config import (
+        VECTOR_STORE_BACKEND, ANSWER_CACHE_ENABLED, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_ENTRIES,
+        ANSWER_CACHE_TTL_SECONDS
+    )
+
+
+def create_vector_store(backend: str = VECTOR_STORE_BACKEND):
+    """Create the vector store selected by VECTOR_STORE_BACKEND."""
+    if backend == "local":
+        try:
+            from .local_vector_store import LocalVectorStore
+        except ImportError:
+            from local_vector_store import LocalVectorStore
+        return LocalVectorStore()
+    if backend == "weaviate":
+        try:
+            from .vector_store import WeaviateVectorStore
+        except ImportError:
+            from vector_store import WeaviateVectorStore
+        return WeaviateVectorStore()
+    raise ValueError(f"Unknown vector store backend: {backend}")
 
 
 class AgentState(str, Enum):
@@ -26,63 +55,252 @@ class AgentState(str, Enum):
 
 
 class DocumentQAAgent:
-    """Agentic system for document-based question answering."""
+    """Agentic system for document-based question answering.
+
+    Components are built on first use so constructing the agent is cheap;
+    call ``warm_up`` to load the embedding model and connect to the vector
+    store ahead of the first request.
+    """
 
     def __init__(self):
         """Initialize the QA agent."""
-        self.vector_store = WeaviateVectorStore()
-        self.decomposer = QueryDecomposer()
-        self.synthesizer = AnswerSynthesizer()
-        self.llm = LocalLLM()
+        self._components: Dict[str, Any] = {}
+        # Reentrant: factories build the components they depend on
+        self._components_lock = threading.RLock()
         self.conversation_history = []
 
-    def answer_question(self, query: str, use_decomposition: bool = True, top_k: int = 5) -> Dict[str, Any]:
-        """Answer a user question using the document QA pipeline."""
-        
-        execution_log = {
+    def _component(self, name: str, factory):
+        """Return the named component, creating it once on first access."""
+        if name not in self._components:
+            with self._components_lock:
+                if name not in self._components:
+                    self._components[name] = factory()
+        return self._components[name]
+
+    @property
+    def vector_store(self):
+        return self._component("vector_store", create_vector_store)
+
+    @property
+    def decomposer(self) -> QueryDecomposer:
+        return self._component("decomposer", lambda: QueryDecomposer(llm=self.llm))
+
+    @property
+    def synthesizer(self) -> AnswerSynthesizer:
+        return self._component("synthesizer", self._create_synthesizer)
+
+    def _create_synthesizer(self) -> AnswerSynthesizer:
+        """Build the synthesizer so reranking and MMR share the vector store's embedding model."""
+        embedder = getattr(self.vector_store, "embedding_handler", None)
+        reranker = create_reranker(embedder=embedder, llm=self.llm)
+        return AnswerSynthesizer(llm=self.llm, reranker=reranker, embedder=embedder)
+
+    @property
+    def llm(self) -> LocalLLM:
+        return self._component("llm", LocalLLM)
+
+    @property
+    def answer_cache(self) -> Optional[SemanticAnswerCache]:
+        return self._component("answer_cache", self._create_answer_cache)
+
+    def _create_answer_cache(self) -> Optional[SemanticAnswerCache]:
+        """Build the answer cache on the vector store's query embedder, if there is one."""
+        embedder = getattr(self.vector_store, "query_embedder", None)
+        if not ANSWER_CACHE_ENABLED or embedder is None:
+            return None
+        return SemanticAnswerCache(
+            embedder,
+            embedder.get_embedding_dim(),
+            threshold=ANSWER_CACHE_THRESHOLD,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS
+        )
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Build every component and load the embedding model now."""
+        start = time.perf_counter()
+        _ = self.decomposer, self.synthesizer, self.llm
+        embedding_handler = getattr(self.vector_store, "embedding_handler", None)
+        if embedding_handler is not None:
+            embedding_handler.warm_up()
+        return {
+            "success": True,
+            "warm_up_seconds": round(time.perf_counter() - start, 3),
+            "vector_store_ready": self.vector_store.health_check()
+        }
+
+    async def _abuild(self, *names: str):
+        """Build the named components in a worker thread if they don't exist yet.
+
+        The first vector store access connects to Weaviate or loads the
+        embedding model, and the LLM may open its SQLite cache; none of that
+        may run on the event loop.
+        """
+        if any(name not in self._components for name in names):
+            await asyncio.to_thread(lambda: [getattr(self, name) for name in names])
+
+    def _start_log(self, query: str) -> Dict[str, Any]:
+        return {
             "timestamp": datetime.now().isoformat(),
             "query": query,
             "state": AgentState.DECOMPOSING.value,
             "steps": []
         }
 
+    def _cached_answer(self, query: str, use_decomposition: bool, top_k: int,
+                       use_cache: bool) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple]]:
+        """Look the query up in the semantic answer cache.
+
+        Returns ``(response, None)`` on a hit. On a miss it returns
+        ``(None, pending)``, where ``pending`` is handed to ``_complete`` so
+        the new answer gets stored; ``pending`` is ``None`` if caching is off.
+        """
+        if not use_cache:
+            return None, None
+        start = time.perf_counter()
         try:
-            # Step 1: Query Decomposition
-            if use_decomposition:
-                sub_questions = self.decomposer.decompose_adaptive(query)
-                execution_log["steps"].append({
-                    "stage": "decomposition",
-                    "sub_questions": sub_questions
-                })
-            else:
-                sub_questions = [query]
-                execution_log["steps"].append({
-                    "stage": "decomposition",
-                    "sub_questions": sub_questions
-                })
-
-            # Step 2: Retrieval for each sub-question
-            execution_log["state"] = AgentState.RETRIEVING.value
-            all_contexts = []
-            retrieval_details = []
-
-            for sub_q in sub_questions:
-                contexts = self.vector_store.retrieve(sub_q, top_k=top_k)
-                contexts_text = [c["content"] for c in contexts]
-                all_contexts.extend(contexts_text)
-                
-                retrieval_details.append({
-                    "sub_question": sub_q,
-                    "retrieved_count": len(contexts_text),
-                    "sources": [c.get("source", "unknown") for c in contexts]
-                })
+            answer_cache = self.answer_cache
+            if answer_cache is None:
+                return None, None
+            params = (use_decomposition, top_k)
+            corpus_version = getattr(self.vector_store, "corpus_version", 0)
+            query_vector, entry, similarity = answer_cache.lookup(query, params, corpus_version)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            return None, None
+
+        if entry is None:
+            return None, (query_vector, params, corpus_version)
+
+        response = {
+            **entry["response"],
+            "query": query,
+            "cache": {
+                "hit": True,
+                "matched_query": entry["query"],
+                "similarity": round(similarity, 4),
+                "cached_at": datetime.fromtimestamp(entry["cached_at"]).isoformat(),
+                "corpus_version": corpus_version
+            },
+            "execution_log": {
+                "timestamp": datetime.now().isoformat(),
+                "query": query,
+                "state": AgentState.COMPLETED.value,
+                "steps": [{
+                    "stage": "answer_cache",
+                    "matched_query": entry["query"],
+                    "similarity": round(similarity, 4),
+                    "lookup_ms": round((time.perf_counter() - start) * 1000.0, 2)
+                }]
+            }
+        }
+        self.conversation_history.append(response)
+        return response, None
+
+    def _log_retrieval(self, execution_log: Dict[str, Any], sub_questions: List[str],
+                       retrieved: List[List[Dict[str, Any]]]) -> List[str]:
+        """Record per-sub-question retrieval results; returns the merged context texts.
+
+        Chunks returned for more than one sub-question are kept once, at
+        their first position.
+        """
+        all_contexts = []
+        seen_chunks = set()
+        retrieval_details = []
+
+        for sub_q, contexts in zip(sub_questions, retrieved):
+            for c in contexts:
+                chunk_key = (c.get("source"), c.get("chunk_index"), c["content"])
+                if chunk_key not in seen_chunks:
+                    seen_chunks.add(chunk_key)
+                    all_contexts.append(c["content"])
+            
+            retrieval_details.append({
+                "sub_question": sub_q,
+                "retrieved_count": len(contexts),
+                "sources": [c.get("source", "unknown") for c in contexts]
+            })
+
+        execution_log["steps"].append({
+            "stage": "retrieval",
+            "total_contexts": len(all_contexts),
+            "duplicates_removed": sum(len(contexts) for contexts in retrieved) - len(all_contexts),
+            "details": retrieval_details
+        })
+        return all_contexts
+
+    def _complete(self, query: str, synthesis_result: Dict[str, Any],
+                  execution_log: Dict[str, Any], pending_cache: Optional[Tuple] = None) -> Dict[str, Any]:
+        """Log the synthesis step and build the final response."""
+        execution_log["steps"].append({
+            "stage": "synthesis",
+            "contexts_used": synthesis_result["contexts_used"],
+            "context_tokens": synthesis_result.get("context_tokens"),
+            "prompt_tokens": synthesis_result.get("prompt_tokens"),
+            "confidence": synthesis_result["confidence"]
+        })
+
+        # Step 4: Compile response
+        execution_log["state"] = AgentState.COMPLETED.value
+
+        response = {
+            "success": True,
+            "query": query,
+            "answer": synthesis_result["answer"],
+            "confidence": synthesis_result["confidence"],
+            "sub_questions": synthesis_result.get("sub_questions", []),
+            "contexts_used": synthesis_result["contexts_used"],
+            "execution_log": execution_log
+        }
+
+        # An empty answer means generation failed; don't serve it to later paraphrases
+        if pending_cache is not None and synthesis_result["answer"].strip():
+            query_vector, params, corpus_version = pending_cache
+            cached_response = {key: value for key, value in response.items() if key != "execution_log"}
+            self.answer_cache.store(query_vector, query, params, cached_response, corpus_version)
+
+        # Add to conversation history
+        self.conversation_history.append(response)
+        
+        return response
+
+    def _fail(self, query: str, error: Exception, execution_log: Dict[str, Any]) -> Dict[str, Any]:
+        execution_log["state"] = AgentState.ERROR.value
+        execution_log["error"] = str(error)
+        
+        return {
+            "success": False,
+            "query": query,
+            "error": str(error),
+            "execution_log": execution_log
+        }
 
+    def answer_question(self, query: str, use_decomposition: bool = True, top_k: int = 5,
+                        use_cache: bool = True) -> Dict[str, Any]:
+        """Answer a user question using the document QA pipeline.
+
+        Paraphrases of an already answered question are served from the
+        semantic answer cache unless ``use_cache`` is False.
+        """
+        cached_response, pending_cache = self._cached_answer(query, use_decomposition, top_k, use_cache)
+        if cached_response is not None:
+            return cached_response
+
+        execution_log = self._start_log(query)
+
+        try:
+            # Step 1: Query Decomposition
+            sub_questions = self.decomposer.decompose_adaptive(query) if use_decomposition else [query]
             execution_log["steps"].append({
-                "stage": "retrieval",
-                "total_contexts": len(all_contexts),
-                "details": retrieval_details
+                "stage": "decomposition",
+                "sub_questions": sub_questions
             })
 
+            # Step 2: Retrieval for all sub-questions in one batch
+            execution_log["state"] = AgentState.RETRIEVING.value
+            retrieved = self.vector_store.retrieve_many(sub_questions, top_k=top_k)
+            all_contexts = self._log_retrieval(execution_log, sub_questions, retrieved)
+
             # Step 3: Answer Synthesis
             execution_log["state"] = AgentState.SYNTHESIZING.value
             
@@ -95,45 +313,122 @@ class DocumentQAAgent:
                 sub_questions=sub_questions
             )
 
-            execution_log["steps"].append({
-                "stage": "synthesis",
-                "contexts_used": synthesis_result["contexts_used"],
-                "confidence": synthesis_result["confidence"]
-            })
+            return self._complete(query, synthesis_result, execution_log, pending_cache)
 
-            # Step 4: Compile response
-            execution_log["state"] = AgentState.COMPLETED.value
+        except Exception as e:
+            return self._fail(query, e, execution_log)
 
-            response = {
-                "success": True,
-                "query": query,
-                "answer": synthesis_result["answer"],
-                "confidence": synthesis_result["confidence"],
-                "sub_questions": synthesis_result.get("sub_questions", []),
-                "contexts_used": synthesis_result["contexts_used"],
-                "execution_log": execution_log
-            }
+    async def _aretrieve_stages(self, query: str, use_decomposition: bool, top_k: int,
+                                execution_log: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Decompose, retrieve and rerank asynchronously.
 
-            # Add to conversation history
-            self.conversation_history.append(response)
-            
-            return response
+        Yields each stage's log entry as it completes (``decomposition``,
+        ``retrieval``) and finally ``("contexts", (sub_questions, reranked_contexts))``.
+        """
+        sub_questions = await self.decomposer.adecompose_adaptive(query) if use_decomposition else [query]
+        execution_log["steps"].append({
+            "stage": "decomposition",
+            "sub_questions": sub_questions
+        })
+        yield "decomposition", execution_log["steps"][-1]
+
+        execution_log["state"] = AgentState.RETRIEVING.value
+        retrieved = await asyncio.to_thread(self.vector_store.retrieve_many, sub_questions, top_k)
+        all_contexts = self._log_retrieval(execution_log, sub_questions, retrieved)
+        yield "retrieval", execution_log["steps"][-1]
+
+        execution_log["state"] = AgentState.SYNTHESIZING.value
+        reranked_contexts = await self.synthesizer.arerank_contexts(query, all_contexts)
+        yield "contexts", (sub_questions, reranked_contexts)
+
+    async def aanswer_question(self, query: str, use_decomposition: bool = True, top_k: int = 5,
+                               use_cache: bool = True) -> Dict[str, Any]:
+        """Async variant of ``answer_question`` that never blocks the event loop.
+
+        LLM calls go through the async client; retrieval and the answer cache
+        lookup (CPU embedding and the vector store client) run in a worker thread.
+        """
+        await self._abuild("vector_store", "decomposer", "synthesizer")
+        cached_response, pending_cache = await asyncio.to_thread(
+            self._cached_answer, query, use_decomposition, top_k, use_cache
+        )
+        if cached_response is not None:
+            return cached_response
+
+        execution_log = self._start_log(query)
+
+        try:
+            async for event, data in self._aretrieve_stages(query, use_decomposition, top_k, execution_log):
+                if event == "contexts":
+                    sub_questions, reranked_contexts = data
+            synthesis_result = await self.synthesizer.asynthesize(
+                query=query,
+                contexts=reranked_contexts,
+                sub_questions=sub_questions
+            )
+
+            return self._complete(query, synthesis_result, execution_log, pending_cache)
 
         except Exception as e:
-            execution_log["state"] = AgentState.ERROR.value
-            execution_log["error"] = str(e)
-            
-            return {
-                "success": False,
-                "query": query,
-                "error": str(e),
-                "execution_log": execution_log
-            }
+            return self._fail(query, e, execution_log)
+
+    async def astream_answer(self, query: str, use_decomposition: bool = True, top_k: int = 5,
+                             use_cache: bool = True) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Answer a question as a stream of ``(event, data)`` pairs.
+
+        Emits ``decomposition`` and ``retrieval`` once those stages finish,
+        ``token`` for every piece of generated answer text, and finally
+        ``done`` with the same response ``aanswer_question`` returns (or
+        ``error``). A cached answer is sent as a single ``token``.
+        """
+        await self._abuild("vector_store", "decomposer", "synthesizer")
+        cached_response, pending_cache = await asyncio.to_thread(
+            self._cached_answer, query, use_decomposition, top_k, use_cache
+        )
+        if cached_response is not None:
+            yield "token", {"text": cached_response["answer"]}
+            yield "done", cached_response
+            return
+
+        execution_log = self._start_log(query)
+
+        try:
+            async for event, data in self._aretrieve_stages(query, use_decomposition, top_k, execution_log):
+                if event == "contexts":
+                    sub_questions, reranked_contexts = data
+                else:
+                    yield event, data
 
-    def load_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Load documents into the vector store."""
+            synthesis_result = None
+            async for kind, value in self.synthesizer.astream_synthesize(
+                query=query,
+                contexts=reranked_contexts,
+                sub_questions=sub_questions
+            ):
+                if kind == "token":
+                    yield "token", {"text": value}
+                else:
+                    synthesis_result = value
+
+            yield "done", self._complete(query, synthesis_result, execution_log, pending_cache)
+
+        except Exception as e:
+            yield "error", self._fail(query, e, execution_log)
+
+    def load_documents(self, documents: List[Dict[str, Any]],
+                       progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """Load documents into the vector store, reporting stage progress to ``progress``."""
         try:
-            chunk_ids = self.vector_store.add_documents(documents)
+            errors: List[Dict[str, Any]] = []
+            chunk_ids = self.vector_store.add_documents(documents, progress=progress, errors=errors)
+            if errors:
+                return {
+                    "success": False,
+                    "error": f"{len(errors)} ingestion error(s), first: {errors[0]['message']}",
+                    "documents_processed": len(documents),
+                    "chunks_created": len(chunk_ids),
+                    "chunk_ids": chunk_ids
+                }
             return {
                 "success": True,
                 "documents_processed": len(documents),
@@ -151,10 +446,45 @@ class DocumentQAAgent:
         self.vector_store.delete_all()
         return {"success": True, "message": "All documents cleared"}
 
+    async def aclear_documents(self):
+        """Clear all documents in a worker thread; deletes touch disk or the network."""
+        return await asyncio.to_thread(self.clear_documents)
+
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Get the conversation history."""
         return self.conversation_history
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for the caches, plus query-embedding batch sizes."""
+        stats = {"llm": self.llm.cache_stats()}
+        # Only report embeddings once the store exists; don't build it just for stats
+        vector_store = self._components.get("vector_store")
+        embedding_handler = getattr(vector_store, "embedding_handler", None)
+        if embedding_handler is not None:
+            stats["embeddings"] = embedding_handler.cache_stats()
+        # The query embedder is an EmbeddingScheduler unless micro-batching is disabled
+        scheduler_stats = getattr(getattr(vector_store, "query_embedder", None), "stats", None)
+        if scheduler_stats is not None:
+            stats["embedding_scheduler"] = scheduler_stats()
+        answer_cache = self._components.get("answer_cache")
+        if answer_cache is not None:
+            stats["answers"] = answer_cache.stats()
+        retrieval_flights = getattr(vector_store, "retrieval_flights", None)
+        if retrieval_flights is not None:
+            stats["retrieval_single_flight"] = retrieval_flights.stats()
+        return stats
+
+    async def ahealth_check(self) -> Dict[str, Any]:
+        """Check system health without blocking the event loop."""
+        await self._abuild("vector_store", "llm")
+        vector_store_ready = await asyncio.to_thread(self.vector_store.health_check)
+        llm_available = await self.llm.ais_available()
+        return {
+            "vector_store_ready": vector_store_ready,
+            "llm_available": llm_available,
+            "system_status": "operational" if vector_store_ready and llm_available else "degraded"
+        }
+
     def health_check(self) -> Dict[str, Any]:
         """Check system health."""
         return {
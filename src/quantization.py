@@ -0,0 +1,151 @@
+"""Scalar (int8) and product quantization codecs for stored chunk vectors.
+
+Both codecs turn float32 vectors into compact ``uint8`` codes and score a
+float32 query directly against the codes (asymmetric distance computation),
+so a search only needs the full-precision vectors of its final candidates.
+"""
+from typing import Optional
+
+import numpy as np
+
+SCORE_BLOCK_ROWS = 65536
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 15, seed: int = 0) -> np.ndarray:
+    """Euclidean k-means (Lloyd's algorithm); returns the centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        distances = (
+            (vectors ** 2).sum(axis=1, keepdims=True)
+            - 2 * vectors @ centroids.T
+            + (centroids ** 2).sum(axis=1)
+        )
+        labels = np.argmin(distances, axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+    return centroids.astype(np.float32)
+
+
+class ScalarQuantizer:
+    """Symmetric per-dimension int8 quantization (4x smaller than float32)."""
+
+    kind = "int8"
+
+    def __init__(self, dim: int, scale: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.scale = scale
+
+    @property
+    def code_size(self) -> int:
+        return self.dim
+
+    def train(self, vectors: np.ndarray):
+        """Fit one scale per dimension from the largest absolute value seen."""
+        scale = np.abs(vectors).max(axis=0).astype(np.float32) / 127.0
+        scale[scale == 0] = 1.0
+        self.scale = scale
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+        return codes.view(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.view(np.int8).astype(np.float32) * self.scale
+
+    def adc_scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Inner products between ``query`` and every coded vector."""
+        scaled_query = (query * self.scale).astype(np.float32)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].view(np.int8).astype(np.float32)
+            scores[start:start + len(block)] = block @ scaled_query
+        return scores
+
+    def save(self, path: str):
+        np.savez(path, kind=self.kind, dim=self.dim, scale=self.scale)
+
+
+class ProductQuantizer:
+    """Product quantization: ``m`` sub-vectors, each coded with one byte.
+
+    With all-MiniLM-L6-v2 (384 dims) and ``m=48`` a vector shrinks from
+    1536 bytes to 48 bytes (32x).
+    """
+
+    kind = "pq"
+
+    def __init__(self, dim: int, m: int = 48, codebooks: Optional[np.ndarray] = None):
+        if dim % m:
+            raise ValueError(f"Embedding dimension {dim} is not divisible by m={m}")
+        self.dim = dim
+        self.m = m
+        self.dsub = dim // m
+        self.codebooks = codebooks  # (m, ksub, dsub)
+
+    @property
+    def code_size(self) -> int:
+        return self.m
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors.reshape(len(vectors), self.m, self.dsub)
+
+    def train(self, vectors: np.ndarray, iterations: int = 15):
+        """Fit one 256-entry codebook per sub-space."""
+        ksub = min(256, len(vectors))
+        parts = self._split(np.asarray(vectors, dtype=np.float32))
+        self.codebooks = np.stack([
+            kmeans(np.ascontiguousarray(parts[:, j]), ksub, iterations=iterations, seed=j)
+            for j in range(self.m)
+        ])
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        parts = self._split(np.asarray(vectors, dtype=np.float32))
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codebook = self.codebooks[j]
+            distances = -2 * parts[:, j] @ codebook.T + (codebook ** 2).sum(axis=1)
+            codes[:, j] = np.argmin(distances, axis=1)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.m)]
+        return np.concatenate(parts, axis=1)
+
+    def adc_scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Inner products via per-sub-space lookup tables."""
+        table = np.einsum("jkd,jd->jk", self.codebooks, query.reshape(self.m, self.dsub))
+        columns = np.arange(self.m)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = np.asarray(codes[start:start + SCORE_BLOCK_ROWS])
+            scores[start:start + len(block)] = table[columns, block].sum(axis=1)
+        return scores
+
+    def save(self, path: str):
+        np.savez(path, kind=self.kind, dim=self.dim, m=self.m, codebooks=self.codebooks)
+
+
+def create_codec(kind: str, dim: int, pq_m: int = 48):
+    """Return an untrained codec for ``kind`` ("int8" or "pq")."""
+    if kind == "int8":
+        return ScalarQuantizer(dim)
+    if kind == "pq":
+        return ProductQuantizer(dim, m=pq_m)
+    raise ValueError(f"Unknown vector quantization: {kind}")
+
+
+def load_codec(path: str):
+    """Load a codec written by ``save``."""
+    with np.load(path) as data:
+        kind = str(data["kind"])
+        dim = int(data["dim"])
+        if kind == "int8":
+            return ScalarQuantizer(dim, scale=data["scale"])
+        return ProductQuantizer(dim, m=int(data["m"]), codebooks=data["codebooks"])
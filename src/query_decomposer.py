@@ -1,5 +1,5 @@
 """Query decomposition for breaking down complex questions."""
-from typing import List
+from typing import List, Optional
 
 try:
     from .llm_interface import LocalLLM
@@ -10,21 +10,20 @@ except ImportError:
 class QueryDecomposer:
     """Decomposes complex queries into atomic sub-questions."""
 
-    def __init__(self):
+    def __init__(self, llm: Optional[LocalLLM] = None):
         """Initialize the query decomposer."""
-        self.llm = LocalLLM()
+        self.llm = llm or LocalLLM()
 
-    def decompose(self, query: str, num_questions: int = 3) -> List[str]:
-        """Decompose a query into sub-questions."""
-        prompt = f"""Decompose the following user question into {num_questions} atomic, specific sub-questions that would help answer the original question. Each sub-question should be independent and answerable.
+    def _decomposition_prompt(self, query: str, num_questions: int) -> str:
+        """Build the decomposition prompt."""
+        return f"""Decompose the following user question into {num_questions} atomic, specific sub-questions that would help answer the original question. Each sub-question should be independent and answerable.
 
 Original Question: {query}
 
 Provide exactly {num_questions} sub-questions, one per line, numbered 1-{num_questions}. Do not include the number in your response, just the questions."""
 
-        response = self.llm.generate(prompt, temperature=0.3)
-        
-        # Parse response into sub-questions
+    def _parse_sub_questions(self, response: str, query: str, num_questions: int) -> List[str]:
+        """Parse the LLM response into exactly ``num_questions`` sub-questions."""
         sub_questions = []
         for line in response.split('\n'):
             line = line.strip()
@@ -41,10 +40,27 @@ Provide exactly {num_questions} sub-questions, one per line, numbered 1-{num_que
 
         return sub_questions[:num_questions]
 
+    def decompose(self, query: str, num_questions: int = 3) -> List[str]:
+        """Decompose a query into sub-questions."""
+        prompt = self._decomposition_prompt(query, num_questions)
+        response = self.llm.generate(prompt, temperature=0.3)
+        return self._parse_sub_questions(response, query, num_questions)
+
+    async def adecompose(self, query: str, num_questions: int = 3) -> List[str]:
+        """Decompose a query into sub-questions without blocking the event loop."""
+        prompt = self._decomposition_prompt(query, num_questions)
+        response = await self.llm.agenerate(prompt, temperature=0.3)
+        return self._parse_sub_questions(response, query, num_questions)
+
+    def _complexity(self, query: str) -> int:
+        """Number of sub-questions to ask for, based on query length."""
+        words = len(query.split())
+        return min(5, max(1, (words - 10) // 10 + 1))
+
     def decompose_adaptive(self, query: str) -> List[str]:
         """Adaptively decompose query based on complexity."""
-        # Determine complexity
-        words = len(query.split())
-        complexity = min(5, max(1, (words - 10) // 10 + 1))
-        
-        return self.decompose(query, num_questions=complexity)
+        return self.decompose(query, num_questions=self._complexity(query))
+
+    async def adecompose_adaptive(self, query: str) -> List[str]:
+        """Async variant of ``decompose_adaptive``."""
+        return await self.adecompose(query, num_questions=self._complexity(query))
@@ -0,0 +1,185 @@
+"""Pluggable context rerankers used before answer synthesis."""
+import asyncio
+import re
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+
+try:
+    from .config import RERANKER, RERANKER_LEXICAL_WEIGHT, MMR_LAMBDA
+except ImportError:
+    from config import RERANKER, RERANKER_LEXICAL_WEIGHT, MMR_LAMBDA
+
+
+class Reranker(ABC):
+    """Orders retrieved contexts by relevance to the query, most relevant first."""
+
+    @abstractmethod
+    def rerank(self, query: str, contexts: List[str]) -> List[str]:
+        """Return ``contexts`` reordered, most relevant first."""
+
+    async def arerank(self, query: str, contexts: List[str]) -> List[str]:
+        """Rerank without blocking the event loop (in a worker thread by default)."""
+        return await asyncio.to_thread(self.rerank, query, contexts)
+
+
+class NoopReranker(Reranker):
+    """Keeps the retrieval order."""
+
+    def rerank(self, query: str, contexts: List[str]) -> List[str]:
+        return contexts
+
+
+def _tokens(text: str) -> set:
+    """Lower-cased word tokens, ignoring very short (mostly stop) words."""
+    return {token for token in re.findall(r"\w+", text.lower()) if len(token) > 2}
+
+
+class EmbeddingReranker(Reranker):
+    """Scores contexts by embedding cosine similarity plus lexical overlap.
+
+    The query and all contexts are embedded in one batch (contexts were
+    already embedded at ingestion, so they normally come from the embedding
+    cache) and scored with a single matrix-vector product. The lexical
+    feature is the fraction of query terms that appear in the context and is
+    blended in with ``lexical_weight``.
+    """
+
+    def __init__(self, embedder, lexical_weight: float = RERANKER_LEXICAL_WEIGHT):
+        """Initialize with anything exposing ``embed_texts(texts, normalize=...)``."""
+        self.embedder = embedder
+        self.lexical_weight = lexical_weight
+
+    def scores(self, query: str, contexts: List[str]) -> np.ndarray:
+        """Relevance score of each context, higher is better."""
+        embeddings = self.embedder.embed_texts([query] + contexts, normalize=True)
+        semantic = embeddings[1:] @ embeddings[0]
+
+        query_tokens = _tokens(query)
+        if not query_tokens or self.lexical_weight <= 0:
+            return semantic
+        lexical = np.array(
+            [len(query_tokens & _tokens(context)) / len(query_tokens) for context in contexts],
+            dtype=np.float32
+        )
+        return (1.0 - self.lexical_weight) * semantic + self.lexical_weight * lexical
+
+    def rerank(self, query: str, contexts: List[str]) -> List[str]:
+        if len(contexts) <= 1:
+            return contexts
+        order = np.argsort(-self.scores(query, contexts), kind="stable")
+        return [contexts[i] for i in order]
+
+
+class LLMReranker(Reranker):
+    """Asks the LLM for a 1-5 rating of every context (one extra generation)."""
+
+    def __init__(self, llm):
+        """Initialize with a ``LocalLLM``."""
+        self.llm = llm
+
+    def _rerank_prompt(self, query: str, contexts: List[str]) -> str:
+        contexts_str = "\n\n".join([f"[{i}]: {c[:200]}..." for i, c in enumerate(contexts)])
+
+        return f"""Rate the relevance of each context to the question on a scale of 1-5.
+
+Question: {query}
+
+Contexts:
+{contexts_str}
+
+Provide only the ratings as: [1]=X [2]=Y [3]=Z etc. Do not explain."""
+
+    def _apply_ratings(self, ratings_str: str, contexts: List[str]) -> List[str]:
+        """Order contexts by the "[i]=X" ratings in the LLM response.
+
+        Contexts the response did not rate (e.g. because it was truncated)
+        keep their retrieval order after the rated ones.
+        """
+        try:
+            ratings = {}
+            for part in ratings_str.split():
+                if '=' in part:
+                    idx, rating = part.replace('[', '').replace(']', '').split('=')
+                    ratings[int(idx)] = int(rating)
+
+            # Sort contexts by rating
+            sorted_indices = sorted(ratings.keys(), key=lambda x: ratings.get(x, 0), reverse=True)
+            rated = [i for i in sorted_indices if 0 <= i < len(contexts)]
+            unrated = [i for i in range(len(contexts)) if i not in ratings]
+            return [contexts[i] for i in rated + unrated]
+        except:
+            return contexts
+
+    def rerank(self, query: str, contexts: List[str]) -> List[str]:
+        if len(contexts) <= 1:
+            return contexts
+
+        ratings_str = self.llm.generate(self._rerank_prompt(query, contexts), temperature=0.1, max_tokens=50)
+        return self._apply_ratings(ratings_str, contexts)
+
+    async def arerank(self, query: str, contexts: List[str]) -> List[str]:
+        if len(contexts) <= 1:
+            return contexts
+
+        ratings_str = await self.llm.agenerate(self._rerank_prompt(query, contexts), temperature=0.1, max_tokens=50)
+        return self._apply_ratings(ratings_str, contexts)
+
+
+def mmr_select(query_vector: np.ndarray, candidate_vectors: np.ndarray, k: int,
+               lambda_mult: float = MMR_LAMBDA) -> List[int]:
+    """Maximal Marginal Relevance: indices of ``k`` relevant, mutually diverse candidates.
+
+    Vectors must be L2-normalized. Each step picks the candidate maximizing
+    ``lambda_mult * sim(query) - (1 - lambda_mult) * max sim(selected)``;
+    the running max similarity to the selected set is updated with one
+    matrix-vector product per pick. Indices are returned in pick order.
+    """
+    n = len(candidate_vectors)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    relevance = candidate_vectors @ query_vector
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for _ in range(k):
+        if selected:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, candidate_vectors @ candidate_vectors[best])
+    return selected
+
+
+def create_reranker(kind: str = RERANKER, embedder=None, llm=None) -> Reranker:
+    """Create the reranker selected by RERANKER ("embedding", "llm" or "none").
+
+    ``embedder`` should be the vector store's embedding handler so the model
+    and its cache are shared; a new ``EmbeddingHandler`` is created otherwise.
+    """
+    if kind == "embedding":
+        if embedder is None:
+            try:
+                from .embeddings import EmbeddingHandler
+            except ImportError:
+                from embeddings import EmbeddingHandler
+            embedder = EmbeddingHandler()
+        return EmbeddingReranker(embedder)
+    if kind == "llm":
+        if llm is None:
+            try:
+                from .llm_interface import LocalLLM
+            except ImportError:
+                from llm_interface import LocalLLM
+            llm = LocalLLM()
+        return LLMReranker(llm)
+    if kind == "none":
+        return NoopReranker()
+    raise ValueError(f"Unknown reranker: {kind}")
@@ -0,0 +1,85 @@
+"""Single-flight request coalescing for duplicate in-flight calls."""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result.
+
+    The first caller for a key (the leader) runs the function, later callers
+    with the same key wait on the leader's future instead of issuing their own
+    request. Once the call finishes the key is forgotten, so this only
+    collapses calls that overlap in time; caching is left to the caller.
+    ``do`` is for threads, ``ado`` for coroutines on an event loop.
+    """
+
+    def __init__(self):
+        """Initialize empty flight tables and counters."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], "asyncio.Task"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()``, or wait for the identical call already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()``, or the identical coroutine already in flight on this loop.
+
+        The shared call runs as its own task, so a caller that is cancelled
+        does not cancel it for everyone else.
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._async_calls.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._async_calls[flight_key] = task
+            task.add_done_callback(lambda done: self._forget(flight_key, done))
+            with self._lock:
+                self.leaders += 1
+        else:
+            with self._lock:
+                self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, flight_key: Tuple[int, Hashable], task: "asyncio.Task"):
+        if self._async_calls.get(flight_key) is task:
+            del self._async_calls[flight_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """How many calls ran and how many piggybacked on one in flight."""
+        with self._lock:
+            total = self.leaders + self.shared
+            return {
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "executed": self.leaders,
+                "coalesced": self.shared,
+                "coalesced_rate": round(self.shared / total, 4) if total else 0.0
+            }
@@ -0,0 +1,592 @@
+"""Memory-mapped, append-only vector segments for the local vector store.
+
+A segment is a directory holding one file per column::
+
+    header.json             dim, vector dtype, format version
+    vectors.bin             row-major float32/float16 vectors (L2-normalized)
+    ids.bin                 16-byte chunk UUIDs
+    chunk_index.bin         int32 column
+    source.bin, doc_type.bin
+                            uint32 dictionary codes, values in *.dict.jsonl
+    content.bin, content.off
+    metadata.bin, metadata.off
+                            UTF-8 blobs plus a uint64 end-offset table
+    tombstones.bin          int64 row numbers of deleted chunks
+    codes.bin               optional quantized vectors (see ``quantization``)
+
+Every file is only ever appended to. Opening a segment reads the header,
+the string dictionaries and the tombstones and maps the rest with
+``np.memmap``, so startup cost does not depend on the number of rows and a
+lookup only faults in the pages of the rows it actually reads. With a
+quantization codec, searches scan the small codes and read full-precision
+vectors only for the candidates they rerank.
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .quantization import create_codec, load_codec
+except ImportError:
+    from quantization import create_codec, load_codec
+
+FORMAT_VERSION = 1
+SEARCH_BLOCK_ROWS = 65536
+
+
+def _map(path: Path, dtype, rows: int, width: int = 0) -> Optional[np.memmap]:
+    """Map the first ``rows`` rows of a column file read-only."""
+    if rows == 0:
+        return None
+    shape = (rows, width) if width else (rows,)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _rows_in(path: Path, row_bytes: int) -> int:
+    """Number of complete rows in a column file."""
+    return os.path.getsize(path) // row_bytes if path.exists() else 0
+
+
+def _truncate(path: Path, size: int):
+    """Cut a column file back to ``size`` bytes (drops a torn append)."""
+    if path.exists() and os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+class _DictColumn:
+    """Dictionary-encoded string column: uint32 codes plus a value list."""
+
+    def __init__(self, directory: Path, name: str):
+        self.codes_path = directory / f"{name}.bin"
+        self.values_path = directory / f"{name}.dict.jsonl"
+        self.values: List[str] = []
+        if self.values_path.exists():
+            with open(self.values_path, "r", encoding="utf-8") as f:
+                self.values = [json.loads(line) for line in f if line.strip()]
+        self.codes_by_value = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        """Return codes for ``values``, appending unseen values to the dictionary."""
+        codes = []
+        new_values = []
+        for value in values:
+            code = self.codes_by_value.get(value)
+            if code is None:
+                code = len(self.values)
+                self.values.append(value)
+                self.codes_by_value[value] = code
+                new_values.append(value)
+            codes.append(code)
+        if new_values:
+            with open(self.values_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(v) + "\n" for v in new_values)
+        return np.asarray(codes, dtype=np.uint32)
+
+
+class _BlobColumn:
+    """Variable-length UTF-8 column stored as a data file plus end offsets."""
+
+    def __init__(self, directory: Path, name: str):
+        self.data_path = directory / f"{name}.bin"
+        self.offsets_path = directory / f"{name}.off"
+
+    def append(self, values: List[str], end: int) -> int:
+        """Append ``values`` after byte ``end``; return the new end offset."""
+        encoded = [v.encode("utf-8") for v in values]
+        offsets = end + np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+        with open(self.data_path, "ab") as f:
+            f.write(b"".join(encoded))
+        with open(self.offsets_path, "ab") as f:
+            f.write(offsets.tobytes())
+        return int(offsets[-1]) if len(offsets) else end
+
+
+class VectorSegment:
+    """One append-only segment of normalized vectors and chunk metadata."""
+
+    def __init__(self, path: Path):
+        """Open an existing segment directory."""
+        self.path = Path(path)
+        with open(self.path / "header.json", "r") as f:
+            header = json.load(f)
+        if header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment format in {self.path}: {header.get('format_version')}")
+        self.dim = header["dim"]
+        self.dtype = np.dtype(header["dtype"])
+        self._lock = threading.Lock()
+
+        self._sources = _DictColumn(self.path, "source")
+        self._doc_types = _DictColumn(self.path, "doc_type")
+        self._content = _BlobColumn(self.path, "content")
+        self._metadata = _BlobColumn(self.path, "metadata")
+
+        self._recover()
+        tombstones_path = self.path / "tombstones.bin"
+        dead = np.fromfile(tombstones_path, dtype=np.int64) if tombstones_path.exists() else []
+        self._tombstones = set(int(row) for row in dead if row < self._rows)
+        self._remap()
+        self._codes = None
+        self._code_size = 0
+        self._codes_rows = 0
+
+    @classmethod
+    def create(cls, path: Path, dim: int, dtype: str = "float32") -> "VectorSegment":
+        """Create an empty segment directory."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=False)
+        with open(path / "header.json", "w") as f:
+            json.dump({"format_version": FORMAT_VERSION, "dim": dim, "dtype": np.dtype(dtype).name}, f)
+        return cls(path)
+
+    def _fixed_columns(self) -> List[Tuple[Path, int]]:
+        """Fixed-width column files with their row sizes in bytes."""
+        return [
+            (self.path / "vectors.bin", self.dim * self.dtype.itemsize),
+            (self.path / "ids.bin", 16),
+            (self.path / "chunk_index.bin", 4),
+            (self._sources.codes_path, 4),
+            (self._doc_types.codes_path, 4),
+            (self._content.offsets_path, 8),
+            (self._metadata.offsets_path, 8),
+        ]
+
+    def _recover(self):
+        """Trim columns to the last row that was fully written to all of them."""
+        columns = self._fixed_columns()
+        self._rows = min(_rows_in(path, row_bytes) for path, row_bytes in columns)
+        for path, row_bytes in columns:
+            _truncate(path, self._rows * row_bytes)
+        self._content_end = self._blob_end(self._content)
+        self._metadata_end = self._blob_end(self._metadata)
+        _truncate(self._content.data_path, self._content_end)
+        _truncate(self._metadata.data_path, self._metadata_end)
+
+    def _blob_end(self, column: _BlobColumn) -> int:
+        if self._rows == 0:
+            return 0
+        with open(column.offsets_path, "rb") as f:
+            f.seek((self._rows - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+
+    def _remap(self, rows: Optional[int] = None):
+        """Map column files for ``rows`` rows (default: the current row count)."""
+        rows = self._rows if rows is None else rows
+        self.vectors = _map(self.path / "vectors.bin", self.dtype, rows, self.dim)
+        self._ids = _map(self.path / "ids.bin", np.uint8, rows, 16)
+        self._chunk_index = _map(self.path / "chunk_index.bin", np.int32, rows)
+        self._source_codes = _map(self._sources.codes_path, np.uint32, rows)
+        self._doc_type_codes = _map(self._doc_types.codes_path, np.uint32, rows)
+        self._content_off = _map(self._content.offsets_path, np.uint64, rows)
+        self._metadata_off = _map(self._metadata.offsets_path, np.uint64, rows)
+        self._content_data = _map(self._content.data_path, np.uint8, self._content_end)
+        self._metadata_data = _map(self._metadata.data_path, np.uint8, self._metadata_end)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def live_count(self) -> int:
+        """Rows that have not been tombstoned."""
+        return self._rows - len(self._tombstones)
+
+    def append(self, vectors: np.ndarray, records: List[Dict[str, Any]],
+               chunk_ids: List[str]) -> None:
+        """Append normalized vectors and their chunk records.
+
+        Columns are written before the vectors, and ``_recover`` trims every
+        column to the shortest one, so a crash mid-append loses only the
+        rows of that append.
+        """
+        if not records:
+            return
+        with self._lock:
+            self._content_end = self._content.append([r.get("content", "") for r in records], self._content_end)
+            self._metadata_end = self._metadata.append([r.get("metadata", "") for r in records], self._metadata_end)
+            columns = [
+                (self._sources.codes_path, self._sources.encode(r.get("source", "") for r in records)),
+                (self._doc_types.codes_path, self._doc_types.encode(r.get("doc_type", "") for r in records)),
+                (self.path / "chunk_index.bin",
+                 np.asarray([r.get("chunk_index", 0) for r in records], dtype=np.int32)),
+                (self.path / "ids.bin", np.frombuffer(b"".join(uuid.UUID(c).bytes for c in chunk_ids), dtype=np.uint8)),
+                (self.path / "vectors.bin", np.ascontiguousarray(vectors, dtype=self.dtype)),
+            ]
+            for path, values in columns:
+                with open(path, "ab") as f:
+                    f.write(values.tobytes())
+            # Publish the new row count only once the maps cover those rows
+            rows = self._rows + len(records)
+            self._remap(rows)
+            self._rows = rows
+
+    def open_codes(self, code_size: int):
+        """Map ``codes.bin`` for a codec producing ``code_size`` bytes per row."""
+        path = self.path / "codes.bin"
+        self._code_size = code_size
+        self._codes_rows = min(_rows_in(path, code_size), self._rows)
+        _truncate(path, self._codes_rows * code_size)
+        self._codes = _map(path, np.uint8, self._codes_rows, code_size)
+
+    def drop_codes(self):
+        """Remove quantized codes, e.g. after the codec changed."""
+        self._codes = None
+        self._codes_rows = 0
+        (self.path / "codes.bin").unlink(missing_ok=True)
+
+    @property
+    def codes_rows(self) -> int:
+        """Leading rows that have quantized codes."""
+        return self._codes_rows
+
+    def append_codes(self, codes: np.ndarray):
+        """Append codes for the next ``len(codes)`` rows."""
+        with self._lock:
+            with open(self.path / "codes.bin", "ab") as f:
+                f.write(np.ascontiguousarray(codes, dtype=np.uint8).tobytes())
+            codes_rows = self._codes_rows + len(codes)
+            self._codes = _map(self.path / "codes.bin", np.uint8, codes_rows, self._code_size)
+            self._codes_rows = codes_rows
+
+    def _blob(self, data: Optional[np.memmap], offsets: np.memmap, row: int) -> str:
+        start = int(offsets[row - 1]) if row > 0 else 0
+        end = int(offsets[row])
+        if data is None or end == start:
+            return ""
+        return bytes(data[start:end]).decode("utf-8")
+
+    def chunk_id(self, row: int) -> str:
+        return str(uuid.UUID(bytes=bytes(self._ids[row])))
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Materialize the chunk record stored at ``row``."""
+        return {
+            "content": self._blob(self._content_data, self._content_off, row),
+            "source": self._sources.values[self._source_codes[row]],
+            "chunk_index": int(self._chunk_index[row]),
+            "doc_type": self._doc_types.values[self._doc_type_codes[row]],
+            "metadata": self._blob(self._metadata_data, self._metadata_off, row),
+        }
+
+    def rows_for_ids(self, chunk_ids: Iterable[str]) -> np.ndarray:
+        """Row numbers holding any of ``chunk_ids``."""
+        if self._rows == 0:
+            return np.empty(0, dtype=np.int64)
+        wanted = np.frombuffer(b"".join(uuid.UUID(c).bytes for c in chunk_ids), dtype="V16")
+        stored = self._ids.view("V16").ravel()
+        return np.nonzero(np.isin(stored, wanted))[0]
+
+    def rows_for_source(self, source: str) -> np.ndarray:
+        """Row numbers whose ``source`` column equals ``source``."""
+        code = self._sources.codes_by_value.get(source)
+        if code is None or self._rows == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.nonzero(self._source_codes == code)[0]
+
+    def delete_rows(self, rows: Iterable[int]) -> int:
+        """Tombstone ``rows``; returns how many were newly deleted."""
+        with self._lock:
+            new_rows = [int(r) for r in rows if int(r) not in self._tombstones]
+            if new_rows:
+                with open(self.path / "tombstones.bin", "ab") as f:
+                    f.write(np.asarray(new_rows, dtype=np.int64).tobytes())
+                # Replaced, not mutated, so searches can hold on to a snapshot
+                self._tombstones = self._tombstones | set(new_rows)
+        return len(new_rows)
+
+    @staticmethod
+    def _live_mask(rows: int, tombstones: set) -> np.ndarray:
+        mask = np.ones(rows, dtype=bool)
+        if tombstones:
+            mask[np.fromiter(tombstones, dtype=np.int64)] = False
+        return mask
+
+    def live_mask(self) -> np.ndarray:
+        """Boolean mask of rows that are not tombstoned."""
+        return self._live_mask(self._rows, self._tombstones)
+
+    @staticmethod
+    def _exact_scores(vectors: np.memmap, start: int, end: int, query_vector: np.ndarray) -> np.ndarray:
+        """Full-precision scores for rows ``start:end``, upcast block by block."""
+        scores = np.empty(end - start, dtype=np.float32)
+        for block_start in range(start, end, SEARCH_BLOCK_ROWS):
+            block = vectors[block_start:min(end, block_start + SEARCH_BLOCK_ROWS)]
+            scores[block_start - start:block_start - start + len(block)] = \
+                block.astype(np.float32, copy=False) @ query_vector
+        return scores
+
+    def search(self, query_vector: np.ndarray, top_k: int, codec=None,
+               rerank_factor: int = 4) -> List[Tuple[float, int]]:
+        """Cosine top-k over live rows, as (score, row) pairs.
+
+        Without a codec every row is scored exactly. With one, coded rows are
+        scored against their codes, and the best ``top_k * rerank_factor``
+        candidates are rescored from the full-precision vectors.
+        """
+        # Consistent snapshot; appends only ever add rows beyond it
+        with self._lock:
+            rows = self._rows
+            vectors = self.vectors
+            codes = self._codes
+            coded = self._codes_rows if codec is not None else 0
+            tombstones = self._tombstones
+        if rows == 0 or top_k <= 0:
+            return []
+
+        scores = np.empty(rows, dtype=np.float32)
+        if coded:
+            scores[:coded] = codec.adc_scores(codes, query_vector)
+        scores[coded:] = self._exact_scores(vectors, coded, rows, query_vector)
+        if tombstones:
+            scores[~self._live_mask(rows, tombstones)] = -np.inf
+
+        if coded:
+            n_candidates = min(rows, top_k * rerank_factor)
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            candidates = np.sort(candidates[np.isfinite(scores[candidates])])
+            if len(candidates) == 0:
+                return []
+            exact = np.asarray(vectors[candidates], dtype=np.float32) @ query_vector
+            k = min(top_k, len(candidates))
+            top = np.argpartition(-exact, k - 1)[:k]
+            return [(float(exact[i]), int(candidates[i])) for i in top]
+
+        k = min(top_k, rows)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(float(scores[i]), int(i)) for i in top if np.isfinite(scores[i])]
+
+
+class SegmentStore:
+    """A directory of vector segments tracked by an atomically updated manifest."""
+
+    def __init__(self, directory: str, dim: int, dtype: str = "float32",
+                 max_segment_rows: int = 1_000_000, quantization: str = "none",
+                 pq_m: int = 48, rerank_factor: int = 4, min_train_rows: int = 10000,
+                 compact_dead_ratio: float = 0.3):
+        """Open every segment listed in ``directory/manifest.json``.
+
+        ``quantization`` ("none", "int8" or "pq") enables a codec that is
+        trained once ``min_train_rows`` vectors are stored and persisted as
+        ``codec.npz``. Deletes trigger ``compact`` once at least
+        ``compact_dead_ratio`` of the stored rows are tombstoned (0 disables).
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.dtype = dtype
+        self.max_segment_rows = max_segment_rows
+        self.quantization = quantization
+        self.pq_m = pq_m
+        self.rerank_factor = rerank_factor
+        self.min_train_rows = min_train_rows
+        self.compact_dead_ratio = compact_dead_ratio
+        self.codec = None
+        self._lock = threading.Lock()
+
+        manifest = self._read_manifest()
+        self._next_id = manifest.get("next_id", 0)
+        self.segments: List[VectorSegment] = [
+            VectorSegment(self.directory / name) for name in manifest.get("segments", [])
+        ]
+        for segment in self.segments:
+            if segment.dim != dim:
+                raise ValueError(f"Segment {segment.path} has dim {segment.dim}, expected {dim}")
+        self._open_codec()
+
+    @property
+    def _codec_path(self) -> Path:
+        return self.directory / "codec.npz"
+
+    def _open_codec(self):
+        """Load the persisted codec and bring every segment's codes up to date."""
+        if self.quantization == "none" or not self._codec_path.exists():
+            self._maybe_train_codec()
+            return
+        codec = load_codec(str(self._codec_path))
+        if codec.kind != self.quantization or (codec.kind == "pq" and codec.m != self.pq_m):
+            # Codes from another codec cannot be scored with this one
+            self._codec_path.unlink()
+            for segment in self.segments:
+                segment.drop_codes()
+            self._maybe_train_codec()
+            return
+        self.codec = codec
+        self._backfill_codes()
+
+    def _backfill_codes(self):
+        """Encode rows that were appended without codes."""
+        for segment in self.segments:
+            if segment._code_size != self.codec.code_size:
+                segment.open_codes(self.codec.code_size)
+            for start in range(segment.codes_rows, len(segment), SEARCH_BLOCK_ROWS):
+                block = np.asarray(segment.vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+                segment.append_codes(self.codec.encode(block))
+
+    def _maybe_train_codec(self, max_samples: int = 65536):
+        """Train the codec once enough vectors are stored, then code them all."""
+        if self.quantization == "none" or self.codec is not None:
+            return
+        total = sum(len(s) for s in self.segments)
+        if total < self.min_train_rows:
+            return
+
+        rng = np.random.default_rng(0)
+        samples = []
+        for segment in self.segments:
+            take = int(round(max_samples * len(segment) / total))
+            if take and len(segment):
+                rows = np.sort(rng.choice(len(segment), size=min(take, len(segment)), replace=False))
+                samples.append(np.asarray(segment.vectors[rows], dtype=np.float32))
+
+        codec = create_codec(self.quantization, self.dim, pq_m=self.pq_m)
+        codec.train(np.concatenate(samples))
+        tmp_path = self.directory / "codec.tmp.npz"
+        codec.save(str(tmp_path))
+        os.replace(tmp_path, self._codec_path)
+        self.codec = codec
+        self._backfill_codes()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        path = self.directory / "manifest.json"
+        if not path.exists():
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write_manifest(self, segments: List[VectorSegment]):
+        """Replace the manifest in one atomic rename."""
+        tmp_path = self.directory / "manifest.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"next_id": self._next_id, "segments": [s.path.name for s in segments]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.directory / "manifest.json")
+
+    def _new_segment(self) -> VectorSegment:
+        name = f"seg-{self._next_id:06d}"
+        self._next_id += 1
+        path = self.directory / name
+        if path.exists():
+            # Leftover from a crash before the manifest was updated
+            shutil.rmtree(path)
+        segment = VectorSegment.create(path, self.dim, self.dtype)
+        if self.codec is not None:
+            segment.open_codes(self.codec.code_size)
+        return segment
+
+    def _append_to(self, segment: VectorSegment, vectors: np.ndarray,
+                   records: List[Dict[str, Any]], chunk_ids: List[str]):
+        """Append rows (and their codes, if a codec is trained) to ``segment``."""
+        segment.append(vectors, records, chunk_ids)
+        if self.codec is not None:
+            segment.append_codes(self.codec.encode(np.asarray(vectors, dtype=np.float32)))
+
+    def __len__(self) -> int:
+        return sum(segment.live_count for segment in self.segments)
+
+    def append(self, vectors: np.ndarray, records: List[Dict[str, Any]]) -> List[str]:
+        """Append rows to the active segment, rolling over when it is full."""
+        chunk_ids = [str(uuid.uuid4()) for _ in records]
+        with self._lock:
+            start = 0
+            while start < len(records):
+                if not self.segments or len(self.segments[-1]) >= self.max_segment_rows:
+                    self.segments.append(self._new_segment())
+                    self._write_manifest(self.segments)
+                active = self.segments[-1]
+                end = min(len(records), start + self.max_segment_rows - len(active))
+                self._append_to(active, vectors[start:end], records[start:end], chunk_ids[start:end])
+                start = end
+            self._maybe_train_codec()
+        return chunk_ids
+
+    def search(self, query_vector: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Exact cosine top-k across all segments."""
+        candidates = []
+        for segment in list(self.segments):
+            candidates.extend(
+                (score, row, segment)
+                for score, row in segment.search(query_vector, top_k, self.codec, self.rerank_factor)
+            )
+        candidates.sort(key=lambda c: -c[0])
+
+        results = []
+        for score, row, segment in candidates[:top_k]:
+            results.append({**segment.record(row), "distance": float(1.0 - score)})
+        return results
+
+    def delete_chunks(self, chunk_ids: List[str]) -> int:
+        """Tombstone chunks by id; returns the number deleted."""
+        # Under the lock so a concurrent compact() can't copy the rows back
+        with self._lock:
+            deleted = sum(s.delete_rows(s.rows_for_ids(chunk_ids)) for s in self.segments)
+            self._maybe_compact()
+        return deleted
+
+    def delete_source(self, source: str) -> int:
+        """Tombstone every chunk that came from ``source``."""
+        with self._lock:
+            deleted = sum(s.delete_rows(s.rows_for_source(source)) for s in self.segments)
+            self._maybe_compact()
+        return deleted
+
+    def _maybe_compact(self):
+        """Compact once enough rows are tombstoned; the caller holds ``_lock``."""
+        total = sum(len(s) for s in self.segments)
+        dead = total - sum(s.live_count for s in self.segments)
+        if self.compact_dead_ratio > 0 and dead and dead >= self.compact_dead_ratio * total:
+            self._compact()
+
+    def delete_all(self):
+        """Drop every segment."""
+        with self._lock:
+            old_segments = self.segments
+            self.segments = []
+            self._write_manifest(self.segments)
+            for segment in old_segments:
+                shutil.rmtree(segment.path, ignore_errors=True)
+
+    def compact(self) -> Dict[str, int]:
+        """Merge all segments into as few as possible, dropping tombstoned rows."""
+        with self._lock:
+            return self._compact()
+
+    def _compact(self) -> Dict[str, int]:
+        """``compact`` body; the caller holds ``_lock``."""
+        old_segments = self.segments
+        before = sum(len(s) for s in old_segments)
+
+        merged: List[VectorSegment] = []
+        for segment in old_segments:
+            live_rows = np.nonzero(segment.live_mask())[0]
+            for start in range(0, len(live_rows), SEARCH_BLOCK_ROWS):
+                rows = live_rows[start:start + SEARCH_BLOCK_ROWS]
+                offset = 0
+                while offset < len(rows):
+                    if not merged or len(merged[-1]) >= self.max_segment_rows:
+                        merged.append(self._new_segment())
+                    take = rows[offset:offset + self.max_segment_rows - len(merged[-1])]
+                    self._append_to(
+                        merged[-1],
+                        np.asarray(segment.vectors[take]),
+                        [segment.record(int(r)) for r in take],
+                        [segment.chunk_id(int(r)) for r in take]
+                    )
+                    offset += len(take)
+
+        self.segments = merged
+        self._write_manifest(merged)
+        for segment in old_segments:
+            shutil.rmtree(segment.path, ignore_errors=True)
+
+        return {
+            "segments_before": len(old_segments),
+            "segments_after": len(merged),
+            "rows_before": before,
+            "rows_after": sum(len(s) for s in merged)
+        }
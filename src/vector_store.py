@@ -2,16 +2,30 @@
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
 from weaviate.classes.query import MetadataQuery
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
 from uuid import uuid4
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 try:
-    from .config import WEAVIATE_URL, WEAVIATE_API_KEY, CHUNK_SIZE, CHUNK_OVERLAP
+    from .config import (
+        WEAVIATE_URL, EMBEDDING_BATCH_SIZE, WEAVIATE_BATCH_SIZE, SINGLE_FLIGHT_ENABLED,
+        CORPUS_VERSION_FILE
+    )
     from .embeddings import EmbeddingHandler
+    from .embedding_scheduler import create_query_embedder
+    from .chunking import split_documents
+    from .single_flight import SingleFlight
+    from .corpus_version import CorpusVersion
 except ImportError:
-    from config import WEAVIATE_URL, WEAVIATE_API_KEY, CHUNK_SIZE, CHUNK_OVERLAP
+    from config import (
+        WEAVIATE_URL, EMBEDDING_BATCH_SIZE, WEAVIATE_BATCH_SIZE, SINGLE_FLIGHT_ENABLED,
+        CORPUS_VERSION_FILE
+    )
     from embeddings import EmbeddingHandler
+    from embedding_scheduler import create_query_embedder
+    from chunking import split_documents
+    from single_flight import SingleFlight
+    from corpus_version import CorpusVersion
 
 
 class WeaviateVectorStore:
@@ -19,6 +33,11 @@ class WeaviateVectorStore:
 
     def __init__(self):
         """Initialize Weaviate connection."""
+        self.last_ingest_errors = []
+        # Bumped whenever the stored chunks change; lets answer caches invalidate.
+        # Every worker talks to the same Weaviate, so the counter is shared through a file
+        self._corpus_version = CorpusVersion(CORPUS_VERSION_FILE)
+        self.retrieval_flights = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
         try:
             # Use Weaviate v4 client
             self.client = weaviate.connect_to_local(
@@ -26,12 +45,18 @@ class WeaviateVectorStore:
                 port=8080
             )
             self.embedding_handler = EmbeddingHandler()
+            self.query_embedder = create_query_embedder(self.embedding_handler)
             self._init_schema()
         except Exception as e:
             print(f"Warning: Could not connect to Weaviate: {e}")
             print("Make sure Weaviate is running on", WEAVIATE_URL)
             self.client = None
 
+    @property
+    def corpus_version(self) -> int:
+        """Version of the stored chunks, shared by every process using the same store."""
+        return self._corpus_version.value
+
     def _init_schema(self):
         """Initialize Weaviate schema for document chunks."""
         try:
@@ -52,88 +77,155 @@ class WeaviateVectorStore:
         except Exception as e:
             print(f"Schema initialization warning: {e}")
 
-    def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
-        """Add documents to the vector store."""
+    def _batch_context(self, collection):
+        """Return the Weaviate batch context configured by WEAVIATE_BATCH_SIZE."""
+        if WEAVIATE_BATCH_SIZE > 0:
+            return collection.batch.fixed_size(batch_size=WEAVIATE_BATCH_SIZE)
+        return collection.batch.dynamic()
+
+    def add_documents(self, documents: List[Dict[str, Any]],
+                      batch_size: int = EMBEDDING_BATCH_SIZE,
+                      progress: Optional[Callable[[str, int, int], None]] = None,
+                      errors: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """Add documents to the vector store.
+
+        All documents are split up front, chunks are embedded ``batch_size``
+        at a time and streamed into a single Weaviate batch. Objects that
+        Weaviate rejects, and any exception that aborts the batch, are
+        appended to ``errors`` (and ``self.last_ingest_errors``); rejected
+        objects are left out of the returned ids. ``progress(stage, done,
+        total)`` is called as the chunk, embed and store stages advance.
+        """
+        errors = [] if errors is None else errors
+        self.last_ingest_errors = errors
         if not self.client:
             return []
 
-        chunk_ids = []
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP
-        )
+        chunks = split_documents(documents)
+        if progress:
+            progress("chunk", len(chunks), len(chunks))
+        if not chunks:
+            return []
 
+        pending_ids = []
         try:
             collection = self.client.collections.get("DocumentChunk")
-            
-            for doc in documents:
-                content = doc.get("content", "")
-                if not content:
-                    continue
-
-                # Split content into chunks
-                chunks = text_splitter.split_text(content)
-
-                for chunk_idx, chunk in enumerate(chunks):
-                    try:
-                        # Create embedding
-                        embedding = self.embedding_handler.embed_text(chunk)
-
-                        # Prepare object
-                        properties = {
-                            "content": chunk,
-                            "source": doc.get("source", ""),
-                            "chunk_index": chunk_idx,
-                            "doc_type": doc.get("type", "text"),
-                            "metadata": str(doc)
-                        }
-
-                        # Add to Weaviate
-                        uuid = collection.data.insert(
+
+            window = self.embedding_handler.ingest_window(batch_size)
+            with self._batch_context(collection) as batch:
+                for start in range(0, len(chunks), window):
+                    batch_chunks = chunks[start:start + window]
+                    embeddings = self.embedding_handler.embed_texts(
+                        [chunk["content"] for chunk in batch_chunks],
+                        batch_size=batch_size,
+                        use_pool=True
+                    )
+
+                    for properties, embedding in zip(batch_chunks, embeddings):
+                        chunk_uuid = str(uuid4())
+                        batch.add_object(
                             properties=properties,
-                            vector=embedding
+                            vector=embedding.tolist(),
+                            uuid=chunk_uuid
                         )
-                        chunk_ids.append(str(uuid))
-                    except Exception as e:
-                        print(f"Error adding chunk: {e}")
+                        pending_ids.append(chunk_uuid)
+                    if progress:
+                        progress("embed", start + len(batch_chunks), len(chunks))
+                        progress("store", start + len(batch_chunks), len(chunks))
+
+            for failed in collection.batch.failed_objects:
+                failed_object = getattr(failed, "object_", None)
+                properties = getattr(failed_object, "properties", None) or {}
+                error = {
+                    "uuid": str(getattr(failed_object, "uuid", "")),
+                    "source": properties.get("source", ""),
+                    "chunk_index": properties.get("chunk_index"),
+                    "message": failed.message
+                }
+                errors.append(error)
+                print(f"Error adding chunk {error['uuid']} "
+                      f"({error['source']}#{error['chunk_index']}): {error['message']}")
         except Exception as e:
             print(f"Error in add_documents: {e}")
+            errors.append({"uuid": "", "source": "", "chunk_index": None, "message": str(e)})
 
+        failed_ids = {error["uuid"] for error in errors}
+        chunk_ids = [chunk_id for chunk_id in pending_ids if chunk_id not in failed_ids]
+        if chunk_ids:
+            self._corpus_version.bump()
         return chunk_ids
 
+    def _near_vector(self, collection, query_embedding, top_k: int) -> List[Dict[str, Any]]:
+        """Run one near-vector query and flatten the hits into chunk dicts."""
+        response = collection.query.near_vector(
+            near_vector=query_embedding.tolist(),
+            limit=top_k,
+            return_metadata=MetadataQuery(distance=True)
+        )
+
+        retrieved_docs = []
+        for item in response.objects:
+            retrieved_docs.append({
+                "content": item.properties.get("content", ""),
+                "source": item.properties.get("source", ""),
+                "chunk_index": item.properties.get("chunk_index", 0),
+                "doc_type": item.properties.get("doc_type", ""),
+                "metadata": item.properties.get("metadata", ""),
+                "distance": item.metadata.distance if item.metadata else None
+            })
+        return retrieved_docs
+
+    def _coalesced(self, key: tuple, fn):
+        """Run ``fn`` once for concurrent identical retrievals; each caller gets its own copy."""
+        if self.retrieval_flights is None:
+            return fn()
+        return self.retrieval_flights.do(key, fn)
+
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Retrieve relevant documents for a query."""
         if not self.client:
             return []
 
-        try:
+        def search() -> List[Dict[str, Any]]:
             # Create query embedding
-            query_embedding = self.embedding_handler.embed_text(query)
+            query_embedding = self.query_embedder.embed_text(query)
 
             # Get collection and search
             collection = self.client.collections.get("DocumentChunk")
-            response = collection.query.near_vector(
-                near_vector=query_embedding,
-                limit=top_k,
-                return_metadata=MetadataQuery(distance=True)
-            )
+            return self._near_vector(collection, query_embedding, top_k)
 
-            retrieved_docs = []
-            for item in response.objects:
-                retrieved_docs.append({
-                    "content": item.properties.get("content", ""),
-                    "source": item.properties.get("source", ""),
-                    "chunk_index": item.properties.get("chunk_index", 0),
-                    "doc_type": item.properties.get("doc_type", ""),
-                    "metadata": item.properties.get("metadata", ""),
-                    "distance": item.metadata.distance if item.metadata else None
-                })
-
-            return retrieved_docs
+        try:
+            return [dict(doc) for doc in self._coalesced(("retrieve", query, top_k), search)]
         except Exception as e:
             print(f"Error retrieving documents: {e}")
             return []
 
+    def retrieve_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Retrieve for several queries at once.
+
+        The queries are embedded in one batch; the near-vector searches are
+        then issued concurrently, since the collection has a single unnamed
+        vector and Weaviate takes one query vector per request.
+        """
+        if not self.client or not queries:
+            return [[] for _ in queries]
+
+        def search() -> List[List[Dict[str, Any]]]:
+            query_embeddings = self.query_embedder.embed_texts(queries)
+            collection = self.client.collections.get("DocumentChunk")
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                return list(executor.map(
+                    lambda embedding: self._near_vector(collection, embedding, top_k),
+                    query_embeddings
+                ))
+
+        try:
+            results = self._coalesced(("retrieve_many", tuple(queries), top_k), search)
+            return [[dict(doc) for doc in docs] for docs in results]
+        except Exception as e:
+            print(f"Error retrieving documents: {e}")
+            return [[] for _ in queries]
+
     def delete_all(self):
         """Delete all documents from the vector store."""
         if not self.client:
@@ -143,6 +235,7 @@ class WeaviateVectorStore:
             if self.client.collections.exists("DocumentChunk"):
                 self.client.collections.delete("DocumentChunk")
                 self._init_schema()
+            self._corpus_version.bump()
         except Exception as e:
             print(f"Error deleting documents: {e}")
 
@@ -0,0 +1,77 @@
+"""Shared test setup: import from src/ and embed with a tiny deterministic model."""
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Configuration is read at import time, so pin it before anything imports config
+os.environ.update(
+    VECTOR_STORE_BACKEND="local",
+    LOCAL_STORE_DIR="",
+    EMBEDDING_CACHE_ENABLED="false",
+    EMBEDDING_CACHE_DIR="",
+    LLM_CACHE_DB="",
+    CORPUS_VERSION_FILE="",
+    LLM_BASE_URL="http://127.0.0.1:9",
+    WARM_UP_ON_STARTUP="false",
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from embeddings import EmbeddingHandler  # noqa: E402
+
+DIM = 64
+
+
+class HashingModel:
+    """Bag-of-words hashing encoder with the SentenceTransformer surface we use.
+
+    Texts sharing words get similar vectors, which is all retrieval tests need,
+    and it runs without torch or a model download.
+    """
+
+    def __init__(self, dim: int = DIM):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True):
+        vectors = np.full((len(texts), self.dim), 1e-3, dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return vectors
+
+
+def make_embedding_handler(**kwargs) -> EmbeddingHandler:
+    """An ``EmbeddingHandler`` backed by ``HashingModel``."""
+    kwargs.setdefault("use_cache", False)
+    handler = EmbeddingHandler(**kwargs)
+    handler._model = HashingModel()
+    return handler
+
+
+def unit_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """``n`` random L2-normalized float32 vectors."""
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def embedding_handler():
+    return make_embedding_handler()
+
+
+@pytest.fixture
+def local_store(embedding_handler):
+    from local_vector_store import LocalVectorStore
+
+    store = LocalVectorStore(embedding_handler=embedding_handler, persist_dir="")
+    yield store
+    close = getattr(store.query_embedder, "close", None)
+    if close is not None and store.query_embedder is not embedding_handler:
+        close()
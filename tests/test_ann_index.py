@@ -0,0 +1,30 @@
+import numpy as np
+
+from ann_index import IVFFlatIndex
+from conftest import unit_vectors
+
+
+def test_probing_every_list_is_exact(tmp_path):
+    vectors = unit_vectors(500)
+    index = IVFFlatIndex(vectors.shape[1], nlist=8, nprobe=8)
+    index.train(vectors)
+    index.add(vectors, np.arange(len(vectors)))
+
+    query = unit_vectors(1, seed=3)[0]
+    scores, ids = index.search(query, 10)
+    expected = np.argsort(-(vectors @ query))[:10]
+    assert list(ids) == list(expected)
+    assert np.all(np.diff(scores) <= 0)
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    assert list(IVFFlatIndex.load(path).search(query, 10)[1]) == list(expected)
+
+
+def test_stored_vector_is_its_own_nearest_neighbour():
+    vectors = unit_vectors(1000, seed=4)
+    index = IVFFlatIndex(vectors.shape[1], nlist=16, nprobe=2)
+    index.train(vectors)
+    index.add(vectors, np.arange(len(vectors)))
+    hits = sum(index.search(vectors[i], 1)[1][0] == i for i in range(0, 1000, 50))
+    assert hits == 20
@@ -0,0 +1,51 @@
+from answer_cache import SemanticAnswerCache
+from conftest import DIM
+
+
+def _cache(embedding_handler, **kwargs):
+    return SemanticAnswerCache(embedding_handler, DIM, **kwargs)
+
+
+def test_hit_requires_similar_query_and_same_params(embedding_handler):
+    cache = _cache(embedding_handler, threshold=0.99)
+    vector, entry, _ = cache.lookup("what is rag", ("p",), 1)
+    assert entry is None
+    cache.store(vector, "what is rag", ("p",), {"answer": "retrieval"}, 1)
+
+    _, entry, similarity = cache.lookup("What is RAG?", ("p",), 1)
+    assert entry["response"] == {"answer": "retrieval"}
+    assert similarity >= 0.99
+    assert cache.lookup("what is rag", ("other",), 1)[1] is None
+    assert cache.lookup("how do vector stores shard data", ("p",), 1)[1] is None
+
+
+def test_corpus_change_invalidates_everything(embedding_handler):
+    cache = _cache(embedding_handler)
+    vector, _, _ = cache.lookup("q", (), 1)
+    cache.store(vector, "q", (), {"answer": "a"}, 1)
+    assert cache.lookup("q", (), 2)[1] is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_oldest_entry_is_overwritten_when_full(embedding_handler):
+    cache = _cache(embedding_handler, max_entries=2)
+    for query in ("apples", "bananas", "cherries"):
+        vector, _, _ = cache.lookup(query, (), 1)
+        cache.store(vector, query, (), {"answer": query}, 1)
+    assert cache.lookup("apples", (), 1)[1] is None
+    assert cache.lookup("cherries", (), 1)[1]["response"] == {"answer": "cherries"}
+
+
+def test_entries_expire_after_ttl(embedding_handler, monkeypatch):
+    import answer_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+    cache = _cache(embedding_handler, ttl_seconds=60)
+    vector, _, _ = cache.lookup("q", (), 1)
+    cache.store(vector, "q", (), {"answer": "a"}, 1)
+    assert cache.lookup("q", (), 1)[1] is not None
+    now[0] += 61
+    assert cache.lookup("q", (), 1)[1] is None
+    assert cache.stats()["expirations"] == 1
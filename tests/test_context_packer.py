@@ -0,0 +1,54 @@
+from context_packer import ContextPacker, count_tokens, split_sentences, truncate_tokens
+
+
+def test_count_tokens_splits_long_words_and_punctuation():
+    assert count_tokens("") == 0
+    assert count_tokens("cat.") == 2
+    assert count_tokens("internationalization") == 5
+
+
+def test_split_sentences():
+    assert split_sentences("One. Two!  Three?\n\nFour") == ["One.", "Two!", "Three?", "Four"]
+
+
+def test_truncate_tokens_keeps_a_prefix():
+    assert truncate_tokens("internationalization rocks", 5) == "internationalization"
+    assert truncate_tokens("one two", 10) == "one two"
+    assert truncate_tokens("one two", 0) == ""
+
+
+def test_contexts_that_fit_are_kept_whole_and_in_order():
+    packer = ContextPacker(token_budget=200, min_tokens=1)
+    contexts = ["Alpha beta gamma.", "Delta epsilon."]
+    packed = packer.pack("beta", contexts)
+    assert packed["contexts"] == contexts
+    assert packed["trimmed"] == packed["dropped"] == 0
+    assert packed["tokens"] == sum(count_tokens(c) for c in contexts)
+
+
+def test_overflowing_context_is_trimmed_around_the_best_sentence():
+    filler = " ".join(f"Sentence number {i} talks about weather." for i in range(30))
+    context = filler + " The capital of France is Paris. " + filler
+    packer = ContextPacker(token_budget=30, min_tokens=1)
+    packed = packer.pack("What is the capital of France?", [context])
+    assert packed["trimmed"] == 1
+    assert "capital of France is Paris" in packed["contexts"][0]
+    assert packed["tokens"] <= 30
+
+
+def test_context_without_punctuation_is_cut_to_a_prefix():
+    context = " ".join(["word"] * 205)[:1024]
+    packer = ContextPacker(token_budget=50, min_tokens=1)
+    packed = packer.pack("word", [context])
+    assert packed["trimmed"] == 1
+    assert context.startswith(packed["contexts"][0])
+    assert packed["tokens"] == 50
+
+
+def test_oversized_best_sentence_is_cut_instead_of_dropped():
+    context = "Short intro. The capital of France is Paris " + "and more " * 40 + "indeed."
+    packer = ContextPacker(token_budget=20, min_tokens=1)
+    packed = packer.pack("capital of France", [context])
+    assert packed["dropped"] == 0
+    assert packed["contexts"][0].startswith("The capital of France is Paris")
+    assert packed["tokens"] <= 20
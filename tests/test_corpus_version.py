@@ -0,0 +1,37 @@
+from corpus_version import CorpusVersion
+
+
+def test_in_process_counter():
+    version = CorpusVersion()
+    assert version.value == 0
+    assert version.bump() == 1
+    assert version.value == 1
+
+
+def test_file_counter_is_shared_between_instances(tmp_path):
+    path = tmp_path / "store" / "corpus_version"
+    first, second = CorpusVersion(str(path)), CorpusVersion(str(path))
+    assert first.value == second.value == 0
+
+    first.bump()
+    assert second.value == 1
+    second.bump()
+    assert first.value == 2
+
+
+def test_concurrent_bumps_are_not_lost(tmp_path):
+    import threading
+
+    path = str(tmp_path / "corpus_version")
+    versions = [CorpusVersion(path) for _ in range(4)]
+
+    def bump(version):
+        for _ in range(25):
+            version.bump()
+
+    threads = [threading.Thread(target=bump, args=(version,)) for version in versions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert versions[0].value == 100
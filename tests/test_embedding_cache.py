@@ -0,0 +1,64 @@
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+def test_memory_tier_round_trip():
+    cache = EmbeddingCache("model", 4)
+    assert cache.get_many(["a"]) == [None]
+    cache.put_many(["a"], np.ones((1, 4)))
+    np.testing.assert_array_equal(cache.get_many(["a"])[0], np.ones(4, dtype=np.float32))
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache("model", 4, memory_budget_bytes=2 * 16)
+    cache.put_many(["a", "b"], np.ones((2, 4)))
+    cache.get_many(["a"])
+    cache.put_many(["c"], np.ones((1, 4)))
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get_many(["b"]) == [None]
+
+
+def test_disk_tier_survives_reopen_and_model_change(tmp_path):
+    cache = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    cache.put_many(["a", "b"], np.arange(8, dtype=np.float32).reshape(2, 4), persist=True)
+
+    reopened = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(reopened.get_many(["b"])[0], [4, 5, 6, 7])
+    assert reopened.stats()["disk_hits"] == 1
+
+    other_dim = EmbeddingCache("model", 8, cache_dir=str(tmp_path))
+    assert other_dim.get_many(["a"]) == [None]
+
+
+def test_only_persisted_puts_reach_disk(tmp_path):
+    cache = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    cache.put_many(["query"], np.ones((1, 4)))
+    assert cache.stats()["disk_entries"] == 0
+    assert EmbeddingCache("model", 4, cache_dir=str(tmp_path)).get_many(["query"]) == [None]
+
+
+def test_disk_tier_drops_oldest_generation_at_cap(tmp_path):
+    cache = EmbeddingCache("model", 4, cache_dir=str(tmp_path), disk_max_entries=4)
+    for i in range(6):
+        cache.put_many([f"t{i}"], np.full((1, 4), i, dtype=np.float32), persist=True)
+    assert cache.stats()["disk_entries"] <= 4
+    assert len(list((tmp_path / "model").glob("gen-*"))) == 2
+
+    reopened = EmbeddingCache("model", 4, cache_dir=str(tmp_path), disk_max_entries=4)
+    assert reopened.get_many(["t0"]) == [None]
+    np.testing.assert_array_equal(reopened.get_many(["t5"])[0], np.full(4, 5))
+
+
+def test_writers_sharing_a_directory_see_each_others_rows(tmp_path):
+    first = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    second = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    first.put_many(["a"], np.full((1, 4), 1, dtype=np.float32), persist=True)
+    second.put_many(["b"], np.full((1, 4), 2, dtype=np.float32), persist=True)
+    first.put_many(["c"], np.full((1, 4), 3, dtype=np.float32), persist=True)
+
+    assert first.stats()["disk_entries"] == 3
+    reopened = EmbeddingCache("model", 4, cache_dir=str(tmp_path))
+    for text, value in (("a", 1), ("b", 2), ("c", 3)):
+        np.testing.assert_array_equal(reopened.get_many([text])[0], np.full(4, value))
@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import make_embedding_handler
+from embedding_scheduler import EmbeddingScheduler
+
+
+class RecordingHandler:
+    """Wraps an ``EmbeddingHandler`` and records the size of every encoder call."""
+
+    def __init__(self, fail: bool = False):
+        self.handler = make_embedding_handler()
+        self.normalize = self.handler.normalize
+        self.calls = []
+        self.fail = fail
+
+    def get_embedding_dim(self):
+        return self.handler.get_embedding_dim()
+
+    def embed_texts(self, texts, **kwargs):
+        self.calls.append(len(texts))
+        if self.fail:
+            raise RuntimeError("encoder failed")
+        return self.handler.embed_texts(texts, **kwargs)
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+
+    def make(handler, **kwargs):
+        scheduler = EmbeddingScheduler(handler, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.close()
+
+
+def test_concurrent_requests_share_one_batch(make_scheduler):
+    handler = RecordingHandler()
+    scheduler = make_scheduler(handler, max_wait_ms=200, max_batch=8)
+    texts = [f"query number {i}" for i in range(8)]
+    start = threading.Barrier(len(texts))
+    results = {}
+
+    def embed(text):
+        start.wait()
+        results[text] = scheduler.embed_text(text, normalize=True)
+
+    threads = [threading.Thread(target=embed, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert handler.calls == [8]
+    for text in texts:
+        np.testing.assert_allclose(results[text], handler.handler.embed_text(text, normalize=True), rtol=1e-6)
+    stats = scheduler.stats()
+    assert stats["batches"] == 1 and stats["items"] == 8
+    assert stats["batch_size_histogram"] == {"<=8": 1}
+
+
+def test_lone_request_is_flushed_after_max_wait(make_scheduler):
+    handler = RecordingHandler()
+    scheduler = make_scheduler(handler, max_wait_ms=20, max_batch=32)
+    future = scheduler.submit("only query")
+    assert future.result(timeout=2).shape == (handler.get_embedding_dim(),)
+    assert handler.calls == [1]
+
+
+def test_encoder_error_reaches_every_waiting_caller(make_scheduler):
+    scheduler = make_scheduler(RecordingHandler(fail=True), max_wait_ms=200, max_batch=3)
+    futures = [scheduler.submit(f"query {i}") for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="encoder failed"):
+            future.result(timeout=2)
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+import embeddings
+from conftest import DIM, make_embedding_handler
+
+
+def test_concurrent_bulk_encodes_share_one_worker_pool(monkeypatch):
+    created = []
+
+    class FakePool:
+        def __init__(self, model_name, dim, num_workers):
+            created.append(self)
+            threading.Event().wait(0.05)
+
+        def embed_texts(self, texts, batch_size):
+            return np.zeros((len(texts), DIM), dtype=np.float32)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(embeddings, "EmbeddingWorkerPool", FakePool)
+    handler = make_embedding_handler(num_workers=2)
+    threads = [
+        threading.Thread(target=handler.embed_texts, args=(["a", "b", "c"],), kwargs={"batch_size": 1, "use_pool": True})
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(created) == 1
+    handler.close()
+    assert handler._pool is None
+
+
+def _pool_class(broken_calls):
+    """A fake pool class whose first ``broken_calls`` instances die on first use."""
+    created = []
+
+    class FakePool:
+        def __init__(self, model_name, dim, num_workers):
+            self.broken = len(created) < broken_calls
+            self.closed = False
+            created.append(self)
+
+        def embed_texts(self, texts, batch_size):
+            if self.broken:
+                raise BrokenProcessPool("worker died")
+            return np.ones((len(texts), DIM), dtype=np.float32)
+
+        def close(self):
+            self.closed = True
+
+    return FakePool, created
+
+
+def test_broken_worker_pool_is_replaced_and_the_batch_retried(monkeypatch):
+    FakePool, created = _pool_class(broken_calls=1)
+    monkeypatch.setattr(embeddings, "EmbeddingWorkerPool", FakePool)
+    handler = make_embedding_handler(num_workers=2)
+
+    vectors = handler.embed_texts(["a", "b", "c"], batch_size=1, use_pool=True)
+    assert vectors.shape == (3, DIM)
+    assert len(created) == 2 and created[0].closed
+    assert handler._pool is created[1]
+
+
+def test_pool_that_breaks_twice_raises_and_is_discarded(monkeypatch):
+    FakePool, created = _pool_class(broken_calls=2)
+    monkeypatch.setattr(embeddings, "EmbeddingWorkerPool", FakePool)
+    handler = make_embedding_handler(num_workers=2)
+
+    with pytest.raises(BrokenProcessPool):
+        handler.embed_texts(["a", "b", "c"], batch_size=1, use_pool=True)
+    assert handler._pool is None
+    handler.embed_texts(["a", "b", "c"], batch_size=1, use_pool=True)
+    assert len(created) == 3
+
+
+def test_normalized_embeddings_have_unit_length(embedding_handler):
+    vectors = embedding_handler.embed_texts(["hello world", "another text"], normalize=True)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from ingestion_jobs import IngestionJobQueue, IngestionQueueFull
+
+
+class FakeLoader:
+    def load_documents(self, file_path):
+        return [{"content": "text", "source": file_path, "page": 1, "type": "text"}]
+
+
+class FakeAgent:
+    def __init__(self, release=None):
+        self.release = release
+
+    def load_documents(self, documents, progress=None):
+        if self.release is not None:
+            self.release.wait(5)
+        for stage in ("chunk", "embed", "store"):
+            progress(stage, 1, 1)
+        return {"success": True, "documents_processed": len(documents), "chunks_created": 1}
+
+
+def _upload(tmp_path, name="doc.pdf"):
+    path = tmp_path / name
+    path.write_text("content")
+    return str(path)
+
+
+def test_job_runs_through_every_stage(tmp_path):
+    jobs = IngestionJobQueue(FakeLoader, FakeAgent, workers=1)
+    path = _upload(tmp_path)
+    job, created = jobs.submit(path, "doc.pdf")
+    assert created
+    assert job.wait(5)
+
+    status = job.to_dict()
+    assert status["status"] == "completed"
+    assert status["result"]["pdf_pages"] == {"text": 1, "ocr": 0}
+    assert all(stage["status"] == "completed" for stage in status["stages"].values())
+    assert jobs.get(job.id) is job
+
+
+def test_full_queue_rejects_and_forgets_the_job(tmp_path):
+    release = threading.Event()
+    jobs = IngestionJobQueue(FakeLoader, lambda: FakeAgent(release), workers=1, max_queued=1)
+    try:
+        jobs.submit(_upload(tmp_path, "a.pdf"), "a.pdf")
+        # One job is picked up by the worker and one waits; the next overflows
+        for name in ("b.pdf", "c.pdf", "d.pdf"):
+            try:
+                jobs.submit(_upload(tmp_path, name), name)
+            except IngestionQueueFull:
+                break
+        else:
+            pytest.fail("queue never filled up")
+        assert jobs.stats()["queue_depth"] == 1
+    finally:
+        release.set()
+
+
+def test_identical_content_is_not_ingested_twice(tmp_path):
+    jobs = IngestionJobQueue(FakeLoader, FakeAgent, workers=1)
+    first, _ = jobs.submit(_upload(tmp_path, "a.pdf"), "a.pdf", content_hash="h")
+    first.wait(5)
+    again, created = jobs.submit(_upload(tmp_path, "b.pdf"), "b.pdf", content_hash="h")
+    assert again is first and not created
+    assert not (tmp_path / "b.pdf").exists()
+
+    jobs.forget_content()
+    _, created = jobs.submit(_upload(tmp_path, "c.pdf"), "c.pdf", content_hash="h")
+    assert created
+
+
+def test_content_registry_is_pruned_with_the_job_history(tmp_path):
+    jobs = IngestionJobQueue(FakeLoader, FakeAgent, workers=1, max_history=2)
+    submitted = []
+    for i in range(5):
+        job, _ = jobs.submit(_upload(tmp_path, f"{i}.pdf"), f"{i}.pdf", content_hash=f"h{i}")
+        job.wait(5)
+        submitted.append(job)
+    jobs.submit(_upload(tmp_path, "last.pdf"), "last.pdf", content_hash="last")[0].wait(5)
+
+    assert len(jobs._by_content) == len(jobs._jobs) <= 3
+    # A re-upload never points at a job /jobs/{id} no longer knows about
+    job, created = jobs.submit(_upload(tmp_path, "again.pdf"), "again.pdf", content_hash="h0")
+    assert created and jobs.get(job.id) is job
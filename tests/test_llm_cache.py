@@ -0,0 +1,35 @@
+import time
+
+from llm_cache import LLMResponseCache
+
+
+def test_entries_expire_after_the_ttl():
+    cache = LLMResponseCache(ttl_seconds=0.05)
+    cache.put("k", "response")
+    assert cache.get("k") == "response"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path):
+    db_path = str(tmp_path / "llm.sqlite")
+    LLMResponseCache(db_path=db_path).put("k", "response")
+
+    reopened = LLMResponseCache(db_path=db_path)
+    assert reopened.get("k") == "response"
+    assert reopened.stats()["disk_hits"] == 1
+
+    LLMResponseCache(ttl_seconds=0, db_path=db_path).put("stale", "old")
+    assert LLMResponseCache(db_path=db_path).get("stale") is None
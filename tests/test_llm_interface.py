@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+import llm_interface
+from llm_cache import LLMResponseCache
+from llm_interface import LocalLLM, create_http_session
+
+
+def _llm_with_stream(monkeypatch, lines):
+    def handler(request):
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llm_interface, "get_async_http_client", lambda: client)
+    return LocalLLM(cache=None)
+
+
+def _counting_llm(monkeypatch):
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(200, json={"response": f"answer {len(requests_sent)}"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llm_interface, "get_async_http_client", lambda: client)
+    return LocalLLM(cache=LLMResponseCache()), requests_sent
+
+
+async def _collect(stream):
+    return [token async for token in stream]
+
+
+def test_astream_yields_tokens_until_done(monkeypatch):
+    llm = _llm_with_stream(monkeypatch, [{"response": "Hel"}, {"response": "lo"}, {"done": True}])
+    assert asyncio.run(_collect(llm.astream("hi"))) == ["Hel", "lo"]
+
+
+def test_astream_raises_on_error_chunk(monkeypatch):
+    llm = _llm_with_stream(monkeypatch, [{"response": "Hel"}, {"error": "model crashed"}])
+    with pytest.raises(RuntimeError, match="model crashed"):
+        asyncio.run(_collect(llm.astream("hi")))
+
+
+def test_agenerate_serves_repeats_from_the_cache_unless_opted_out(monkeypatch):
+    llm, requests_sent = _counting_llm(monkeypatch)
+
+    async def main():
+        first = await llm.agenerate("prompt", temperature=0.0)
+        repeat = await llm.agenerate("prompt", temperature=0.0)
+        bypass = await llm.agenerate("prompt", temperature=0.0, use_cache=False)
+        return first, repeat, bypass
+
+    assert asyncio.run(main()) == ("answer 1", "answer 1", "answer 2")
+    assert len(requests_sent) == 2
+    assert llm.cache.stats()["memory_hits"] == 1
+
+
+def test_read_timeout_does_not_resend_the_post():
+    received = []
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(self.path)
+            time.sleep(0.5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        session = create_http_session(max_retries=2, backoff=0)
+        with pytest.raises(requests.RequestException):
+            session.post(f"http://127.0.0.1:{server.server_port}/api/generate", json={}, timeout=0.2)
+        assert received == ["/api/generate"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,116 @@
+DOCUMENTS = [
+    {"content": "Paris is the capital of France.", "source": "france.txt", "type": "text"},
+    {"content": "Bananas are a yellow tropical fruit.", "source": "fruit.txt", "type": "text"},
+    {"content": "Rust is a systems programming language.", "source": "rust.txt", "type": "text"},
+]
+
+
+def test_add_and_retrieve(local_store):
+    version = local_store.corpus_version
+    ids = local_store.add_documents(DOCUMENTS)
+    assert len(ids) == len(local_store) == 3
+    assert local_store.corpus_version == version + 1
+    assert local_store.retrieve("capital of France", top_k=1)[0]["source"] == "france.txt"
+
+
+def test_retrieve_many_matches_retrieve(local_store):
+    local_store.add_documents(DOCUMENTS)
+    queries = ["yellow fruit", "programming language"]
+    many = local_store.retrieve_many(queries, top_k=2)
+    for query, hits in zip(queries, many):
+        assert [h["source"] for h in hits] == [h["source"] for h in local_store.retrieve(query, top_k=2)]
+
+
+def test_delete_source_and_delete_all(local_store):
+    local_store.add_documents(DOCUMENTS)
+    assert local_store.delete_source("fruit.txt") == 1
+    assert all(h["source"] != "fruit.txt" for h in local_store.retrieve("yellow fruit", top_k=3))
+    local_store.delete_all()
+    assert len(local_store) == 0
+    assert local_store.retrieve("anything") == []
+
+
+def test_persisted_store_reopens(tmp_path, embedding_handler):
+    from local_vector_store import LocalVectorStore
+
+    LocalVectorStore(embedding_handler=embedding_handler, persist_dir=str(tmp_path)).add_documents(DOCUMENTS)
+    reopened = LocalVectorStore(embedding_handler=embedding_handler, persist_dir=str(tmp_path))
+    assert len(reopened) == 3
+    assert reopened.retrieve("Rust language", top_k=1)[0]["source"] == "rust.txt"
+
+
+def test_ivf_search_ignores_rows_appended_after_the_snapshot(embedding_handler, monkeypatch):
+    import numpy as np
+    import local_vector_store
+    from conftest import unit_vectors
+    from local_vector_store import LocalVectorStore
+
+    monkeypatch.setattr(local_vector_store, "IVF_MIN_TRAIN_ROWS", 10)
+    store = LocalVectorStore(embedding_handler=embedding_handler, persist_dir="", index_type="ivf")
+    vectors = unit_vectors(20)
+    store._append(vectors, [{"content": str(i)} for i in range(20)])
+    assert store.index is not None
+
+    # Simulate a concurrent append landing in the index but not yet in the snapshot
+    real_search = store.index.search
+
+    def search_after_append(query_vector, top_k):
+        store.index.add(vectors[:5], np.arange(20, 25))
+        return real_search(query_vector, top_k + 5)
+
+    monkeypatch.setattr(store.index, "search", search_after_append)
+    hits = store._search(vectors[3], 5)
+    assert hits and all(int(hit["content"]) < 20 for hit in hits)
+
+
+def test_ivf_training_does_not_block_retrieval(embedding_handler, monkeypatch):
+    import threading
+    import local_vector_store
+    from conftest import unit_vectors
+    from local_vector_store import LocalVectorStore
+
+    monkeypatch.setattr(local_vector_store, "IVF_MIN_TRAIN_ROWS", 10)
+    release = threading.Event()
+    training = threading.Event()
+    real_train = local_vector_store.IVFFlatIndex.train
+
+    def slow_train(self, vectors):
+        training.set()
+        release.wait(5)
+        return real_train(self, vectors)
+
+    monkeypatch.setattr(local_vector_store.IVFFlatIndex, "train", slow_train)
+    store = LocalVectorStore(embedding_handler=embedding_handler, persist_dir="", index_type="ivf")
+    vectors = unit_vectors(30)
+    records = [{"content": str(i)} for i in range(30)]
+    writer = threading.Thread(target=store._append, args=(vectors[:20], records[:20]))
+    writer.start()
+    assert training.wait(5)
+
+    # Exact search and appends proceed while k-means runs
+    reader = threading.Thread(target=store._search, args=(vectors[3], 5))
+    reader.start()
+    reader.join(2)
+    assert not reader.is_alive()
+    store._append(vectors[20:], records[20:])
+    assert store.index is None
+    assert store._search(vectors[25], 1)[0]["content"] == "25"
+
+    release.set()
+    writer.join(5)
+    assert store.index is not None
+    assert len(store.index) == 30
+    assert store._search(vectors[25], 1)[0]["content"] == "25"
+
+
+def test_persisted_stores_share_the_corpus_version(tmp_path, embedding_handler):
+    from local_vector_store import LocalVectorStore
+
+    # Two stores on one directory stand in for two uvicorn workers
+    writer = LocalVectorStore(embedding_handler=embedding_handler, persist_dir=str(tmp_path))
+    reader = LocalVectorStore(embedding_handler=embedding_handler, persist_dir=str(tmp_path))
+    version = reader.corpus_version
+    writer.add_documents(DOCUMENTS)
+    assert reader.corpus_version == version + 1
+    writer.delete_source("fruit.txt")
+    assert reader.corpus_version == version + 2
@@ -0,0 +1,94 @@
+import hashlib
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from ingestion_jobs import IngestionJobQueue
+
+
+class RecordingLoader:
+    """Records the bytes each ingestion job reads from its temp file."""
+    loaded = []
+
+    def load_documents(self, file_path):
+        with open(file_path, "rb") as f:
+            self.loaded.append(f.read())
+        return [{"content": "text", "source": file_path, "type": "text"}]
+
+
+class FakeAgent:
+    def load_documents(self, documents, progress=None):
+        return {"success": True, "documents_processed": len(documents), "chunks_created": 1}
+
+    async def aclear_documents(self):
+        return {"success": True}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    RecordingLoader.loaded = []
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(main, "UPLOAD_CHUNK_SIZE", 4)
+    monkeypatch.setattr(main, "get_agent", FakeAgent)
+    monkeypatch.setattr(main, "ingestion_jobs", IngestionJobQueue(RecordingLoader, FakeAgent, workers=1))
+    return TestClient(main.app)
+
+
+def _record_reads(monkeypatch, fail_after=None):
+    """Patch UploadFile.read to log requested sizes, optionally failing after ``fail_after`` reads."""
+    from starlette.datastructures import UploadFile
+
+    sizes = []
+    real_read = UploadFile.read
+
+    async def read(self, size=-1):
+        if fail_after is not None and len(sizes) >= fail_after:
+            raise OSError("client disconnected")
+        sizes.append(size)
+        return await real_read(self, size)
+
+    monkeypatch.setattr(UploadFile, "read", read)
+    return sizes
+
+
+def test_upload_is_copied_in_chunks_and_hashed(client, monkeypatch, tmp_path):
+    body = b"chunked upload body"
+    sizes = _record_reads(monkeypatch)
+
+    response = client.post("/upload?wait=true", files={"file": ("doc.txt", body)})
+    assert response.status_code == 202
+    assert response.json()["success"]
+    assert set(sizes) == {4} and len(sizes) == len(body) // 4 + 2
+    assert RecordingLoader.loaded == [body]
+
+    job = client.get(f"/jobs/{response.json()['job_id']}").json()
+    assert job["content_hash"] == hashlib.sha256(body).hexdigest()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_copy_removes_the_temp_file(client, monkeypatch, tmp_path):
+    _record_reads(monkeypatch, fail_after=2)
+
+    response = client.post("/upload", files={"file": ("doc.txt", b"x" * 20)})
+    assert response.status_code == 500
+    assert "client disconnected" in response.json()["detail"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_duplicate_upload_returns_the_existing_job(client, tmp_path):
+    body = b"same bytes twice"
+    first = client.post("/upload?wait=true", files={"file": ("a.txt", body)}).json()
+    second = client.post("/upload", files={"file": ("b.txt", body)}).json()
+
+    assert "duplicate" not in first
+    assert second["duplicate"] is True
+    assert second["job_id"] == first["job_id"]
+    assert RecordingLoader.loaded == [body]
+    assert list(tmp_path.iterdir()) == []
+
+    client.delete("/documents")
+    third = client.post("/upload?wait=true", files={"file": ("c.txt", body)}).json()
+    assert "duplicate" not in third
+    assert len(RecordingLoader.loaded) == 2
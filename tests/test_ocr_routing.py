@@ -0,0 +1,63 @@
+import pytest
+
+from document_loader import DocumentLoader, _needs_ocr, _printable_ratio
+from ocr_pool import page_windows
+import ocr_pool
+
+
+def test_page_windows_split_runs_of_consecutive_pages():
+    assert page_windows([1, 2, 3, 4, 5, 7, 8, 10], window=3) == [[1, 2, 3], [4, 5], [7, 8], [10]]
+    assert page_windows([], window=3) == []
+
+
+def test_routing_keeps_born_digital_pages_on_the_text_layer():
+    body = "A born-digital page with plenty of extractable text. " * 20
+    assert not _needs_ocr(body, has_images=False)
+    assert not _needs_ocr(body, has_images=True)
+    assert _needs_ocr("", has_images=False)
+    assert _needs_ocr("Figure 1: a scanned chart" + " caption" * 20, has_images=True)
+    assert _needs_ocr("�" * 100, has_images=False)
+    assert _printable_ratio("ab\x00\x01") == 0.5
+
+
+def test_inline_ocr_yields_pages_in_order(monkeypatch):
+    windows = []
+
+    def fake_window(file_path, page_numbers, dpi=200):
+        windows.append(list(page_numbers))
+        return [f"page {p}" for p in page_numbers]
+
+    monkeypatch.setattr(ocr_pool, "ocr_pdf_window", fake_window)
+    pages = list(DocumentLoader(ocr_workers=1)._iter_ocr_pages("scan.pdf", [1, 2, 3, 9]))
+    assert pages == [(1, "page 1"), (2, "page 2"), (3, "page 3"), (9, "page 9")]
+    assert all(len(window) <= ocr_pool.OCR_PAGE_WINDOW for window in windows)
+
+
+def test_broken_pool_is_replaced_on_the_next_call(monkeypatch):
+    import document_loader
+    from concurrent.futures.process import BrokenProcessPool
+
+    pools = []
+
+    class FakePool:
+        def __init__(self, num_workers):
+            self.broken = not pools
+            self.closed = False
+            pools.append(self)
+
+        def iter_ocr_pages(self, file_path, page_numbers):
+            if self.broken:
+                raise BrokenProcessPool("worker killed")
+            yield from ((p, f"page {p}") for p in page_numbers)
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(document_loader, "OCRWorkerPool", FakePool)
+    loader = DocumentLoader(ocr_workers=2)
+    with pytest.raises(BrokenProcessPool):
+        list(loader._iter_ocr_pages("scan.pdf", [1, 2]))
+    assert pools[0].closed and loader._ocr_pool is None
+
+    assert list(loader._iter_ocr_pages("scan.pdf", [1, 2])) == [(1, "page 1"), (2, "page 2")]
+    assert len(pools) == 2
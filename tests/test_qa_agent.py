@@ -0,0 +1,169 @@
+import threading
+
+import pytest
+
+import qa_agent
+from conftest import make_embedding_handler
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    from local_vector_store import LocalVectorStore
+
+    monkeypatch.setattr(
+        qa_agent, "create_vector_store",
+        lambda: LocalVectorStore(embedding_handler=make_embedding_handler(), persist_dir="")
+    )
+    return qa_agent.DocumentQAAgent()
+
+
+def _build(agent, name):
+    """Access ``agent.<name>`` in a thread so a deadlock fails instead of hanging."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault(name, getattr(agent, name)), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), f"building {name} deadlocked"
+    return result[name]
+
+
+@pytest.mark.parametrize("name", ["decomposer", "synthesizer", "llm", "vector_store", "answer_cache"])
+def test_every_component_builds_on_a_fresh_agent(agent, name):
+    component = _build(agent, name)
+    assert component is not None
+    assert getattr(agent, name) is component
+
+
+def test_synthesizer_shares_the_vector_store_embedder(agent):
+    synthesizer = _build(agent, "synthesizer")
+    assert synthesizer.reranker.embedder is agent.vector_store.embedding_handler
+
+
+def test_cache_stats_report_the_query_batch_histogram(agent):
+    agent.vector_store.retrieve("capital of France")
+    stats = agent.cache_stats()
+    assert stats["embedding_scheduler"]["batches"] == 1
+    assert stats["embedding_scheduler"]["batch_size_histogram"] == {"<=1": 1}
+
+
+@pytest.mark.parametrize("call", [
+    lambda agent: agent.ahealth_check(),
+    lambda agent: agent.aanswer_question("What is RAG?", use_decomposition=False, use_cache=False),
+    lambda agent: agent.aclear_documents(),
+])
+def test_async_entry_points_build_the_store_off_the_event_loop(monkeypatch, call):
+    import asyncio
+    from local_vector_store import LocalVectorStore
+
+    built_on = []
+
+    def create_store():
+        built_on.append(threading.current_thread())
+        return LocalVectorStore(embedding_handler=make_embedding_handler(), persist_dir="")
+
+    monkeypatch.setattr(qa_agent, "create_vector_store", create_store)
+    asyncio.run(call(qa_agent.DocumentQAAgent()))
+    assert len(built_on) == 1
+    assert built_on[0] is not threading.main_thread()
+
+
+def test_failed_generation_is_not_cached(agent, monkeypatch):
+    agent.load_documents([{"content": "Paris is the capital of France.", "source": "f.txt", "type": "text"}])
+    answers = iter(["", "Paris."])
+    monkeypatch.setattr(agent.llm, "generate", lambda *args, **kwargs: next(answers))
+
+    first = agent.answer_question("What is the capital of France?", use_decomposition=False)
+    assert first["answer"] == ""
+    assert agent.answer_cache.stats()["entries"] == 0
+
+    second = agent.answer_question("What is the capital of France?", use_decomposition=False)
+    assert second["answer"] == "Paris."
+    assert agent.answer_cache.stats()["entries"] == 1
+
+
+def test_interrupted_stream_ends_with_error_and_is_not_cached(agent, monkeypatch):
+    import asyncio
+
+    agent.load_documents([{"content": "Paris is the capital of France.", "source": "f.txt", "type": "text"}])
+
+    async def broken_stream(prompt, temperature=0.7, max_tokens=None):
+        yield "Par"
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(agent.llm, "astream", broken_stream)
+
+    async def run():
+        return [event async for event, _ in agent.astream_answer("Capital of France?", use_decomposition=False)]
+
+    events = asyncio.run(run())
+    assert events[-1] == "error"
+    assert "done" not in events
+    assert agent.answer_cache.stats()["entries"] == 0
+
+
+def test_store_failure_fails_ingestion_and_allows_a_retry(agent, monkeypatch, tmp_path):
+    from ingestion_jobs import IngestionJobQueue
+
+    class Loader:
+        def load_documents(self, file_path):
+            return [{"content": "Paris is the capital of France.", "source": file_path, "type": "text"}]
+
+    def broken_embed(*args, **kwargs):
+        raise RuntimeError("embedding worker died")
+
+    monkeypatch.setattr(agent.vector_store.embedding_handler, "embed_texts", broken_embed)
+    jobs = IngestionJobQueue(Loader, lambda: agent, workers=1)
+    upload = tmp_path / "a.txt"
+    upload.write_text("x")
+
+    job, _ = jobs.submit(str(upload), "a.txt", content_hash="h")
+    job.wait(5)
+    assert job.status == "failed"
+    assert "embedding worker died" in job.error
+
+    monkeypatch.undo()
+    upload.write_text("x")
+    retry, created = jobs.submit(str(upload), "a.txt", content_hash="h")
+    assert created
+    retry.wait(5)
+    assert retry.status == "completed"
+    assert retry.result["chunks_created"] == 1
+
+
+def test_retrieval_merges_chunks_shared_by_sub_questions(agent):
+    paris = {"content": "Paris is the capital of France.", "source": "f.txt", "chunk_index": 0}
+    lyon = {"content": "Lyon is in France.", "source": "f.txt", "chunk_index": 1}
+    # Same text from another file is a different chunk and is kept
+    copy = {**paris, "source": "copy.txt"}
+    log = {"steps": []}
+
+    contexts = agent._log_retrieval(log, ["q1", "q2"], [[paris, lyon], [lyon, paris, copy]])
+
+    assert contexts == [paris["content"], lyon["content"], copy["content"]]
+    step = log["steps"][-1]
+    assert step["total_contexts"] == 3
+    assert step["duplicates_removed"] == 2
+    assert [detail["retrieved_count"] for detail in step["details"]] == [2, 3]
+
+
+def test_answer_deduplicates_contexts_across_sub_questions(agent, monkeypatch):
+    agent.load_documents([
+        {"content": "Paris is the capital of France.", "source": "paris.txt", "type": "text"},
+        {"content": "Berlin is the capital of Germany.", "source": "berlin.txt", "type": "text"},
+    ])
+    monkeypatch.setattr(agent.decomposer, "decompose_adaptive",
+                        lambda query: ["capital of France", "capital of Germany"])
+    synthesized = {}
+
+    def synthesize(query, contexts, sub_questions):
+        synthesized["contexts"] = contexts
+        return {"answer": "Paris and Berlin.", "confidence": 1.0, "contexts_used": len(contexts)}
+
+    monkeypatch.setattr(agent.synthesizer, "synthesize", synthesize)
+    result = agent.answer_question("Capitals of France and Germany?", top_k=2, use_cache=False)
+
+    retrieval = next(step for step in result["execution_log"]["steps"] if step["stage"] == "retrieval")
+    assert retrieval["total_contexts"] == 2
+    assert retrieval["duplicates_removed"] == 2
+    assert sorted(synthesized["contexts"]) == ["Berlin is the capital of Germany.",
+                                               "Paris is the capital of France."]
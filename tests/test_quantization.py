@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from conftest import unit_vectors
+from quantization import create_codec, load_codec
+
+
+@pytest.mark.parametrize("kind, tolerance", [("int8", 0.02), ("pq", 0.35)])
+def test_adc_scores_approximate_exact_inner_products(tmp_path, kind, tolerance):
+    vectors = unit_vectors(2000)
+    codec = create_codec(kind, vectors.shape[1], pq_m=16)
+    codec.train(vectors)
+    codes = codec.encode(vectors)
+    assert codes.shape == (len(vectors), codec.code_size)
+
+    query = unit_vectors(1, seed=5)[0]
+    exact = vectors @ query
+    assert np.abs(codec.adc_scores(codes, query) - exact).max() < tolerance
+
+    path = str(tmp_path / f"{kind}.npz")
+    codec.save(path)
+    np.testing.assert_allclose(load_codec(path).adc_scores(codes, query), codec.adc_scores(codes, query))
+
+
+def test_pq_requires_divisible_dimension():
+    with pytest.raises(ValueError):
+        create_codec("pq", 10, pq_m=3)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from conftest import unit_vectors
+from reranker import EmbeddingReranker, LLMReranker, Reranker, create_reranker, mmr_select
+
+
+def test_embedding_reranker_puts_the_matching_context_first(embedding_handler):
+    reranker = EmbeddingReranker(embedding_handler)
+    contexts = ["bananas are yellow fruit", "paris is the capital of france", "rust is a language"]
+    assert reranker.rerank("capital of france", contexts)[0] == contexts[1]
+
+
+def test_mmr_skips_near_duplicates():
+    base = unit_vectors(3)
+    candidates = np.stack([base[0], base[0], base[1]])
+    query = base[0] + 0.5 * base[1]
+    query /= np.linalg.norm(query)
+    assert sorted(mmr_select(query, candidates, k=2, lambda_mult=0.5)) == [0, 2]
+
+
+def test_mmr_with_lambda_one_is_plain_relevance_order():
+    candidates = unit_vectors(10, seed=1)
+    query = unit_vectors(1, seed=2)[0]
+    expected = list(np.argsort(-(candidates @ query))[:4])
+    assert mmr_select(query, candidates, k=4, lambda_mult=1.0) == expected
+
+
+def test_llm_ratings_order_contexts_and_keep_unrated_ones():
+    reranker = LLMReranker(llm=None)
+    assert reranker._apply_ratings("[0]=2 [2]=5", ["a", "b", "c"]) == ["c", "a", "b"]
+
+
+def test_reranker_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        Reranker()
+    assert create_reranker("none").rerank("q", ["b", "a"]) == ["b", "a"]
@@ -0,0 +1,126 @@
+import numpy as np
+
+from conftest import unit_vectors
+from vector_segment import SegmentStore, VectorSegment
+
+
+def _records(n, source="doc.txt"):
+    return [{"content": f"chunk {i}", "source": source, "chunk_index": i, "doc_type": "text",
+             "metadata": "{}"} for i in range(n)]
+
+
+def test_append_search_and_reopen(tmp_path):
+    vectors = unit_vectors(50)
+    store = SegmentStore(str(tmp_path), vectors.shape[1], max_segment_rows=20)
+    store.append(vectors, _records(50))
+    assert len(store.segments) == 3
+    assert store.search(vectors[33], 1)[0]["content"] == "chunk 33"
+
+    reopened = SegmentStore(str(tmp_path), vectors.shape[1], max_segment_rows=20)
+    assert len(reopened) == 50
+    assert reopened.search(vectors[7], 1)[0]["chunk_index"] == 7
+
+
+def test_deleted_rows_are_not_returned_and_compaction_drops_them(tmp_path):
+    vectors = unit_vectors(30)
+    store = SegmentStore(str(tmp_path), vectors.shape[1], compact_dead_ratio=0)
+    store.append(vectors[:20], _records(20, "a.txt"))
+    store.append(vectors[20:], _records(10, "b.txt"))
+    assert store.delete_source("a.txt") == 20
+    assert all(hit["source"] == "b.txt" for hit in store.search(vectors[0], 5))
+
+    stats = store.compact()
+    assert stats["rows_after"] == 10
+    assert len(store) == 10
+
+
+def test_deletes_compact_once_enough_rows_are_dead(tmp_path):
+    vectors = unit_vectors(40)
+    store = SegmentStore(str(tmp_path), vectors.shape[1], max_segment_rows=10, compact_dead_ratio=0.5)
+    for source in ("a.txt", "b.txt", "c.txt", "d.txt"):
+        store.append(vectors[:10], _records(10, source))
+
+    store.delete_source("a.txt")
+    assert len(store.segments) == 4
+    store.delete_source("b.txt")
+    assert len(store.segments) == 2
+    assert len(store) == sum(len(segment) for segment in store.segments) == 20
+
+
+def test_deletes_during_compaction_stay_deleted(tmp_path):
+    import threading
+
+    vectors = unit_vectors(200)
+    sources = [f"{i}.txt" for i in range(10)]
+    store = SegmentStore(str(tmp_path), vectors.shape[1], max_segment_rows=50, compact_dead_ratio=0)
+    for i, source in enumerate(sources):
+        store.append(vectors[i * 20:(i + 1) * 20], _records(20, source))
+
+    def compact():
+        for _ in range(5):
+            store.compact()
+
+    def delete():
+        for source in sources[:5]:
+            store.delete_source(source)
+
+    threads = [threading.Thread(target=compact), threading.Thread(target=delete)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    store.compact()
+
+    remaining = {segment.record(row)["source"] for segment in store.segments for row in range(len(segment))}
+    assert remaining == set(sources[5:])
+    assert len(store) == 100
+
+
+def test_torn_append_is_trimmed_on_open(tmp_path):
+    vectors = unit_vectors(5)
+    segment = VectorSegment.create(tmp_path / "seg", vectors.shape[1])
+    segment.append(vectors, _records(5), [f"00000000-0000-0000-0000-00000000000{i}" for i in range(5)])
+    with open(tmp_path / "seg" / "vectors.bin", "ab") as f:
+        f.write(b"\0" * 10)
+
+    reopened = VectorSegment(tmp_path / "seg")
+    assert len(reopened) == 5
+    assert reopened.record(4)["content"] == "chunk 4"
+
+
+def test_quantized_store_reranks_to_exact_top_hit(tmp_path):
+    vectors = unit_vectors(300)
+    store = SegmentStore(str(tmp_path), vectors.shape[1], quantization="int8", min_train_rows=100)
+    store.append(vectors, _records(300))
+    assert store.codec is not None
+    assert store.search(vectors[123], 1)[0]["chunk_index"] == 123
+
+
+def test_search_is_consistent_during_concurrent_appends(tmp_path):
+    import threading
+
+    vectors = unit_vectors(400)
+    segment = VectorSegment.create(tmp_path / "seg", vectors.shape[1])
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(400)]
+    errors = []
+
+    def append():
+        for start in range(0, 400, 10):
+            segment.append(vectors[start:start + 10], _records(10), ids[start:start + 10])
+
+    def search():
+        try:
+            for i in range(200):
+                for score, row in segment.search(vectors[i % 400], 5):
+                    assert np.isfinite(score) and score <= 1.0 + 1e-4
+                    segment.record(row)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=append)] + [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert errors == []
+    assert segment.search(vectors[399], 1)[0][1] == 399
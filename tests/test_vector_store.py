@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("weaviate")
+
+import vector_store  # noqa: E402
+from conftest import make_embedding_handler  # noqa: E402
+
+
+class FakeBatch:
+    """Stands in for ``collection.batch``; rejects objects whose source is in ``reject``."""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.added = []
+        self.failed_objects = []
+
+    def dynamic(self):
+        return self
+
+    def fixed_size(self, batch_size):
+        return self
+
+    def __enter__(self):
+        self.failed_objects = []
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_object(self, properties, vector, uuid):
+        self.added.append(uuid)
+        if properties["source"] in self.reject:
+            self.failed_objects.append(SimpleNamespace(
+                object_=SimpleNamespace(uuid=uuid, properties=properties),
+                message="vector dimension mismatch"
+            ))
+
+
+@pytest.fixture
+def batch():
+    return FakeBatch(reject={"bad.txt"})
+
+
+@pytest.fixture
+def store(monkeypatch, batch):
+    collection = SimpleNamespace(batch=batch)
+    client = SimpleNamespace(collections=SimpleNamespace(
+        exists=lambda name: True, get=lambda name: collection
+    ))
+    monkeypatch.setattr(vector_store.weaviate, "connect_to_local", lambda **kwargs: client)
+    monkeypatch.setattr(vector_store, "EmbeddingHandler", make_embedding_handler)
+    return vector_store.WeaviateVectorStore()
+
+
+DOCUMENTS = [
+    {"content": "Paris is the capital of France.", "source": "good.txt", "type": "text"},
+    {"content": "Rejected by the server.", "source": "bad.txt", "type": "text"},
+]
+
+
+def test_failed_objects_come_back_as_errors(store, batch):
+    errors = []
+    ids = store.add_documents(DOCUMENTS, errors=errors)
+
+    assert len(batch.added) == 2
+    assert len(ids) == 1
+    assert [error["source"] for error in errors] == ["bad.txt"]
+    assert errors[0]["uuid"] not in ids
+    assert errors[0]["chunk_index"] == 0
+    assert errors[0]["message"] == "vector dimension mismatch"
+    assert store.last_ingest_errors is errors
+    assert store.corpus_version == 1
+
+
+def test_aborted_batch_is_reported_and_stores_nothing(store, monkeypatch):
+    def broken_embed(*args, **kwargs):
+        raise RuntimeError("embedding worker died")
+
+    monkeypatch.setattr(store.embedding_handler, "embed_texts", broken_embed)
+    errors = []
+    assert store.add_documents(DOCUMENTS, errors=errors) == []
+    assert [error["message"] for error in errors] == ["embedding worker died"]
+    assert store.corpus_version == 0